@@ -4,14 +4,16 @@ from django.http import JsonResponse
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum, F, DecimalField, ExpressionWrapper
-from django.db.models.functions import Coalesce
 from django.shortcuts import render, redirect
 from django.utils import timezone
 from django.urls import reverse
 
-from orders.models import Order, Payment
+from orders.models import Order
 from expenses.models import UtilityBill, RawMaterialPurchase, StaffSalaryPayment, OtherExpense
+from reports import rollup
+from reports.models import DailyFinanceSummary
+from vhojon import timewindow
+from vhojon.dbrouter import replica_reads
 
 
 def admin_login(request):
@@ -38,51 +40,31 @@ def admin_logout(request):
 
 
 @login_required
+@replica_reads
 def home(request):
     now = timezone.localtime()
-    today = now.date()
+    today = timewindow.business_day(now)
     month_start = today.replace(day=1)
-    
 
     # -----------------------------
-    # Orders (show 5 recent)
+    # Totals: one query over the daily rollup (reports.rollup)
     # -----------------------------
-    today_orders = Order.objects.filter(created_at__date=today).count()
-    recent_orders = Order.objects.order_by("-created_at")[:5]
+    totals = rollup.period_totals(month_start, today)
+    Category = DailyFinanceSummary.Category
 
-    # -----------------------------
-    # Sales (Payments)
-    # ✅ your Payment model uses paid_at (not created_at)
-    # -----------------------------
-    today_sales = Payment.objects.filter(paid_at__date=today).aggregate(
-        total=Coalesce(Sum("amount"), Decimal("0.00"))
-    )["total"]
+    today_orders = totals[Category.ORDERS]["today_count"]
+    today_sales = totals[Category.SALES]["today_amount"]
+    month_sales = totals[Category.SALES]["period_amount"]
+    today_expense = sum((totals[c]["today_amount"] for c in DailyFinanceSummary.EXPENSE_CATEGORIES), Decimal("0.00"))
+    month_expense = sum((totals[c]["period_amount"] for c in DailyFinanceSummary.EXPENSE_CATEGORIES), Decimal("0.00"))
 
-    month_sales = Payment.objects.filter(paid_at__date__gte=month_start).aggregate(
-        total=Coalesce(Sum("amount"), Decimal("0.00"))
-    )["total"]
+    recent_orders = Order.objects.order_by("-created_at")[:5]
 
     # -----------------------------
-    # Expenses
+    # Recent expenses (5 newest of each type, merged)
     # -----------------------------
     expense_rows = []
 
-    raw_total_expr = ExpressionWrapper(
-        F("quantity") * F("unit_price"),
-        output_field=DecimalField(max_digits=12, decimal_places=2),
-    )
-
-    today_expense = Decimal("0.00")
-    month_expense = Decimal("0.00")
-
-    # ---- Utility ----
-    today_expense += UtilityBill.objects.filter(bill_date=today).aggregate(
-        total=Coalesce(Sum("amount"), Decimal("0.00"))
-    )["total"]
-    month_expense += UtilityBill.objects.filter(bill_date__gte=month_start).aggregate(
-        total=Coalesce(Sum("amount"), Decimal("0.00"))
-    )["total"]
-
     for x in UtilityBill.objects.select_related("utility_type").order_by("-bill_date", "-id")[:5]:
         expense_rows.append({
             "date": x.bill_date,
@@ -92,15 +74,6 @@ def home(request):
             "delete_url": reverse("expenses:utility_delete", args=[x.pk]),
         })
 
-    # ---- Raw ----
-    today_expense += RawMaterialPurchase.objects.filter(purchase_date=today).annotate(
-        t=raw_total_expr
-    ).aggregate(total=Coalesce(Sum("t"), Decimal("0.00")))["total"]
-
-    month_expense += RawMaterialPurchase.objects.filter(purchase_date__gte=month_start).annotate(
-        t=raw_total_expr
-    ).aggregate(total=Coalesce(Sum("t"), Decimal("0.00")))["total"]
-
     for x in RawMaterialPurchase.objects.select_related("material", "unit").order_by("-purchase_date", "-id")[:5]:
         expense_rows.append({
             "date": x.purchase_date,
@@ -110,15 +83,6 @@ def home(request):
             "delete_url": reverse("expenses:raw_delete", args=[x.pk]),
         })
 
-    # ---- Salary ----
-    today_expense += StaffSalaryPayment.objects.filter(pay_date=today).aggregate(
-        total=Coalesce(Sum("amount"), Decimal("0.00"))
-    )["total"]
-
-    month_expense += StaffSalaryPayment.objects.filter(pay_date__gte=month_start).aggregate(
-        total=Coalesce(Sum("amount"), Decimal("0.00"))
-    )["total"]
-
     for x in StaffSalaryPayment.objects.select_related("staff").order_by("-pay_date", "-id")[:5]:
         expense_rows.append({
             "date": x.pay_date,
@@ -128,15 +92,6 @@ def home(request):
             "delete_url": reverse("expenses:salary_delete", args=[x.pk]),
         })
 
-    # ---- Other ----
-    today_expense += OtherExpense.objects.filter(expense_date=today).aggregate(
-        total=Coalesce(Sum("amount"), Decimal("0.00"))
-    )["total"]
-
-    month_expense += OtherExpense.objects.filter(expense_date__gte=month_start).aggregate(
-        total=Coalesce(Sum("amount"), Decimal("0.00"))
-    )["total"]
-
     for x in OtherExpense.objects.order_by("-expense_date", "-id")[:5]:
         expense_rows.append({
             "date": x.expense_date,
@@ -0,0 +1,529 @@
+# bench/datagen.py
+"""
+Deterministic synthetic load data (``manage.py seed_load``).
+
+Generates, at realistic volumes (5k products, 100k customers, 1M orders by
+default):
+
+    * a menu: categories (two levels) and products;
+    * payment methods (Cash, Card, bKash, Nagad, Rocket);
+    * customers, each with a primary address (some with a second one);
+    * orders over ``days`` days up to ``today`` (busier on Fri / Sat, lunch
+      and dinner peaks) with ids in time order, real per-day order numbers,
+      their items and payments. Popular products and regular customers are
+      picked more often; most orders are paid in full, some partly, a few
+      not at all; only today's orders are still pending. Online orders go
+      to the customer's primary address;
+    * all four expense types: monthly utility bills and salaries for a
+      staff roster, daily raw material purchases and other expenses.
+
+Everything is drawn from one ``random.Random(seed)``, so the same seed and
+``today`` (on the same starting database) give the same rows.
+
+Primary keys are assigned up front and foreign keys resolved in memory, so
+nothing is read back between batches. Lookup and master rows go through
+``bulk_create``. The high-volume tables (addresses, orders, items,
+payments, raw purchases, other expenses) skip model instances altogether:
+their rows are built as tuples of already-adapted values and written with
+one ``executemany`` INSERT per batch (``_insert``), because turning model
+instances into parameters is most of ``bulk_create``'s cost at these sizes.
+Each batch is its own transaction.
+
+Neither path sends signals, so ``finish()`` rebuilds what they would have
+maintained: order number sequences, customer balances, the expense ledger,
+the finance rollup and the in-process search indexes.
+"""
+import calendar
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from catalog.models import Category, Product
+from customers.models import Customer, CustomerAddress
+from expenses.models import OtherExpense, RawMaterial, RawMaterialPurchase, StaffSalaryPayment, Unit, UtilityBill, UtilityType
+from orders.models import Order, OrderItem, OrderNumberSequence, Payment
+from orders.utils import format_order_no
+from payments.models import PaymentMethod
+from staff.models import Staff, StaffRole
+
+BATCH_SIZE = 5000
+
+MENU = {
+    "Biryani": ["Kacchi", "Chicken", "Beef Tehari", "Mutton", "Morog Polao", "Egg"],
+    "Kebab": ["Seekh", "Shami", "Reshmi", "Boti", "Chicken Tikka", "Shashlik"],
+    "Curry": ["Beef Bhuna", "Chicken Roast", "Mutton Rezala", "Dal Makhani", "Fish Bhuna", "Egg Curry"],
+    "Rice": ["Plain", "Fried", "Khichuri", "Jeera", "Vegetable", "Polao"],
+    "Bread": ["Naan", "Butter Naan", "Garlic Naan", "Paratha", "Tandoori Roti", "Luchi"],
+    "Snacks": ["Singara", "Samosa", "Chop", "Fuchka", "Chotpoti", "Spring Roll"],
+    "Dessert": ["Firni", "Doi", "Rasmalai", "Kulfi", "Pudding", "Jorda"],
+    "Drinks": ["Borhani", "Lassi", "Lemonade", "Mango Juice", "Tea", "Coffee"],
+}
+SECTIONS = ["Classic", "Special", "Family", "Combo", "Chef's"]
+SIZES = ["", "Half", "Full", "Large", "Small", "Platter", "1:1", "1:2"]
+
+FIRST_NAMES = [
+    "Rahim", "Karim", "Abdul", "Hasan", "Rafiq", "Sakib", "Tanvir", "Nusrat", "Farhana", "Sumaiya",
+    "Ayesha", "Mehedi", "Imran", "Shanto", "Riya", "Tania", "Jamal", "Kamal", "Sadia", "Nabila",
+]
+LAST_NAMES = [
+    "Uddin", "Ahmed", "Hossain", "Islam", "Rahman", "Chowdhury", "Khan", "Akter", "Sarkar", "Miah",
+]
+AREAS = [
+    "Dhanmondi", "Mirpur", "Uttara", "Gulshan", "Banani", "Mohammadpur", "Bashundhara",
+    "Motijheel", "Old Dhaka", "Badda", "Rampura", "Khilgaon",
+]
+
+# name, share of payments
+PAYMENT_METHODS = [("Cash", 55), ("bKash", 25), ("Nagad", 10), ("Card", 7), ("Rocket", 3)]
+
+ITEM_COUNTS = [1, 2, 3, 4, 5]
+ITEM_WEIGHTS = [30, 35, 20, 10, 5]
+
+# name, typical monthly bill (taka)
+UTILITY_TYPES = [
+    ("Current Bill", 18000), ("Gas Bill", 6000), ("Water Bill", 1500), ("Internet", 2000), ("Rent", 60000),
+]
+# name, symbol
+UNITS = [("kg", "kg"), ("liter", "L"), ("pcs", "pcs"), ("packet", "pkt"), ("dozen", "dz")]
+# name, unit, price per unit (taka), usual quantity
+RAW_MATERIALS = [
+    ("Rice", "kg", 75, 50), ("Chicken", "kg", 210, 30), ("Beef", "kg", 750, 15),
+    ("Mutton", "kg", 1100, 8), ("Soybean Oil", "liter", 170, 10), ("Ghee", "kg", 1400, 3),
+    ("Onion", "kg", 90, 20), ("Garlic", "kg", 220, 4), ("Ginger", "kg", 260, 3),
+    ("Potato", "kg", 45, 25), ("Lentil", "kg", 130, 8), ("Flour", "kg", 60, 20),
+    ("Egg", "dozen", 150, 10), ("Milk", "liter", 90, 15), ("Sugar", "kg", 140, 6),
+    ("Spice Mix", "packet", 120, 10), ("Mineral Water", "pcs", 20, 48), ("Tea Leaf", "packet", 95, 4),
+]
+VENDORS = ["Kawran Bazar", "Shwapno", "Agora", "Meena Bazar", "Local Supplier", ""]
+# role, monthly salary (taka), head count weight
+STAFF_ROLES = [
+    ("Chef", 35000, 3), ("Waiter", 14000, 6), ("Cashier", 18000, 2),
+    ("Cleaner", 10000, 2), ("Manager", 45000, 1), ("Delivery", 13000, 3),
+]
+OTHER_EXPENSES = [
+    ("Gas cylinder", 1500, 2500), ("Cleaning supplies", 300, 1200), ("Packaging", 800, 3000),
+    ("Repair & maintenance", 500, 6000), ("Transport", 200, 1500), ("Printing", 300, 1500),
+    ("Stationery", 100, 600), ("Miscellaneous", 100, 2000),
+]
+
+
+def _money(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def _next_id(model):
+    return (model.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+
+
+def _insert(model, fields, rows):
+    """
+    One ``executemany`` INSERT of ``rows`` (tuples in ``fields`` order, values
+    already adapted for the DB) into ``model``'s table.
+    """
+    if not rows:
+        return
+    meta, qn = model._meta, connection.ops.quote_name
+    columns = ", ".join(qn(meta.get_field(f).column) for f in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {qn(meta.db_table)} ({columns}) VALUES ({placeholders})", rows)
+
+
+ORDER_FIELDS = [
+    "id", "created_at", "updated_at", "order_no", "customer_id", "customer_address_id", "source", "status",
+    "subtotal", "discount_type", "discount_value", "discount_amount", "tax_amount", "grand_total",
+    "paid_total", "due_total", "notes", "ordered_at",
+]
+ITEM_FIELDS = [
+    "order_id", "product_id", "qty", "unit_price", "discount_type", "discount_value", "discount_amount",
+    "line_total", "created_at", "updated_at",
+]
+PAYMENT_FIELDS = ["order_id", "payment_method_id", "amount", "reference_no", "paid_at", "created_at", "updated_at"]
+ADDRESS_FIELDS = ["id", "customer_id", "address_line", "is_primary", "created_at", "updated_at"]
+
+
+class Generator:
+    def __init__(self, seed=42, batch_size=BATCH_SIZE, days=365, today=None, log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.days = days
+        # a given ``today`` counts as a finished day; the real one stops at now
+        self.now = None if today else timezone.now()
+        self.today = today or timezone.localdate()
+        self.start = self.today - timedelta(days=days - 1)
+        self.log = log or (lambda msg: None)
+
+        self._dt = connection.ops.adapt_datetimefield_value
+        self._date = connection.ops.adapt_datefield_value
+
+        self.products = []          # (id, price in cents)
+        self.customers = []         # ids
+        self.addresses = {}         # customer id -> primary address id
+        self.methods = []           # ids
+        self.method_weights = []
+        self.day_counts = {}        # date -> last order number used
+        self.models = set()         # tables written with explicit ids
+
+    def _aware(self, day, seconds=0):
+        return timezone.make_aware(datetime.combine(day, time.min)) + timedelta(seconds=seconds)
+
+    # -----------------------------
+    # CATALOG
+    # -----------------------------
+    def make_catalog(self, n_products):
+        cat_id = _next_id(Category)
+        categories = []
+        leaves = []
+        for group in MENU:
+            parent = Category(id=cat_id, name=group)
+            categories.append(parent)
+            cat_id += 1
+            for section in SECTIONS:
+                categories.append(Category(id=cat_id, name=f"{section} {group}", parent_id=parent.id))
+                leaves.append((cat_id, group))
+                cat_id += 1
+        self._flush(Category, categories)
+
+        created = self._aware(self.start)
+        pid = _next_id(Product)
+        batch = []
+        for i in range(n_products):
+            category_id, group = leaves[i % len(leaves)]
+            dish = MENU[group][(i // len(leaves)) % len(MENU[group])]
+            size = SIZES[(i // (len(leaves) * 6)) % len(SIZES)]
+            price = self.rng.randrange(40, 900, 5) * 100
+            batch.append(Product(
+                id=pid,
+                category_id=category_id,
+                name=f"{dish} {group} {size} #{pid}".replace("  ", " "),
+                sku=f"P{pid:07d}",
+                sale_price=_money(price),
+                cost_price=_money(price * self.rng.randint(40, 70) // 100),
+                created_at=created,
+            ))
+            self.products.append((pid, price))
+            pid += 1
+            if len(batch) >= self.batch_size:
+                self._flush(Product, batch)
+                batch = []
+        self._flush(Product, batch)
+        self.log(f"catalog: {len(categories)} categories, {n_products} products")
+
+    def make_payment_methods(self):
+        for name, weight in PAYMENT_METHODS:
+            method, _ = PaymentMethod.objects.get_or_create(name=name)
+            self.methods.append(method.pk)
+            self.method_weights.append(weight)
+
+    # -----------------------------
+    # CUSTOMERS
+    # -----------------------------
+    def _phone(self, i):
+        # unique for i < 10**8: 7919 is coprime with 10**8
+        return f"01{3 + i % 7}{(i * 7919 + 12345) % 10**8:08d}"
+
+    def _address(self):
+        rng = self.rng
+        return f"House {rng.randint(1, 120)}, Road {rng.randint(1, 30)}, {rng.choice(AREAS)}, Dhaka"
+
+    def make_customers(self, n):
+        rng = self.rng
+        taken = set(Customer.objects.values_list("phone", flat=True))
+        cid = _next_id(Customer)
+        aid = _next_id(CustomerAddress)
+        customers, addresses = [], []
+        i = n_addresses = 0
+        while len(self.customers) < n:
+            phone = self._phone(i)
+            i += 1
+            if phone in taken:
+                continue
+            # signed up some time before the first generated order
+            created = self._aware(self.start - timedelta(days=rng.randint(1, 365)), rng.randrange(86400))
+            customers.append(Customer(
+                id=cid,
+                name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                phone=phone,
+                created_at=created,
+            ))
+            at = self._dt(created)
+            addresses.append((aid, cid, self._address(), True, at, at))
+            self.addresses[cid] = aid
+            aid += 1
+            n_addresses += 1
+            if rng.random() < 0.2:
+                addresses.append((aid, cid, self._address(), False, at, at))
+                aid += 1
+                n_addresses += 1
+            self.customers.append(cid)
+            cid += 1
+            if len(customers) >= self.batch_size:
+                self._flush_customers(customers, addresses)
+                customers, addresses = [], []
+        self._flush_customers(customers, addresses)
+        self.log(f"customers: {n}, addresses: {n_addresses}")
+
+    def _flush_customers(self, customers, addresses):
+        with transaction.atomic():
+            Customer.objects.bulk_create(customers)
+            _insert(CustomerAddress, ADDRESS_FIELDS, addresses)
+        self.models.update((Customer, CustomerAddress))
+
+    # -----------------------------
+    # ORDERS
+    # -----------------------------
+    def _days(self, n_orders):
+        """Orders per day, busier on Friday / Saturday."""
+        days = [self.today - timedelta(days=d) for d in range(self.days - 1, -1, -1)]
+        weights = [1.4 if d.weekday() in (4, 5) else 1.0 for d in days]
+        total = sum(weights)
+        counts = [int(n_orders * w / total) for w in weights]
+        for i in range(n_orders - sum(counts)):
+            counts[-1 - i % len(counts)] += 1
+        return zip(days, counts)
+
+    def _seconds(self, n):
+        """Sorted second-of-day offsets, peaking at lunch and dinner."""
+        out = []
+        for _ in range(n):
+            peak = 13.5 if self.rng.random() < 0.4 else 20.5
+            hour = min(max(self.rng.gauss(peak, 1.6), 10.0), 23.9)
+            out.append(int(hour * 3600))
+        out.sort()
+        return out
+
+    def make_orders(self, n):
+        rng, dt = self.rng, self._dt
+        products, customers, addresses = self.products, self.customers, self.addresses
+        n_products, n_customers = len(products), len(customers)
+        percent = Order.DiscountType.PERCENT
+
+        oid = _next_id(Order)
+        orders, items, payments = [], [], []
+        written = 0
+
+        for day, count in self._days(n):
+            day_start = self._aware(day)
+            seq = OrderNumberSequence.objects.filter(day=day).values_list("last_value", flat=True).first() or 0
+            is_today = day == self.today
+
+            offsets = self._seconds(count)
+            if is_today and self.now is not None:
+                # nothing from later today
+                now = int((self.now - day_start).total_seconds())
+                offsets = [min(o, now) for o in offsets]
+
+            for offset in offsets:
+                seq += 1
+                created = day_start + timedelta(seconds=offset)
+                at = dt(created)
+
+                # popular products first: squaring skews towards low indexes
+                subtotal = 0
+                for _ in range(rng.choices(ITEM_COUNTS, ITEM_WEIGHTS)[0]):
+                    pid, price = products[int(n_products * rng.random() ** 2)]
+                    qty = rng.choice((1, 1, 1, 2, 2, 3))
+                    line = price * qty
+                    subtotal += line
+                    items.append((oid, pid, qty, _money(price), None, None, _money(0), _money(line), at, at))
+
+                discount_type, discount_value, discount = None, None, 0
+                if rng.random() < 0.1:
+                    pct = rng.choice((5, 10, 15))
+                    discount_type, discount_value = percent, _money(pct * 100)
+                    discount = subtotal * pct // 100
+                grand = subtotal - discount
+
+                roll = rng.random()
+                if is_today and roll < 0.3:
+                    status, paid = Order.Status.PENDING, 0
+                elif roll < 0.03:
+                    status, paid = Order.Status.CANCELLED, 0
+                elif roll < 0.06:
+                    status, paid = Order.Status.COMPLETED, 0
+                elif roll < 0.15:
+                    status, paid = Order.Status.COMPLETED, grand * rng.randint(50, 90) // 100
+                else:
+                    status, paid = Order.Status.COMPLETED, grand
+
+                if paid:
+                    parts = [paid] if rng.random() > 0.05 else [paid // 2, paid - paid // 2]
+                    for k, amount in enumerate(parts):
+                        paid_at = dt(created + timedelta(minutes=5 + k))
+                        method = rng.choices(self.methods, self.method_weights)[0]
+                        payments.append((oid, method, _money(amount), None, paid_at, paid_at, paid_at))
+
+                online = rng.random() < 0.3
+                customer_id = address_id = None
+                if n_customers and (online or rng.random() < 0.4):
+                    customer_id = customers[int(n_customers * rng.random() ** 1.5)]
+                    if online:
+                        address_id = addresses.get(customer_id)
+
+                orders.append((
+                    oid, at, at, format_order_no(day, seq), customer_id, address_id,
+                    Order.Source.ONLINE if online else Order.Source.STORE, status,
+                    _money(subtotal), discount_type, discount_value, _money(discount), _money(0),
+                    _money(grand), _money(paid),
+                    _money(grand - paid if status != Order.Status.CANCELLED else 0),
+                    None, at,
+                ))
+                oid += 1
+
+                if len(orders) >= self.batch_size:
+                    written += self._flush_orders(orders, items, payments)
+                    orders, items, payments = [], [], []
+                    self.log(f"orders: {written}/{n}")
+
+            self.day_counts[day] = seq
+
+        if orders:
+            written += self._flush_orders(orders, items, payments)
+            self.log(f"orders: {written}/{n}")
+
+    def _flush_orders(self, orders, items, payments):
+        with transaction.atomic():
+            _insert(Order, ORDER_FIELDS, orders)
+            _insert(OrderItem, ITEM_FIELDS, items)
+            _insert(Payment, PAYMENT_FIELDS, payments)
+        self.models.add(Order)
+        return len(orders)
+
+    # -----------------------------
+    # EXPENSES
+    # -----------------------------
+    def _months(self):
+        """First day of every month that overlaps the date range."""
+        month = self.start.replace(day=1)
+        while month <= self.today:
+            yield month
+            month = (month + timedelta(days=32)).replace(day=1)
+
+    def make_staff(self, n):
+        rng = self.rng
+        roles = {name: StaffRole.objects.get_or_create(name=name)[0].pk for name, _, _ in STAFF_ROLES}
+        weights = [w for _, _, w in STAFF_ROLES]
+        sid = _next_id(Staff)
+        staff = []
+        for i in range(n):
+            role, salary, _ = STAFF_ROLES[i] if i < len(STAFF_ROLES) else rng.choices(STAFF_ROLES, weights)[0]
+            staff.append(Staff(
+                id=sid + i,
+                name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                phone=f"019{rng.randrange(10**8):08d}",
+                role_id=roles[role],
+                monthly_salary=_money(salary * 100 + rng.randrange(0, 5000, 500) * 100),
+                joined_at=self.start - timedelta(days=rng.randint(0, 3 * 365)),
+            ))
+        self._flush(Staff, staff)
+        self.staff = [(s.pk, s.monthly_salary) for s in staff]
+        self.log(f"staff: {n}")
+
+    def make_expenses(self, raw_per_day=15, other_per_day=3):
+        rng, d = self.rng, self._date
+        self.make_expense_masters()
+
+        bills, salaries = [], []
+        for month in self._months():
+            bill_day = month.replace(day=10)
+            if self.start <= bill_day <= self.today:
+                for (type_id, base) in self.utility_types:
+                    amount = base * rng.randint(85, 125)   # cents: base taka +-15%
+                    bills.append(UtilityBill(utility_type_id=type_id, amount=_money(amount), bill_date=bill_day))
+            last = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+            if self.start <= last <= self.today:
+                for staff_id, salary in self.staff:
+                    salaries.append(StaffSalaryPayment(staff_id=staff_id, amount=salary, pay_date=last, month=month))
+        self._flush(UtilityBill, bills)
+        self._flush(StaffSalaryPayment, salaries)
+
+        raw, other = [], []
+        day = self.start
+        while day <= self.today:
+            on = d(day)
+            for _ in range(raw_per_day):
+                material_id, unit_id, price, usual = rng.choice(self.materials)
+                quantity = Decimal(rng.randint(usual * 500, usual * 1500)).scaleb(-3)
+                unit_price = _money(price * rng.randint(90, 115))
+                raw.append((material_id, unit_id, quantity, unit_price, on, rng.choice(VENDORS), ""))
+            for _ in range(other_per_day):
+                title, low, high = rng.choice(OTHER_EXPENSES)
+                other.append((title, _money(rng.randint(low, high) * 100), on, ""))
+            if len(raw) >= self.batch_size:
+                self._flush_expenses(raw, other)
+                raw, other = [], []
+            day += timedelta(days=1)
+        self._flush_expenses(raw, other)
+        self.log(
+            f"expenses: {len(bills)} utility bills, {len(salaries)} salaries, "
+            f"{raw_per_day * self.days} raw purchases, {other_per_day * self.days} other"
+        )
+
+    def make_expense_masters(self):
+        self.utility_types = [
+            (UtilityType.objects.get_or_create(name=name)[0].pk, base) for name, base in UTILITY_TYPES
+        ]
+        units = {name: Unit.objects.get_or_create(name=name, defaults={"symbol": symbol})[0].pk for name, symbol in UNITS}
+        self.materials = []
+        for name, unit, price, usual in RAW_MATERIALS:
+            material, _ = RawMaterial.objects.get_or_create(name=name, defaults={"default_unit_id": units[unit]})
+            self.materials.append((material.pk, material.default_unit_id, price, usual))
+
+    def _flush_expenses(self, raw, other):
+        with transaction.atomic():
+            _insert(RawMaterialPurchase, [
+                "material_id", "unit_id", "quantity", "unit_price", "purchase_date", "vendor", "note",
+            ], raw)
+            _insert(OtherExpense, ["title", "amount", "expense_date", "note"], other)
+
+    def _flush(self, model, batch):
+        if batch:
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            self.models.add(model)
+
+    # -----------------------------
+    # DERIVED DATA
+    # -----------------------------
+    def finish(self):
+        from catalog import cache as catalog_cache
+        from customers import balances
+        from customers.phone_index import phone_index
+        from expenses import ledger
+        from reports import rollup
+
+        with transaction.atomic():
+            for day, last in self.day_counts.items():
+                OrderNumberSequence.objects.update_or_create(day=day, defaults={"last_value": last})
+
+            # ids were assigned by hand; move the sequences past them
+            models = sorted(self.models, key=lambda m: m._meta.label)
+            with connection.cursor() as cursor:
+                for statement in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(statement)
+
+            balances.reconcile()
+            ledger.rebuild()
+            rollup.rebuild()
+
+        catalog_cache.bump()       # bulk_create skipped the signals
+        phone_index.invalidate()
+        self.log("rebuilt order number sequences, customer totals, expense ledger, finance rollup and indexes")
+
+
+def generate(products=5000, customers=100_000, orders=1_000_000, staff=20, raw_per_day=15,
+             other_per_day=3, seed=42, days=365, today=None, batch_size=BATCH_SIZE, log=None):
+    gen = Generator(seed=seed, batch_size=batch_size, days=days, today=today, log=log)
+    gen.make_payment_methods()
+    gen.make_catalog(products)
+    gen.make_customers(customers)
+    gen.make_orders(orders)
+    gen.make_staff(staff)
+    gen.make_expenses(raw_per_day=raw_per_day, other_per_day=other_per_day)
+    gen.finish()
+    return gen
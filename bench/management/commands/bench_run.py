@@ -0,0 +1,68 @@
+# bench/management/commands/bench_run.py
+"""
+Run the hot path scenarios (see bench.scenarios) and report latency
+percentiles and queries per request:
+
+    python manage.py bench_run --save bench/baseline.json
+    python manage.py bench_run --compare bench/baseline.json --tolerance 0.25
+    python manage.py bench_run --scenario order_list --scenario home --requests 500
+
+With --compare the command fails when a scenario regressed.
+"""
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bench import scenarios
+
+
+class Command(BaseCommand):
+    help = "Benchmark the POS hot paths (p50/p95/p99 latency, queries per request)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", action="append", choices=list(scenarios.SCENARIOS),
+                            help="Repeat to pick several; default all.")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--host", default="localhost", help="Host header (must be in ALLOWED_HOSTS).")
+        parser.add_argument("--save", metavar="PATH", help="Write the results as a baseline JSON file.")
+        parser.add_argument("--compare", metavar="PATH", help="Compare with a saved baseline.")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 growth (0.2 = 20%%).")
+
+    def handle(self, *args, **opts):
+        names = opts["scenario"] or list(scenarios.SCENARIOS)
+        ctx = scenarios.Context(random.Random(opts["seed"]))
+        client = scenarios.bench_client(opts["host"])
+
+        info = scenarios.dataset_info()
+        self.stdout.write(
+            f"{info['vendor']}: {info['products']} products, {info['customers']} customers, {info['orders']} orders"
+        )
+        self.stdout.write(f"{'scenario':<20}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'max':>6}{'errors':>8}")
+
+        results = {"created": timezone.now().isoformat(timespec="seconds"), "data": info, "scenarios": {}}
+        for name in names:
+            r = scenarios.run_scenario(name, client, ctx, requests=opts["requests"], warmup=opts["warmup"])
+            results["scenarios"][name] = r
+            self.stdout.write(
+                f"{name:<20}{r['p50_ms']:>7.1f}ms{r['p95_ms']:>7.1f}ms{r['p99_ms']:>7.1f}ms"
+                f"{r['queries_avg']:>9.1f}{r['queries_max']:>6}{r['errors']:>8}"
+            )
+
+        if opts["save"]:
+            scenarios.save_baseline(opts["save"], results)
+            self.stdout.write(f"saved {opts['save']}")
+
+        if opts["compare"]:
+            try:
+                baseline = scenarios.load_baseline(opts["compare"])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Can't read baseline: {e}")
+            problems = scenarios.compare(results, baseline, opts["tolerance"])
+            if problems:
+                for p in problems:
+                    self.stderr.write(f"REGRESSION {p}")
+                raise CommandError(f"{len(problems)} regression(s) against {opts['compare']}")
+            self.stdout.write(f"no regressions against {opts['compare']}")
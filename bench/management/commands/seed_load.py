@@ -0,0 +1,60 @@
+# bench/management/commands/seed_load.py
+"""
+Fill the database with synthetic load data (see bench.datagen):
+
+    python manage.py seed_load                        # 5k products, 100k customers, 1M orders
+    python manage.py seed_load --orders 50000 --customers 5000 --products 500
+    python manage.py seed_load --seed 7 --today 2026-01-31   # same rows every run
+
+Use a throwaway database: rows are added to whatever is there.
+"""
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bench.datagen import BATCH_SIZE, generate
+
+
+class Command(BaseCommand):
+    help = "Generate catalog, customers, orders (with items / payments) and expenses for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=5000)
+        parser.add_argument("--customers", type=int, default=100_000)
+        parser.add_argument("--orders", type=int, default=1_000_000)
+        parser.add_argument("--staff", type=int, default=20)
+        parser.add_argument("--raw-per-day", type=int, default=15, help="Raw material purchases per day.")
+        parser.add_argument("--other-per-day", type=int, default=3, help="Other expenses per day.")
+        parser.add_argument("--days", type=int, default=365, help="Spread orders over this many days up to today.")
+        parser.add_argument("--today", help="Last day to generate (YYYY-MM-DD); fixes the dates for reproducible runs.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        today = None
+        if opts["today"]:
+            try:
+                today = date.fromisoformat(opts["today"])
+            except ValueError:
+                raise CommandError("--today must be YYYY-MM-DD.")
+
+        started = time.perf_counter()
+
+        def log(msg):
+            self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {msg}")
+
+        generate(
+            products=opts["products"],
+            customers=opts["customers"],
+            orders=opts["orders"],
+            staff=opts["staff"],
+            raw_per_day=opts["raw_per_day"],
+            other_per_day=opts["other_per_day"],
+            seed=opts["seed"],
+            days=opts["days"],
+            today=today,
+            batch_size=opts["batch_size"],
+            log=log,
+        )
+        log("done")
@@ -0,0 +1,47 @@
+# bench/management/commands/stress_checkout.py
+"""
+Parallel order_create load against the configured database (see
+bench.stress), e.g. three counters and a dashboard:
+
+    python manage.py stress_checkout --counters 3 --orders 50
+
+Fails when any request hit "database is locked" or another error.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bench import stress
+
+
+class Command(BaseCommand):
+    help = "Post order_create from several threads at once and count lock errors."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--counters", type=int, default=4, help="Parallel checkout threads.")
+        parser.add_argument("--orders", type=int, default=25, help="Orders per counter.")
+        parser.add_argument("--no-dashboard", action="store_true", help="Skip the home page reader thread.")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        options = connection.settings_dict.get("OPTIONS", {})
+        self.stdout.write(
+            f"{connection.vendor}: transaction_mode={options.get('transaction_mode') or 'DEFERRED'}, "
+            f"timeout={options.get('timeout', 5)}s, CONN_MAX_AGE={connection.settings_dict.get('CONN_MAX_AGE')}"
+        )
+        result = stress.run_checkouts(
+            counters=opts["counters"],
+            orders_per_counter=opts["orders"],
+            dashboard=not opts["no_dashboard"],
+            seed=opts["seed"],
+        )
+        total = opts["counters"] * opts["orders"]
+        self.stdout.write(
+            f"{result.counts['ok']}/{total} orders in {result.seconds:.1f}s "
+            f"({result.counts['ok'] / result.seconds:.1f}/s), "
+            f"{result.counts['dashboard_ok']} dashboard loads, "
+            f"{result.locked} locked, {result.failed - result.locked} other errors"
+        )
+        for line in result.errors:
+            self.stdout.write(f"  {line}")
+        if result.failed:
+            raise CommandError(f"{result.failed} requests failed")
@@ -0,0 +1,234 @@
+# bench/scenarios.py
+"""
+Scripted requests against the POS hot paths (``manage.py bench_run``).
+
+Each scenario issues one request through Django's test ``Client`` (full
+middleware / view / template stack, no network) as a logged-in staff user,
+against whatever data is in the configured database, typically one filled
+by ``manage.py seed_load``. Per scenario it records wall time and the
+number of SQL queries of every request and reports p50 / p95 / p99 latency
+and queries per request.
+
+Results can be saved as a baseline JSON file and later runs compared to it:
+a scenario regresses when its p95 grows by more than the tolerance (and by
+more than ``NOISE_MS``) or when it needs more queries per request.
+"""
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models import Max
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import Product
+from customers.models import Customer
+from orders.models import Order
+from payments.models import PaymentMethod
+from vhojon import keyset
+
+NOISE_MS = 1.0
+QUERY_SLACK = 0.5
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Context:
+    """Sample ids / phones / words from the DB to build requests from."""
+
+    def __init__(self, rng, sample=500):
+        self.rng = rng
+        self.product_ids = list(
+            Product.objects.filter(is_active=True).order_by("?").values_list("id", flat=True)[:sample]
+        )
+        self.product_words = sorted({
+            w.lower()
+            for name in Product.objects.filter(pk__in=self.product_ids[:100]).values_list("name", flat=True)
+            for w in name.split()
+            if w.isalpha() and len(w) > 2
+        }) or ["rice"]
+        self.phones = list(Customer.objects.order_by("?").values_list("phone", flat=True)[:sample])
+        self.method_id = PaymentMethod.objects.filter(is_active=True).values_list("id", flat=True).first()
+        self.max_order_id = Order.objects.aggregate(m=Max("id"))["m"] or 1
+        self.today = timezone.localdate()
+
+    def phone(self):
+        return self.rng.choice(self.phones) if self.phones else "01700000000"
+
+
+# =====================================================
+# SCENARIOS
+# =====================================================
+def order_create(client, ctx):
+    rng = ctx.rng
+    products = rng.sample(ctx.product_ids, min(len(ctx.product_ids), rng.randint(1, 4)))
+    data = {
+        "existing_phone": ctx.phone() if rng.random() < 0.5 else "",
+        "source": Order.Source.STORE,
+        "status": Order.Status.COMPLETED,
+        "discount_type": "",
+        "discount_value": "",
+        "tax_amount": "0.00",
+        "notes": "",
+        "items-TOTAL_FORMS": str(len(products)),
+        "items-INITIAL_FORMS": "0",
+        "items-MIN_NUM_FORMS": "0",
+        "items-MAX_NUM_FORMS": "1000",
+        "payments-TOTAL_FORMS": "1",
+        "payments-INITIAL_FORMS": "0",
+        "payments-MIN_NUM_FORMS": "0",
+        "payments-MAX_NUM_FORMS": "1000",
+        "payments-0-payment_method": str(ctx.method_id),
+        "payments-0-amount": "100.00",
+        "payments-0-reference_no": "",
+    }
+    for i, pid in enumerate(products):
+        data[f"items-{i}-product"] = str(pid)
+        data[f"items-{i}-qty"] = str(rng.randint(1, 3))
+        data[f"items-{i}-unit_price"] = ""
+        data[f"items-{i}-discount_type"] = ""
+        data[f"items-{i}-discount_value"] = ""
+    return client.post(reverse("orders:order_create"), data, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+
+
+def product_search(client, ctx):
+    word = ctx.rng.choice(ctx.product_words)
+    return client.get(reverse("orders:product_search"), {"q": word[: ctx.rng.randint(2, len(word))]})
+
+
+def phone_suggest(client, ctx):
+    return client.get(reverse("customers:phone_suggest"), {"q": ctx.phone()[: ctx.rng.randint(4, 8)]})
+
+
+def customer_by_phone(client, ctx):
+    return client.get(reverse("customers:customer_by_phone"), {"phone": ctx.phone()})
+
+
+def order_list(client, ctx):
+    rng = ctx.rng
+    start = ctx.today - timedelta(days=rng.randint(0, 90))
+    deep = rng.randint(1, ctx.max_order_id)    # a page anywhere in the history
+    params = rng.choice([
+        {},
+        {"status": Order.Status.COMPLETED},
+        {"source": Order.Source.ONLINE, "due": "1"},
+        {"date_from": start.isoformat(), "date_to": (start + timedelta(days=6)).isoformat()},
+        {"q": ctx.phone()},
+        {"status": Order.Status.PENDING, "after": keyset.encode_cursor(deep, deep)},
+    ])
+    return client.get(reverse("orders:order_list"), params)
+
+
+def home(client, ctx):
+    return client.get(reverse("home"))
+
+
+def expense_dashboard(client, ctx):
+    return client.get(reverse("expenses:dashboard"), ctx.rng.choice([{}, {"sort": "-amount"}]))
+
+
+SCENARIOS = {
+    fn.__name__: fn
+    for fn in [order_create, product_search, phone_suggest, customer_by_phone, order_list, home, expense_dashboard]
+}
+
+
+# =====================================================
+# RUN / REPORT
+# =====================================================
+def _percentile(sorted_values, pct):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def bench_client(host="localhost"):
+    user, created = get_user_model().objects.get_or_create(
+        username="bench", defaults={"is_staff": True, "is_superuser": True},
+    )
+    if created:
+        user.set_unusable_password()
+        user.save()
+    client = Client(SERVER_NAME=host, raise_request_exception=False)
+    client.force_login(user)
+    return client
+
+
+def run_scenario(name, client, ctx, requests=200, warmup=20):
+    fn = SCENARIOS[name]
+    for _ in range(warmup):
+        fn(client, ctx)
+
+    times, queries, errors = [], [], 0
+    for _ in range(requests):
+        counter = _QueryCounter()
+        with connections["default"].execute_wrapper(counter):
+            started = time.perf_counter()
+            response = fn(client, ctx)
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+            elapsed = (time.perf_counter() - started) * 1000
+        times.append(elapsed)
+        queries.append(counter.count)
+        if response.status_code >= 400:
+            errors += 1
+
+    times.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(_percentile(times, 50), 2),
+        "p95_ms": round(_percentile(times, 95), 2),
+        "p99_ms": round(_percentile(times, 99), 2),
+        "mean_ms": round(statistics.fmean(times), 2),
+        "queries_avg": round(statistics.fmean(queries), 2),
+        "queries_max": max(queries),
+    }
+
+
+def dataset_info():
+    return {
+        "vendor": connections["default"].vendor,
+        "products": Product.objects.count(),
+        "customers": Customer.objects.count(),
+        "orders": Order.objects.count(),
+    }
+
+
+def compare(current, baseline, tolerance=0.2):
+    """Regression messages for scenarios slower / chattier than the baseline."""
+    problems = []
+    for name, now in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        limit = base["p95_ms"] * (1 + tolerance)
+        if now["p95_ms"] > limit and now["p95_ms"] - base["p95_ms"] > NOISE_MS:
+            problems.append(f"{name}: p95 {now['p95_ms']:.1f} ms vs baseline {base['p95_ms']:.1f} ms")
+        if now["queries_avg"] > base["queries_avg"] + QUERY_SLACK:
+            problems.append(f"{name}: {now['queries_avg']:.1f} queries/request vs baseline {base['queries_avg']:.1f}")
+    return problems
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_baseline(path, results):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
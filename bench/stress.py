@@ -0,0 +1,106 @@
+# bench/stress.py
+"""
+Parallel checkout load (``manage.py stress_checkout``).
+
+Several "counters" (threads, each with its own test ``Client`` and DB
+connection) post ``order_create`` at the same time while a "dashboard"
+thread keeps loading the home page, the pattern that used to end in
+"database is locked". Every request is classified as ok, locked (an
+``OperationalError`` about a locked / busy database) or another error.
+"""
+import copy
+import random
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.test import Client
+
+from . import scenarios
+
+_LOCK_MESSAGES = ("database is locked", "database table is locked", "database is busy")
+
+
+def _is_lock_error(exc):
+    return isinstance(exc, OperationalError) and any(m in str(exc) for m in _LOCK_MESSAGES)
+
+
+class StressResult:
+    def __init__(self):
+        self.counts = Counter()
+        self.errors = []
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, key, exc=None):
+        with self._lock:
+            self.counts[key] += 1
+            if exc is not None and len(self.errors) < 5:
+                self.errors.append(f"{type(exc).__name__}: {exc}")
+
+    @property
+    def locked(self):
+        return self.counts["locked"]
+
+    @property
+    def failed(self):
+        return sum(n for k, n in self.counts.items() if k not in ("ok", "dashboard_ok"))
+
+
+def _client(username, host):
+    client = Client(SERVER_NAME=host, raise_request_exception=True)
+    client.force_login(get_user_model().objects.get(username=username))
+    return client
+
+
+def run_checkouts(counters=4, orders_per_counter=25, dashboard=True, seed=1, username="bench", host="localhost"):
+    """Run the load against the configured DB; returns a ``StressResult``."""
+    scenarios.bench_client(host)     # makes sure the bench user exists
+    base = scenarios.Context(random.Random(seed))
+    result = StressResult()
+    start = threading.Barrier(counters + (1 if dashboard else 0))
+    done = threading.Event()
+
+    def call(key, fn, *args):
+        try:
+            response = fn(*args)
+        except Exception as exc:
+            result.add("locked" if _is_lock_error(exc) else "error", exc)
+            return
+        result.add(key if response.status_code < 400 else f"http_{response.status_code}")
+
+    def counter(i):
+        try:
+            ctx = copy.copy(base)
+            ctx.rng = random.Random(seed * 1000 + i)
+            client = _client(username, host)
+            start.wait(timeout=60)
+            for _ in range(orders_per_counter):
+                call("ok", scenarios.order_create, client, ctx)
+        finally:
+            connections.close_all()
+
+    def dashboard_reader():
+        try:
+            client = _client(username, host)
+            start.wait(timeout=60)
+            while not done.is_set():
+                call("dashboard_ok", scenarios.home, client, base)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=counter, args=(i,)) for i in range(counters)]
+    reader = threading.Thread(target=dashboard_reader) if dashboard else None
+
+    started = time.perf_counter()
+    for t in threads + ([reader] if reader else []):
+        t.start()
+    for t in threads:
+        t.join()
+    done.set()
+    if reader:
+        reader.join()
+    result.seconds = time.perf_counter() - started
+    return result
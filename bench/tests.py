@@ -0,0 +1,160 @@
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection, connections, transaction
+from django.db.models import Count, F, Sum
+from django.test import TestCase, TransactionTestCase
+
+from catalog.models import Product
+from customers.models import Customer, CustomerAddress
+from expenses.models import ExpenseEntry, OtherExpense, RawMaterialPurchase, StaffSalaryPayment, UtilityBill
+from orders.models import Order, OrderItem, OrderNumberSequence, Payment
+from reports.models import DailyFinanceSummary
+
+from vhojon import dbprofile
+
+from . import scenarios, stress
+from .datagen import generate
+
+
+class DataGeneratorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(products=60, customers=40, orders=300, staff=4, raw_per_day=3, other_per_day=1,
+                 days=40, today=date(2026, 3, 15), batch_size=70)
+
+    def test_volumes_and_consistent_totals(self):
+        self.assertEqual(Product.objects.count(), 60)
+        self.assertEqual(Customer.objects.count(), 40)
+        self.assertEqual(Order.objects.count(), 300)
+
+        for order in Order.objects.prefetch_related("items", "payments")[:50]:
+            self.assertEqual(order.subtotal, sum(i.line_total for i in order.items.all()))
+            self.assertEqual(order.grand_total, order.subtotal - order.discount_amount)
+            self.assertEqual(order.paid_total, sum((p.amount for p in order.payments.all()), Decimal("0.00")))
+
+    def test_addresses_and_expenses(self):
+        self.assertEqual(CustomerAddress.objects.filter(is_primary=True).count(), 40)
+        online = Order.objects.filter(source=Order.Source.ONLINE, customer__isnull=False)
+        self.assertTrue(online.exists())
+        self.assertFalse(online.filter(customer_address__isnull=True).exists())
+        self.assertFalse(online.exclude(customer_address__customer=F("customer")).exists())
+
+        self.assertEqual(RawMaterialPurchase.objects.count(), 3 * 40)
+        self.assertEqual(OtherExpense.objects.count(), 40)
+        # Feb 10 + Mar 10 bills for 5 types; February salaries for 4 staff
+        self.assertEqual(UtilityBill.objects.count(), 10)
+        self.assertEqual(StaffSalaryPayment.objects.count(), 4)
+        self.assertEqual(ExpenseEntry.objects.count(), 120 + 40 + 10 + 4)
+
+    def test_order_numbers_continue_after_seed(self):
+        last = OrderNumberSequence.objects.order_by("-day").first()
+        self.assertEqual(Order.objects.filter(order_no__contains=f"{last.day:%Y%m%d}").count(), last.last_value)
+        self.assertFalse(Order.objects.values("order_no").annotate(n=Count("id")).filter(n__gt=1).exists())
+
+    def test_rollup_rebuilt(self):
+        paid = Payment.objects.aggregate(s=Sum("amount"))["s"]
+        sales = DailyFinanceSummary.objects.filter(category="sales").aggregate(s=Sum("amount"))["s"]
+        self.assertEqual(paid, sales)
+        self.assertEqual(OrderItem.objects.exclude(order__in=Order.objects.all()).count(), 0)
+
+        other = OtherExpense.objects.aggregate(s=Sum("amount"))["s"]
+        self.assertEqual(DailyFinanceSummary.objects.filter(category="other").aggregate(s=Sum("amount"))["s"], other)
+
+
+class ReproducibilityTests(TestCase):
+    def _snapshot(self, seed):
+        with transaction.atomic():
+            generate(products=20, customers=15, orders=80, staff=3, raw_per_day=2, other_per_day=1,
+                     days=20, today=date(2026, 1, 31), seed=seed)
+            snapshot = [
+                list(Customer.objects.order_by("id").values_list("name", "phone", "created_at")),
+                list(CustomerAddress.objects.order_by("id").values_list("customer_id", "address_line", "is_primary")),
+                list(Order.objects.order_by("id").values_list(
+                    "order_no", "created_at", "customer_id", "customer_address_id", "status", "grand_total", "paid_total",
+                )),
+                list(OrderItem.objects.order_by("id").values_list("order_id", "product_id", "qty", "line_total")),
+                list(Payment.objects.order_by("id").values_list("order_id", "payment_method_id", "amount", "paid_at")),
+                list(ExpenseEntry.objects.order_by("kind", "source_id").values_list("date", "title", "amount")),
+            ]
+            transaction.set_rollback(True)
+        return snapshot
+
+    def test_same_seed_same_rows(self):
+        first = self._snapshot(seed=7)
+        self.assertTrue(all(first))
+        self.assertEqual(self._snapshot(seed=7), first)
+        self.assertNotEqual(self._snapshot(seed=8), first)
+
+
+class ScenarioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate(products=30, customers=20, orders=100, days=5)
+
+    def test_every_scenario_runs_without_errors(self):
+        client = scenarios.bench_client(host="testserver")
+        ctx = scenarios.Context(random.Random(1))
+        for name in scenarios.SCENARIOS:
+            result = scenarios.run_scenario(name, client, ctx, requests=5, warmup=1)
+            self.assertEqual(result["errors"], 0, name)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+            self.assertLessEqual(result["p95_ms"], result["p99_ms"])
+
+    def test_compare_flags_slower_or_chattier_runs(self):
+        base = {"scenarios": {"home": {"p95_ms": 10.0, "queries_avg": 8.0}}}
+        same = {"scenarios": {"home": {"p95_ms": 11.0, "queries_avg": 8.0}}}
+        slower = {"scenarios": {"home": {"p95_ms": 20.0, "queries_avg": 8.0}}}
+        chattier = {"scenarios": {"home": {"p95_ms": 10.0, "queries_avg": 12.0}}}
+
+        self.assertEqual(scenarios.compare(same, base), [])
+        self.assertEqual(len(scenarios.compare(slower, base)), 1)
+        self.assertIn("queries", scenarios.compare(chattier, base)[0])
+
+
+class CheckoutStressTests(TransactionTestCase):
+    """Parallel checkouts on a real SQLite file (the test DB is in memory)."""
+
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite locking")
+        generate(products=30, customers=20, orders=20, days=2)
+        scenarios.bench_client(host="testserver")
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "pos.sqlite3")
+        connection.ensure_connection()
+        target = sqlite3.connect(self.path)
+        connection.connection.backup(target)
+        target.close()
+
+    def stress(self, settings_dict):
+        # threads open their own connections, from this entry
+        original = connections.settings["default"]
+        connections.settings["default"] = {**original, **settings_dict, "NAME": self.path}
+        try:
+            return stress.run_checkouts(counters=3, orders_per_counter=10, host="testserver")
+        finally:
+            connections.settings["default"] = original
+
+    def test_lock_errors_disappear_with_the_production_profile(self):
+        plain = self.stress({"OPTIONS": {}, "CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False})
+        self.assertGreater(plain.locked, 0)
+        before = self.order_count()
+
+        tuned = self.stress(dbprofile.sqlite(self.path))
+        self.assertEqual(tuned.failed, 0, tuned.errors)
+        self.assertEqual(tuned.counts["ok"], 30)
+        self.assertEqual(self.order_count(), before + 30)
+
+        with sqlite3.connect(self.path) as db:
+            self.assertEqual(db.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def order_count(self):
+        with sqlite3.connect(self.path) as db:
+            return db.execute("SELECT COUNT(*) FROM orders_order").fetchone()[0]
@@ -0,0 +1,260 @@
+# catalog/cache.py
+"""
+Per-process cache of the catalog reference data every checkout reads:
+active products, categories and payment methods.
+
+The order form's product and payment method choices, the ``product_price``
+lookup and the product search index (``catalog.search``) all read one
+immutable ``CatalogSnapshot`` instead of querying these tables per request.
+
+Invalidation works across worker processes through ``CatalogVersion``, a
+one-row table in the DB:
+
+    bump()      after a committed change to a Product, Category or
+                PaymentMethod (``catalog.signals``, the importer) the
+                generation goes up by one
+    get()       compares the snapshot's generation with the DB at most once
+                per request (``CatalogCacheMiddleware``; outside requests at
+                most every ``CATALOG_CACHE_CHECK_SECONDS``), a primary key
+                lookup, and rebuilds when it moved
+
+The generation is read before the rows, so a snapshot never claims a newer
+generation than its data. Everything is read from the primary, so a lagging
+replica can't make workers flip between two generations.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+VERSION_PK = 1
+
+
+class ProductEntry:
+    __slots__ = ("id", "name", "sku", "sale_price", "category_id", "is_active", "price", "label", "name_key", "sku_key")
+
+    def __init__(self, id, name, sku, sale_price, category_id=None, is_active=True):
+        self.id = id
+        self.name = name
+        self.sku = sku
+        self.sale_price = sale_price
+        self.category_id = category_id
+        self.is_active = is_active
+        self.price = str(sale_price)
+        self.label = f"{name} ({sku})" if sku else name
+        self.name_key = (name or "").lower()
+        self.sku_key = (sku or "").lower()
+
+    def as_result(self):
+        return {"id": self.id, "text": self.label, "price": self.price}
+
+    def instance(self):
+        from .models import Product
+
+        return _from_db(Product, id=self.id, category_id=self.category_id, name=self.name,
+                        sku=self.sku, sale_price=self.sale_price, is_active=self.is_active)
+
+
+class CategoryEntry:
+    __slots__ = ("id", "name", "parent_id", "is_active")
+
+    def __init__(self, id, name, parent_id, is_active):
+        self.id = id
+        self.name = name
+        self.parent_id = parent_id
+        self.is_active = is_active
+
+    def instance(self):
+        from .models import Category
+
+        return _from_db(Category, id=self.id, name=self.name, parent_id=self.parent_id, is_active=self.is_active)
+
+
+class PaymentMethodEntry:
+    __slots__ = ("id", "name", "is_active")
+
+    def __init__(self, id, name, is_active):
+        self.id = id
+        self.name = name
+        self.is_active = is_active
+
+    def instance(self):
+        from payments.models import PaymentMethod
+
+        return _from_db(PaymentMethod, id=self.id, name=self.name, is_active=self.is_active)
+
+
+def _from_db(model, **values):
+    """
+    A model instance as if loaded with ``.only(*values)``: a fresh object per
+    call (callers may change it), the other columns load on access.
+    """
+    names = [f.attname for f in model._meta.concrete_fields if f.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, names, [values[n] for n in names])
+
+
+# kind -> (model, columns in entry argument order, entry class)
+KINDS = {
+    "product": ("catalog.Product", ("id", "name", "sku", "sale_price", "category_id", "is_active"), ProductEntry),
+    "category": ("catalog.Category", ("id", "name", "parent_id", "is_active"), CategoryEntry),
+    "payment_method": ("payments.PaymentMethod", ("id", "name", "is_active"), PaymentMethodEntry),
+}
+
+
+def _entries(kind, qs_filter=None, order_by=("id",)):
+    from django.apps import apps
+
+    label, columns, entry = KINDS[kind]
+    qs = apps.get_model(label).objects.using(DEFAULT_DB_ALIAS).order_by(*order_by)
+    if qs_filter is not None:
+        qs = qs.filter(qs_filter)
+    return [entry(*row) for row in qs.values_list(*columns)]
+
+
+def load_entries(kind, ids):
+    """
+    id -> entry for ``ids`` straight from the DB, inactive rows included;
+    one ``id__in`` query (none for no ids). Not cached.
+    """
+    ids = set(ids)
+    if not ids:
+        return {}
+    return {e.id: e for e in _entries(kind, Q(id__in=ids))}
+
+
+class CatalogSnapshot:
+    """One immutable build; readers keep a reference, rebuilds swap it."""
+
+    def __init__(self, generation, products, categories, payment_methods):
+        self.generation = generation
+        self.products = products                # active, by name
+        self.categories = categories            # by name
+        self.payment_methods = payment_methods  # by id
+        self._lists = {"product": products, "category": categories, "payment_method": payment_methods}
+        self._by_id = {kind: {e.id: e for e in entries} for kind, entries in self._lists.items()}
+        self.built_at = time.monotonic()
+
+    def entries(self, kind):
+        return self._lists[kind]
+
+    def lookup(self, kind, pk):
+        return self._by_id[kind].get(pk)
+
+
+# -----------------------------
+# GENERATION
+# -----------------------------
+def current_generation(using=DEFAULT_DB_ALIAS):
+    from .models import CatalogVersion
+
+    value = CatalogVersion.objects.using(using).filter(pk=VERSION_PK).values_list("generation", flat=True).first()
+    return value or 0
+
+
+def bump(using=DEFAULT_DB_ALIAS):
+    """Tell every process the catalog changed; call after commit."""
+    from .models import CatalogVersion
+
+    updated = (
+        CatalogVersion.objects.using(using)
+        .filter(pk=VERSION_PK)
+        .update(generation=F("generation") + 1, updated_at=timezone.now())
+    )
+    if not updated:
+        CatalogVersion.objects.using(using).get_or_create(pk=VERSION_PK, defaults={"generation": 1})
+    catalog_cache.invalidate()
+
+
+def bump_on_commit(using=DEFAULT_DB_ALIAS):
+    # a rolled back change must not drop anybody's cache, nor show up in it
+    transaction.on_commit(lambda: bump(using), using=using)
+
+
+# -----------------------------
+# CACHE
+# -----------------------------
+class CatalogCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()   # when this thread last compared generations
+        self._snapshot = None
+
+    def invalidate(self):
+        """Drop this process's copy; the next read rebuilds it."""
+        self._snapshot = None
+
+    def new_request(self):
+        self._local.checked_at = None
+
+    def _check_due(self):
+        checked_at = getattr(self._local, "checked_at", None)
+        if checked_at is None:
+            return True
+        max_age = getattr(settings, "CATALOG_CACHE_CHECK_SECONDS", 5)
+        return time.monotonic() - checked_at > max_age
+
+    def build(self):
+        generation = current_generation()
+        snap = CatalogSnapshot(
+            generation,
+            products=_entries("product", Q(is_active=True), order_by=("name", "id")),
+            categories=_entries("category", order_by=("name", "id")),
+            payment_methods=_entries("payment_method"),
+        )
+        self._snapshot = snap
+        self._local.checked_at = time.monotonic()
+        return snap
+
+    def get(self):
+        """The current ``CatalogSnapshot``."""
+        snap = self._snapshot
+        if snap is not None and not self._check_due():
+            return snap
+
+        generation = current_generation() if snap is not None else None
+        self._local.checked_at = time.monotonic()
+        if snap is not None and snap.generation == generation:
+            return snap
+
+        with self._lock:
+            current = self._snapshot
+            if current is not None and current is not snap and (generation is None or current.generation == generation):
+                return current   # another thread rebuilt it meanwhile
+            return self.build()
+
+    # -----------------------------
+    # LOOKUPS
+    # -----------------------------
+    def product(self, pk):
+        """``ProductEntry`` of an active product, or None."""
+        return self.get().lookup("product", to_pk(pk))
+
+    def category(self, pk):
+        return self.get().lookup("category", to_pk(pk))
+
+    def payment_method(self, pk):
+        return self.get().lookup("payment_method", to_pk(pk))
+
+
+def to_pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+catalog_cache = CatalogCache()
+
+
+class CatalogCacheMiddleware:
+    """Lets the first catalog read of each request compare generations."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        catalog_cache.new_request()
+        return self.get_response(request)
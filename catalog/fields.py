@@ -0,0 +1,162 @@
+# catalog/fields.py
+"""
+Form fields backed by the catalog cache (``catalog.cache``).
+
+Like ``ModelChoiceField`` but the choices and the submitted id are checked
+against the cached snapshot, so neither rendering nor validating a form row
+queries the table. ``clean()`` returns a model instance holding the cached
+columns (others load on access), ready to assign to the ForeignKey.
+
+``LazySelect`` renders only the selected option (the rest come from the
+AJAX search), and ``CatalogFormSetMixin`` resolves whatever the snapshot
+doesn't have (a product made inactive after the order was rung up) for the
+whole formset in one ``id__in`` query.
+"""
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.functional import cached_property
+
+from .cache import catalog_cache, load_entries, to_pk
+
+
+class LazySelect(forms.Select):
+    """
+    ``<select>`` with just the empty and the selected option: with Select2
+    loading results over AJAX, a form row renders one ``<option>`` instead of
+    the whole catalog. The owning ``CatalogChoiceField`` supplies the labels.
+    """
+
+    def __init__(self, attrs=None):
+        super().__init__(attrs)
+        self.selected_choices = lambda values: []
+
+    def optgroups(self, name, value, attrs=None):
+        groups = []
+        for index, (option_value, label) in enumerate(self.selected_choices(value)):
+            selected = str(option_value) in value
+            groups.append((None, [self.create_option(name, option_value, label, selected, index, attrs=attrs)], index))
+        return groups
+
+
+class CatalogChoiceField(forms.ChoiceField):
+    default_error_messages = {
+        "invalid_choice": "Select a valid choice. That choice is not one of the available choices.",
+    }
+
+    def __init__(self, kind, *, empty_label="---------", label_attr="name", **kwargs):
+        self.kind = kind
+        self.empty_label = empty_label
+        self.label_attr = label_attr
+        self.known = {}    # id -> entry the snapshot doesn't have (CatalogFormSetMixin)
+        self.current = None   # the row's saved id; only that one may come from ``known``
+        self.instances = {}   # id -> instance handed out, shared by a formset's rows
+        super().__init__(choices=self._choices_from_cache, **kwargs)
+        self._bind_widget()
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        result.instances = {}
+        result._bind_widget()
+        return result
+
+    def _bind_widget(self):
+        if isinstance(self.widget, LazySelect):
+            self.widget.selected_choices = self.selected_choices
+
+    def _choices_from_cache(self):
+        entries = catalog_cache.get().entries(self.kind)
+        choices = [(e.id, getattr(e, self.label_attr)) for e in entries]
+        if self.empty_label is not None:
+            choices.insert(0, ("", self.empty_label))
+        return choices
+
+    def selected_choices(self, values):
+        """(value, label) for the empty option and the ``values`` that exist."""
+        choices = [("", self.empty_label)] if self.empty_label is not None else []
+        for value in values:
+            entry = self.entry(value, saved_only=False)
+            if entry is not None:
+                choices.append((entry.id, getattr(entry, self.label_attr)))
+        return choices
+
+    def entry(self, value, saved_only=True):
+        pk = to_pk(value)
+        entry = catalog_cache.get().lookup(self.kind, pk)
+        if entry is None and (pk == self.current or not saved_only):
+            entry = self.known.get(pk)
+        return entry
+
+    def prepare_value(self, value):
+        if isinstance(value, models.Model):
+            return value.pk
+        return value
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        entry = self.entry(self.prepare_value(value))
+        if entry is None:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        instance = self.instances.get(entry.id)
+        if instance is None:
+            instance = self.instances[entry.id] = entry.instance()
+        return instance
+
+    def validate(self, value):
+        # membership was checked in to_python
+        forms.Field.validate(self, value)
+
+    def has_changed(self, initial, data):
+        if self.disabled:
+            return False
+        initial_value = initial if initial is not None else ""
+        data_value = data if data is not None else ""
+        return str(self.prepare_value(initial_value)) != str(data_value)
+
+
+class CatalogFormMixin:
+    """
+    For ModelForms with ``CatalogChoiceField``s: the field already checked
+    the id, so the model's own ForeignKey check (an ``exists()`` query per
+    form) is skipped.
+    """
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        exclude.update(name for name, field in self.fields.items() if isinstance(field, CatalogChoiceField))
+        return exclude
+
+
+class CatalogFormSetMixin:
+    """
+    For inline formsets of ``CatalogFormMixin`` forms: saved references the
+    snapshot doesn't have are loaded for every row at once, one ``id__in``
+    query per field (none when the snapshot has them all), and all rows share
+    one instance per referenced id.
+    """
+
+    @cached_property
+    def forms(self):
+        forms = super().forms
+        for name, base_field in self.form.base_fields.items():
+            if not isinstance(base_field, CatalogChoiceField):
+                continue
+            attname = self.model._meta.get_field(name).attname
+            current = {f: getattr(f.instance, attname) for f in forms}
+
+            snapshot = catalog_cache.get()
+            missing = {pk for pk in current.values() if pk is not None and snapshot.lookup(base_field.kind, pk) is None}
+            known = load_entries(base_field.kind, missing)
+            instances = {}
+
+            for f in forms:
+                field = f.fields[name]
+                field.known = known
+                field.current = current[f]
+                field.instances = instances
+        return forms
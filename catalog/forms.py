@@ -1,6 +1,7 @@
 from django import forms
 from .models import Product
 from django import forms
+from .fields import CatalogChoiceField
 from .models import Product, Category
 
 class ProductForm(forms.ModelForm):
@@ -11,15 +12,24 @@ class ProductForm(forms.ModelForm):
 
 
 class ProductForm(forms.ModelForm):
+    category = CatalogChoiceField("category")
+
     class Meta:
         model = Product
         fields = ["category", "name", "sku", "sale_price", "cost_price", "is_active"]
 
 
 class CategoryForm(forms.ModelForm):
+    parent = CatalogChoiceField("category", required=False)
+
     class Meta:
         model = Category
         fields = ["name", "parent", "is_active"]
         widgets = {
             "name": forms.TextInput(attrs={"placeholder": "Category name"}),
         }
+
+
+class ProductImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV or JSON: sku, name, category (A > B > C), sale_price, cost_price, is_active")
+    dry_run = forms.BooleanField(required=False, initial=True, label="Dry run (only show what would change)")
@@ -0,0 +1,336 @@
+# catalog/importer.py
+"""
+Bulk product / category import from CSV or JSON.
+
+One row per product, keyed by SKU:
+
+    sku,name,category,sale_price,cost_price,is_active
+    KC-01,Kacchi Biryani,Food > Rice > Biryani,350,220,1
+
+``category`` is the full path from the root, levels separated by ``>``;
+missing levels are created (with their parents). A row with only a
+``category`` just makes sure that category exists. JSON files hold the same
+keys, either as one array of objects or as one object per line.
+
+The file is read row by row and applied in batches: one ``sku__in`` query per
+batch to diff against the DB, then ``bulk_create`` for new SKUs and
+``bulk_update`` for changed ones only. For an existing SKU a blank or
+missing column keeps the current value, so a ``sku,sale_price`` file is a
+reprice.
+
+Everything runs in one transaction. Any row error (or ``dry_run``) rolls the
+whole import back, and the report shows what would have happened. Bulk
+writes skip model signals, so the catalog cache generation is bumped once
+after commit instead of per row (the FTS index follows the table through
+its SQL triggers).
+"""
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache
+from .models import Category, Product
+
+BATCH_SIZE = 1000
+PATH_SEP = ">"
+MAX_ERRORS = 100
+
+_TRUE = {"1", "true", "yes", "y", "active"}
+_FALSE = {"0", "false", "no", "n", "inactive"}
+
+
+class RowError(Exception):
+    """A row that can't be imported (reported with its line number)."""
+
+
+# =====================================================
+# PARSING
+# =====================================================
+def _text_stream(fileobj):
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    return io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+
+
+def iter_csv(fileobj):
+    """(line_no, row dict) for every data row."""
+    reader = csv.DictReader(_text_stream(fileobj))
+    for row in reader:
+        yield reader.line_num, {(k or "").strip().lower(): v for k, v in row.items()}
+
+
+def iter_json(fileobj, chunk_size=64 * 1024):
+    """
+    (item_no, object) from a JSON array or JSON lines, decoding one object at
+    a time from a small read buffer (the file is never loaded whole).
+    """
+    stream = _text_stream(fileobj)
+    decoder = json.JSONDecoder()
+    buf, pos, n, eof = "", 0, 0, False
+
+    while True:
+        # skip separators between objects
+        while pos < len(buf) and (buf[pos].isspace() or buf[pos] in "[],"):
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                return
+            buf, pos = stream.read(chunk_size), 0
+            eof = not buf
+            continue
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            more = "" if eof else stream.read(chunk_size)
+            if not more:
+                raise ValueError(f"Invalid JSON near item {n + 1}.")
+            buf, pos = buf[pos:] + more, 0
+            continue
+        n += 1
+        if not isinstance(obj, dict):
+            raise ValueError(f"Item {n} is not an object.")
+        yield n, {str(k).strip().lower(): v for k, v in obj.items()}
+        pos = end
+
+
+PARSERS = {"csv": iter_csv, "json": iter_json}
+
+
+def detect_format(filename):
+    name = (filename or "").lower()
+    return "json" if name.endswith((".json", ".jsonl", ".ndjson")) else "csv"
+
+
+# =====================================================
+# ROW CLEANING
+# =====================================================
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _decimal(value, label):
+    try:
+        d = Decimal(str(value).strip().replace(",", ""))
+    except (InvalidOperation, ValueError):
+        raise RowError(f"{label} is not a number: {value!r}")
+    if not d.is_finite() or d < 0:
+        raise RowError(f"{label} must be zero or more: {value!r}")
+    return d.quantize(Decimal("0.01"))
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise RowError(f"is_active must be yes/no: {value!r}")
+
+
+def category_path(value):
+    parts = tuple(p.strip() for p in str(value).split(PATH_SEP))
+    if any(not p for p in parts):
+        raise RowError(f"Bad category path: {value!r}")
+    if any(len(p) > 150 for p in parts):
+        raise RowError("Category names are limited to 150 characters.")
+    return parts
+
+
+def clean_row(raw):
+    """
+    Normalise one input row to {"sku", field: value...}; only the columns
+    that were given (and not blank) are present.
+    """
+    row = {}
+    sku = raw.get("sku")
+    if not _blank(sku):
+        row["sku"] = str(sku).strip()
+        if len(row["sku"]) > 100:
+            raise RowError("SKU is limited to 100 characters.")
+
+    if not _blank(raw.get("name")):
+        row["name"] = str(raw["name"]).strip()
+        if len(row["name"]) > 150:
+            raise RowError("Name is limited to 150 characters.")
+    if not _blank(raw.get("category")):
+        row["category"] = category_path(raw["category"])
+    if not _blank(raw.get("sale_price")):
+        row["sale_price"] = _decimal(raw["sale_price"], "sale_price")
+    if not _blank(raw.get("cost_price")):
+        row["cost_price"] = _decimal(raw["cost_price"], "cost_price")
+    if not _blank(raw.get("is_active")):
+        row["is_active"] = _bool(raw["is_active"])
+
+    if "sku" not in row and set(row) - {"category"}:
+        raise RowError("SKU is required for products.")
+    if not row:
+        raise RowError("Empty row.")
+    return row
+
+
+# =====================================================
+# CATEGORIES
+# =====================================================
+class CategoryTree:
+    """Category ids by full path, creating missing levels in bulk."""
+
+    def __init__(self, report):
+        self.report = report
+        self.by_path = {}
+        rows = Category.objects.order_by("id").values_list("id", "name", "parent_id")
+        names = {pk: (name, parent_id) for pk, name, parent_id in rows}
+
+        def path_of(pk, seen=()):
+            name, parent_id = names[pk]
+            if parent_id is None or parent_id not in names or parent_id in seen:
+                return (name.strip(),)
+            return path_of(parent_id, seen + (pk,)) + (name.strip(),)
+
+        for pk in names:
+            # lowest id wins when two siblings share a name
+            self.by_path.setdefault(path_of(pk), pk)
+
+    def resolve(self, paths):
+        """Make sure every path exists; one INSERT per missing depth."""
+        missing = set()
+        for path in paths:
+            for depth in range(1, len(path) + 1):
+                if path[:depth] not in self.by_path:
+                    missing.add(path[:depth])
+
+        for depth in sorted({len(p) for p in missing}):
+            level = sorted(p for p in missing if len(p) == depth)
+            created = Category.objects.bulk_create([
+                Category(name=p[-1], parent_id=self.by_path.get(p[:-1])) for p in level
+            ])
+            for path, obj in zip(level, created):
+                self.by_path[path] = obj.pk
+            self.report.categories_created += len(created)
+
+    def __getitem__(self, path):
+        return self.by_path[path]
+
+
+# =====================================================
+# IMPORT
+# =====================================================
+class ImportReport:
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.categories_created = 0
+        self.errors = []          # (line, message)
+        self.error_count = 0
+        self.committed = False
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((line, message))
+
+    def summary(self):
+        verb = "would be" if not self.committed else "were"
+        return (
+            f"{self.rows} rows: {self.created} products created, {self.updated} updated, "
+            f"{self.unchanged} unchanged, {self.categories_created} categories created "
+            f"({verb} applied); {self.error_count} errors"
+        )
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _apply_batch(batch, tree, report):
+    tree.resolve({row["category"] for _, row in batch if "category" in row})
+
+    products = [(line, row) for line, row in batch if "sku" in row]
+    existing = Product.objects.in_bulk([row["sku"] for _, row in products], field_name="sku")
+
+    now = timezone.now()
+    to_create, to_update, fields = [], [], set()
+    for line, row in products:
+        values = dict(row)
+        if "category" in values:
+            values["category_id"] = tree[values.pop("category")]
+        values.pop("sku")
+
+        product = existing.get(row["sku"])
+        if product is None:
+            missing = [f for f in ("name", "category_id", "sale_price") if f not in values]
+            if missing:
+                report.error(line, f"New SKU {row['sku']} needs {', '.join(missing).replace('_id', '')}.")
+                continue
+            to_create.append(Product(sku=row["sku"], created_at=now, **values))
+            continue
+
+        changed = [f for f, v in values.items() if getattr(product, f) != v]
+        if not changed:
+            report.unchanged += 1
+            continue
+        for f in changed:
+            setattr(product, f, values[f])
+        product.updated_at = now   # auto_now isn't applied by bulk_update
+        fields.update(changed)
+        to_update.append(product)
+
+    Product.objects.bulk_create(to_create)
+    if to_update:
+        Product.objects.bulk_update(to_update, sorted(fields) + ["updated_at"])
+    report.created += len(to_create)
+    report.updated += len(to_update)
+
+
+def import_catalog(fileobj, fmt="csv", dry_run=False, batch_size=BATCH_SIZE):
+    """
+    Import ``fileobj`` (binary or text). Returns an ``ImportReport``; nothing
+    is written if ``dry_run`` or if any row failed.
+    """
+    report = ImportReport(dry_run)
+    seen = {}
+
+    try:
+        with transaction.atomic():
+            tree = CategoryTree(report)
+            batch = []
+            try:
+                for line, raw in PARSERS[fmt](fileobj):
+                    report.rows += 1
+                    try:
+                        row = clean_row(raw)
+                    except RowError as e:
+                        report.error(line, str(e))
+                        continue
+
+                    sku = row.get("sku")
+                    if sku is not None:
+                        if sku in seen:
+                            report.error(line, f"Duplicate SKU {sku} (first on line {seen[sku]}).")
+                            continue
+                        seen[sku] = line
+
+                    batch.append((line, row))
+                    if len(batch) >= batch_size:
+                        _apply_batch(batch, tree, report)
+                        batch = []
+                _apply_batch(batch, tree, report)
+            except (ValueError, csv.Error, UnicodeDecodeError) as e:
+                report.error(None, f"Could not read file: {e}")
+
+            if dry_run or report.error_count:
+                raise _Rollback
+            cache.bump_on_commit()
+    except _Rollback:
+        pass
+    else:
+        report.committed = True
+    return report
@@ -0,0 +1,55 @@
+# catalog/management/commands/bench_catalog_import.py
+"""
+Benchmark the bulk catalog import.
+
+Generates a CSV of ``--rows`` products spread over a three level category
+tree, imports it (all creates), then imports a reprice of every row (all
+updates), inside a transaction that is rolled back at the end:
+
+    python manage.py bench_catalog_import --rows 10000
+"""
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from catalog.importer import BATCH_SIZE, import_catalog
+
+
+def _csv(rows, price_bump=0):
+    out = io.StringIO()
+    out.write("sku,name,category,sale_price,cost_price,is_active\n")
+    for i in range(rows):
+        category = f"Menu {i % 5} > Section {i % 40} > Group {i % 200}"
+        out.write(f"BENCH-{i:06d},Bench Item {i},{category},{100 + i % 500 + price_bump},{50 + i % 250},1\n")
+    return io.BytesIO(out.getvalue().encode())
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Time a bulk product import (create, then reprice) and roll it back."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def _run(self, label, fileobj, batch_size):
+        started = time.perf_counter()
+        report = import_catalog(fileobj, "csv", batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:<8} {report.summary()}")
+        self.stdout.write(f"{'':<8} {elapsed:.2f}s, {report.rows / elapsed:,.0f} rows/s")
+
+    def handle(self, *args, **opts):
+        rows = opts["rows"]
+        try:
+            with transaction.atomic():
+                self._run("create", _csv(rows), opts["batch_size"])
+                self._run("reprice", _csv(rows, price_bump=10), opts["batch_size"])
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write("rolled back")
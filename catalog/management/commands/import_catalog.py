@@ -0,0 +1,40 @@
+# catalog/management/commands/import_catalog.py
+"""
+Import products and categories from a CSV / JSON file (see catalog.importer):
+
+    python manage.py import_catalog menu.csv --dry-run
+    python manage.py import_catalog eid-prices.csv
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.importer import BATCH_SIZE, PARSERS, detect_format, import_catalog
+
+
+class Command(BaseCommand):
+    help = "Bulk create / update products (by SKU) and categories from CSV or JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=list(PARSERS), help="Default: from the file extension.")
+        parser.add_argument("--dry-run", action="store_true", help="Report the changes, write nothing.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        fmt = opts["format"] or detect_format(opts["path"])
+        started = time.perf_counter()
+        try:
+            with open(opts["path"], "rb") as fh:
+                report = import_catalog(fh, fmt, dry_run=opts["dry_run"], batch_size=opts["batch_size"])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for line, message in report.errors:
+            self.stderr.write(f"line {line}: {message}" if line else message)
+        if report.error_count > len(report.errors):
+            self.stderr.write(f"... and {report.error_count - len(report.errors)} more")
+
+        self.stdout.write(f"{report.summary()} in {time.perf_counter() - started:.2f}s")
+        if report.error_count:
+            raise CommandError("Import rolled back, fix the errors above.")
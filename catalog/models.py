@@ -41,3 +41,16 @@ class Product(TimeStampedModel):
 
     def __str__(self):
         return self.name
+
+
+class CatalogVersion(models.Model):
+    """
+    One row. ``generation`` goes up after every committed change to products,
+    categories or payment methods; each worker process compares it with the
+    generation its cached copy was built from (``catalog.cache``).
+    """
+    generation = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"catalog generation {self.generation}"
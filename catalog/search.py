@@ -0,0 +1,160 @@
+# catalog/search.py
+"""
+Per-process search index for the POS product picker.
+
+Holds every active product in memory and answers Select2 keystrokes without
+touching the DB. Ranking (best first):
+
+    0. exact SKU match
+    1. name starts with the whole query
+    2. every query word is a prefix of a word in the name / SKU
+    3. plain substring of name / SKU (same as the old ``icontains``)
+
+Within a rank results are ordered by name. The index is built from the
+catalog cache's product list (``catalog.cache``) and rebuilt whenever that
+snapshot is replaced, so it follows the same cross-process generation check.
+"""
+import heapq
+import re
+import threading
+from bisect import bisect_left, bisect_right
+
+from .cache import catalog_cache
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _words(text):
+    return _WORD_RE.findall((text or "").lower())
+
+
+class _Snapshot:
+    """
+    One immutable build of the index; searches hold a reference to a single
+    snapshot so a concurrent rebuild can't mix two builds.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        entries = sorted(catalog.products, key=lambda e: (e.name_key, e.id))
+        self.entries = entries
+        self.name_keys = [e.name_key for e in entries]
+        self.by_sku = {}
+
+        word_map = {}
+        lines = []
+        self.line_starts = []
+        offset = 0
+        for pos, e in enumerate(entries):
+            if e.sku_key:
+                self.by_sku[e.sku_key] = pos
+            for w in set(_words(e.name) + _words(e.sku)):
+                word_map.setdefault(w, []).append(pos)
+
+            line = f"{e.name_key}\t{e.sku_key}"
+            lines.append(line)
+            self.line_starts.append(offset)
+            offset += len(line) + 1
+
+        self.word_keys = sorted(word_map)
+        self.word_pos = [word_map[w] for w in self.word_keys]
+        self.haystack = "\n".join(lines)   # for substring search
+
+    def word_prefix_positions(self, word):
+        keys = self.word_keys
+        found = set()
+        i = bisect_left(keys, word)
+        while i < len(keys) and keys[i].startswith(word):
+            found.update(self.word_pos[i])
+            i += 1
+        return found
+
+    def name_prefix_positions(self, q):
+        i = bisect_left(self.name_keys, q)
+        while i < len(self.name_keys) and self.name_keys[i].startswith(q):
+            yield i
+            i += 1
+
+    def substring_positions(self, q):
+        hay, starts = self.haystack, self.line_starts
+        i = hay.find(q)
+        while i != -1:
+            pos = bisect_right(starts, i) - 1
+            yield pos
+            if pos + 1 >= len(starts):
+                return
+            i = hay.find(q, starts[pos + 1])
+
+
+class ProductSearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    # -----------------------------
+    # BUILD / INVALIDATE
+    # -----------------------------
+    def invalidate(self):
+        catalog_cache.invalidate()
+
+    def _get_snapshot(self):
+        catalog = catalog_cache.get()
+        snap = self._snapshot
+        if snap is None or snap.catalog is not catalog:
+            with self._lock:
+                snap = self._snapshot
+                if snap is None or snap.catalog is not catalog:
+                    snap = _Snapshot(catalog)
+                    self._snapshot = snap
+        return snap
+
+    # -----------------------------
+    # QUERY
+    # -----------------------------
+    def search(self, q, limit=10, offset=0):
+        """
+        Returns (entries, more) for one page of results.
+        """
+        snap = self._get_snapshot()
+        entries = snap.entries
+        end = offset + limit
+
+        q = (q or "").strip().lower()
+        if not q:
+            return entries[offset:end], len(entries) > end
+
+        # collect one result past the page so "more" needs no count
+        need = end + 1
+        ranked = []
+        seen = set()
+
+        def add(positions):
+            for pos in positions:
+                if len(ranked) >= need:
+                    return
+                if pos not in seen:
+                    seen.add(pos)
+                    ranked.append(pos)
+
+        sku_pos = snap.by_sku.get(q)
+        if sku_pos is not None:
+            add([sku_pos])
+
+        add(snap.name_prefix_positions(q))
+
+        query_words = _words(q)
+        if query_words and len(ranked) < need:
+            hits = snap.word_prefix_positions(query_words[0])
+            for w in query_words[1:]:
+                if not hits:
+                    break
+                hits &= snap.word_prefix_positions(w)
+            add(heapq.nsmallest(need + len(seen), hits))
+
+        if len(ranked) < need:
+            add(snap.substring_positions(q))
+
+        return [entries[pos] for pos in ranked[offset:end]], len(ranked) > end
+
+
+product_index = ProductSearchIndex()
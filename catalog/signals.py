@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from payments.models import PaymentMethod
+
+from . import cache
+from .models import Category, Product
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=PaymentMethod)
+def catalog_changed(sender, instance, using, **kwargs):
+    # bump after commit so a rolled back change never lands in any cache
+    cache.bump_on_commit(using)
@@ -1,3 +1,235 @@
+import io
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
 from django.test import TestCase
+from django.urls import reverse
+
+from orders.forms import PaymentForm
+from payments.models import PaymentMethod
+
+from . import cache
+from .cache import catalog_cache
+from .fields import CatalogChoiceField
+from .importer import import_catalog
+from .models import CatalogVersion, Category, Product
+from .search import product_index
+
+
+class ProductSearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cat = Category.objects.create(name="Main")
+        for name, sku in [
+            ("Chicken Biryani", "CB1"),
+            ("Beef Biryani", "BB1"),
+            ("Biryani Special", "BS1"),
+            ("Plain Rice", "RICE"),
+            ("Fried Chicken", "FC1"),
+        ]:
+            Product.objects.create(category=cls.cat, name=name, sku=sku, sale_price=Decimal("100.00"))
+        Product.objects.create(category=cls.cat, name="Old Biryani", sku="OLD", sale_price=1, is_active=False)
+
+    def setUp(self):
+        product_index.invalidate()
+
+    def names(self, q, **kwargs):
+        return [e.name for e in product_index.search(q, **kwargs)[0]]
+
+    def test_ranking(self):
+        self.assertEqual(self.names("biryani"), ["Biryani Special", "Beef Biryani", "Chicken Biryani"])
+        self.assertEqual(self.names("chi bir"), ["Chicken Biryani"])
+
+    def test_sku_exact_match_first(self):
+        self.assertEqual(self.names("rice"), ["Plain Rice"])
+        self.assertEqual(self.names("fc1"), ["Fried Chicken"])
+
+    def test_substring_fallback(self):
+        self.assertEqual(self.names("icken"), ["Chicken Biryani", "Fried Chicken"])
+
+    def test_pagination_without_count(self):
+        entries, more = product_index.search("", limit=2, offset=0)
+        self.assertEqual(len(entries), 2)
+        self.assertTrue(more)
+        entries, more = product_index.search("", limit=2, offset=4)
+        self.assertEqual(len(entries), 1)
+        self.assertFalse(more)
+
+    def test_warm_search_hits_no_db(self):
+        product_index.search("x")
+        with self.assertNumQueries(0):
+            product_index.search("biryani")
+
+    def test_invalidated_on_save_and_delete(self):
+        self.assertEqual(self.names("kebab"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            p = Product.objects.create(category=self.cat, name="Kebab", sku="KB", sale_price=50)
+        self.assertEqual(self.names("kebab"), ["Kebab"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            p.delete()
+        self.assertEqual(self.names("kebab"), [])
+
+    def test_endpoint(self):
+        user = get_user_model().objects.create_user("cashier", password="pw")
+        self.client.force_login(user)
+
+        res = self.client.get(reverse("orders:product_search"), {"q": "CB1"})
+        data = res.json()
+        self.assertEqual(data["results"][0]["text"], "Chicken Biryani (CB1)")
+        self.assertEqual(data["results"][0]["price"], "100.00")
+        self.assertFalse(data["pagination"]["more"])
+
+
+class CatalogCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cat = Category.objects.create(name="Main")
+        cls.naan = Product.objects.create(category=cls.cat, name="Naan", sku="N1", sale_price=Decimal("20.00"))
+        cls.old = Product.objects.create(category=cls.cat, name="Old", sku="O1", sale_price=1, is_active=False)
+        cls.cash = PaymentMethod.objects.create(name="Cash")
+
+    def setUp(self):
+        catalog_cache.invalidate()
+
+    def price(self, product):
+        return self.client.get(reverse("catalog:product_price"), {"id": product.pk}).json()
+
+    def other_worker_changes_price(self, product, price):
+        # another process: no signals here, only the row and the generation move
+        Product.objects.filter(pk=product.pk).update(sale_price=price)
+        CatalogVersion.objects.filter(pk=cache.VERSION_PK).update(generation=F("generation") + 1)
+
+    def test_warm_request_only_checks_the_generation(self):
+        self.assertEqual(self.price(self.naan), {"found": True, "id": self.naan.pk, "price": "20.00"})
+        with self.assertNumQueries(1):
+            self.assertFalse(self.price(self.old)["found"])
+
+    def test_generation_bump_from_another_process_is_picked_up(self):
+        catalog_cache.get()
+        self.other_worker_changes_price(self.naan, Decimal("25.00"))
+        self.assertEqual(catalog_cache.product(self.naan.pk).price, "20.00")   # same request
+        self.assertEqual(self.price(self.naan)["price"], "25.00")              # next request
+
+    def test_changes_bump_the_generation_after_commit(self):
+        start = cache.current_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.naan.sale_price = Decimal("30.00")
+            self.naan.save()
+            PaymentMethod.objects.create(name="bKash")
+        self.assertEqual(cache.current_generation(), start + 2)
+        self.assertEqual(catalog_cache.product(self.naan.pk).sale_price, Decimal("30.00"))
+        self.assertEqual([m.name for m in catalog_cache.get().payment_methods], ["Cash", "bKash"])
+
+    def test_forms_validate_from_the_cache(self):
+        catalog_cache.get()
+        field = CatalogChoiceField("product")
+        with self.assertNumQueries(0):
+            product = field.clean(str(self.naan.pk))
+            choices = list(PaymentForm().fields["payment_method"].choices)
+            method = CatalogChoiceField("payment_method").clean(self.cash.pk)
+        self.assertEqual((product.pk, product.sale_price), (self.naan.pk, Decimal("20.00")))
+        self.assertEqual(choices, [("", "---------"), (self.cash.pk, "Cash")])
+        self.assertEqual(method, self.cash)
+        with self.assertRaises(ValidationError):
+            field.clean(str(self.old.pk))
+
+
+class CatalogImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.food = Category.objects.create(name="Food")
+        cls.rice = Category.objects.create(name="Rice", parent=cls.food)
+        Product.objects.create(category=cls.rice, name="Kacchi", sku="KC-01", sale_price=Decimal("350.00"))
+        Product.objects.create(category=cls.rice, name="Plain Rice", sku="PR-01", sale_price=Decimal("40.00"))
+
+    def run_import(self, text, fmt="csv", **kwargs):
+        return import_catalog(io.BytesIO(text.encode()), fmt, **kwargs)
+
+    def test_creates_updates_and_builds_category_paths(self):
+        report = self.run_import(
+            "sku,name,category,sale_price,cost_price,is_active\n"
+            "KC-01,Kacchi,Food > Rice,380,,\n"                    # reprice
+            "PR-01,Plain Rice,Food > Rice,40.00,,\n"              # unchanged
+            "FS-01,Firni,Food > Dessert > Sweet,60,25,yes\n"      # new, two new categories
+            ",,Drinks,,,\n"                                       # category only
+        )
+        self.assertTrue(report.committed, report.errors)
+        self.assertEqual((report.created, report.updated, report.unchanged), (1, 1, 1))
+        self.assertEqual(report.categories_created, 3)
+
+        self.assertEqual(Product.objects.get(sku="KC-01").sale_price, Decimal("380.00"))
+        firni = Product.objects.select_related("category__parent__parent").get(sku="FS-01")
+        self.assertEqual(firni.category.name, "Sweet")
+        self.assertEqual(firni.category.parent.name, "Dessert")
+        self.assertEqual(firni.category.parent.parent, self.food)
+        self.assertTrue(Category.objects.filter(name="Drinks", parent=None).exists())
+
+    def test_queries_do_not_grow_with_rows(self):
+        def csv_rows(n, price):
+            return "sku,name,category,sale_price\n" + "".join(
+                f"N{i},Item {i},Food > Bulk,{price}\n" for i in range(n)
+            )
+
+        self.run_import(csv_rows(200, 10))
+        with self.assertNumQueries(7):
+            # savepoint, category load, new category, diff, create, update, release
+            self.run_import(csv_rows(5, 11) + "X1,New,Food > Bulk > More,1\n")
+        with self.assertNumQueries(7):
+            self.run_import(csv_rows(200, 12) + "X2,New,Food > Bulk > Other,1\n")
+
+    def test_json_array_and_lines(self):
+        report = self.run_import('[{"sku": "J1", "name": "Borhani", "category": "Drinks", "sale_price": 50},\n'
+                                 ' {"sku": "KC-01", "is_active": false}]', "json")
+        self.assertTrue(report.committed, report.errors)
+        self.assertFalse(Product.objects.get(sku="KC-01").is_active)
+
+        report = self.run_import('{"sku": "J2", "name": "Lassi", "category": "Drinks", "sale_price": "70"}\n'
+                                 '{"sku": "J1", "sale_price": 55}\n', "json")
+        self.assertEqual((report.created, report.updated), (1, 1))
+        self.assertEqual(Category.objects.filter(name="Drinks").count(), 1)
+
+    def test_errors_roll_back_everything(self):
+        report = self.run_import(
+            "sku,name,category,sale_price\n"
+            "N1,New,Food > New,10\n"
+            "N2,No price,Food,abc\n"
+            "N1,Again,Food,10\n"
+            "N3,,,5\n"
+        )
+        self.assertFalse(report.committed)
+        self.assertEqual([line for line, _ in report.errors], [3, 4, 5])
+        self.assertFalse(Product.objects.filter(sku="N1").exists())
+        self.assertFalse(Category.objects.filter(name="New").exists())
+
+    def test_dry_run_reports_without_writing(self):
+        report = self.run_import("sku,sale_price\nKC-01,999\n", dry_run=True)
+        self.assertEqual(report.updated, 1)
+        self.assertFalse(report.committed)
+        self.assertEqual(Product.objects.get(sku="KC-01").sale_price, Decimal("350.00"))
+
+    def test_search_index_invalidated_once_after_commit(self):
+        product_index.search("x")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.run_import("sku,name,category,sale_price\nNB-1,Naan Bread,Food,20\nNB-2,Naan Butter,Food,25\n")
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(len(product_index.search("naan")[0]), 2)
+
+    def test_upload_view(self):
+        user = get_user_model().objects.create_user("manager", password="pw")
+        self.client.force_login(user)
+        upload = SimpleUploadedFile("menu.csv", b"sku,name,category,sale_price\nV1,Halim,Food,80\n")
+
+        res = self.client.post(reverse("catalog:product_import"), {"file": upload, "dry_run": "on"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.context["report"].created, 1)
+        self.assertFalse(Product.objects.filter(sku="V1").exists())
 
-# Create your tests here.
+        upload.seek(0)
+        res = self.client.post(reverse("catalog:product_import"), {"file": upload})
+        self.assertRedirects(res, reverse("catalog:product_list"))
+        self.assertTrue(Product.objects.filter(sku="V1").exists())
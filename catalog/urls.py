@@ -27,6 +27,11 @@ urlpatterns = [
         views.product_create,
         name="product_create"
     ),
+    path(
+        "import/",
+        views.product_import,
+        name="product_import"
+    ),
     path(
         "<int:pk>/edit/",
         views.product_update,
@@ -1,12 +1,18 @@
+from urllib.parse import urlencode
+
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_GET, require_http_methods
 
+from search.query import search_filter
+from vhojon import keyset
+
+from .cache import catalog_cache
 from .models import Product, Category
-from .forms import ProductForm, CategoryForm
+from .forms import ProductForm, CategoryForm, ProductImportForm
+from .importer import detect_format, import_catalog
 
 
 # ============================================================
@@ -14,15 +20,12 @@ from .forms import ProductForm, CategoryForm
 # ============================================================
 @require_GET
 def product_price(request):
-    pid = request.GET.get("id")
-    if not pid:
-        return JsonResponse({"found": False})
-
-    p = Product.objects.filter(id=pid, is_active=True).first()
+    # active products only, from the catalog cache
+    p = catalog_cache.product(request.GET.get("id"))
     if not p:
         return JsonResponse({"found": False})
 
-    return JsonResponse({"found": True, "id": p.id, "price": str(p.sale_price)})
+    return JsonResponse({"found": True, "id": p.id, "price": p.price})
 
 
 # ============================================================
@@ -34,23 +37,17 @@ def product_price(request):
 def product_list(request):
     q = request.GET.get("q", "").strip()
 
-    qs = Product.objects.select_related("category").order_by("-id")
+    qs = Product.objects.select_related("category")
     if q:
-        qs = qs.filter(
-            Q(name__icontains=q)
-            | Q(sku__icontains=q)
-            | Q(category__name__icontains=q)
-        )
+        qs = search_filter(qs, "products", q)
 
-    paginator = Paginator(qs, 10)  # per page
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page = keyset.paginate(qs, "-id", after=request.GET.get("after"), before=request.GET.get("before"), size=10)
 
     context = {
-        "products": page_obj.object_list,
-        "page_obj": page_obj,
-        "is_paginated": page_obj.has_other_pages(),
+        "products": page.object_list,
+        "page": page,
         "q": q,
+        "filter_query": urlencode({"q": q}) if q else "",
     }
     return render(request, "products/product_list.html", context)
 
@@ -89,6 +86,30 @@ def product_update(request, pk):
     return render(request, "products/product_form.html", {"form": form, "object": product})
 
 
+# ---------- BULK IMPORT ----------
+@require_http_methods(["GET", "POST"])
+def product_import(request):
+    report = None
+    if request.method == "POST":
+        form = ProductImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            report = import_catalog(
+                upload.file,
+                detect_format(upload.name),
+                dry_run=form.cleaned_data["dry_run"],
+            )
+            if report.committed:
+                messages.success(request, f"✅ Import done: {report.summary()}.")
+                return redirect("catalog:product_list")
+            if report.error_count:
+                messages.error(request, "❌ Nothing was imported, fix the rows below.")
+    else:
+        form = ProductImportForm()
+
+    return render(request, "products/product_import.html", {"form": form, "report": report})
+
+
 # ---------- DELETE ----------
 @require_http_methods(["GET", "POST"])
 def product_delete(request, pk):
@@ -111,22 +132,20 @@ def product_delete(request, pk):
 def category_list(request):
     q = request.GET.get("q", "").strip()
 
-    qs = Category.objects.select_related("parent").order_by("-id")
+    qs = Category.objects.select_related("parent")
     if q:
         qs = qs.filter(
             Q(name__icontains=q) |
             Q(parent__name__icontains=q)
         )
 
-    paginator = Paginator(qs, 10)  # per page
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page = keyset.paginate(qs, "-id", after=request.GET.get("after"), before=request.GET.get("before"), size=10)
 
     context = {
-        "categories": page_obj.object_list,
-        "page_obj": page_obj,
-        "is_paginated": page_obj.has_other_pages(),
+        "categories": page.object_list,
+        "page": page,
         "q": q,
+        "filter_query": urlencode({"q": q}) if q else "",
     }
     return render(request, "products/category_list.html", context)
 
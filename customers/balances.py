@@ -0,0 +1,121 @@
+# customers/balances.py
+"""
+Stored per-customer order totals.
+
+``Customer.outstanding_due``, ``lifetime_spend`` and ``order_count`` are the
+sums of ``due_total``, ``grand_total`` and 1 over the customer's orders that
+are not cancelled. They are kept in step from the Order signals
+(``orders.signals``): the stored order row is read before a save, and the
+difference between what it and the new row contribute is applied as one
+
+    UPDATE customer SET outstanding_due = outstanding_due + x, ...
+
+per affected customer, in the same transaction as the order write
+(``recalc_totals`` / ``recalc_payments`` are atomic). Moving an order to
+another customer, cancelling it or deleting it is just another difference.
+
+``drift()`` compares the stored columns with the orders table (one GROUP BY
+query) and ``reconcile()`` rewrites the rows that differ; see
+``manage.py reconcile_customer_totals``. Bulk writes that skip signals call
+``reconcile()`` afterwards. Both take ``apps`` so a migration can use them.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps as global_apps
+from django.db.models import Count, F, Sum
+
+ZERO = Decimal("0.00")
+CANCELLED = "cancelled"   # Order.Status.CANCELLED, spelled out for historical models
+
+# Order fields that change what an order contributes
+TRACKED_FIELDS = frozenset({"customer", "status", "due_total", "grand_total"})
+_COLUMNS = ("customer_id", "status", "due_total", "grand_total")
+
+
+def contribution(customer_id, status, due_total, grand_total):
+    """(customer_id, due, spend, count) one order adds, or None."""
+    if customer_id is None or status == CANCELLED:
+        return None
+    return customer_id, due_total or ZERO, grand_total or ZERO, 1
+
+
+def of(order):
+    return contribution(*(getattr(order, c) for c in _COLUMNS))
+
+
+def stored(order):
+    """What the order's row in the DB contributes right now."""
+    row = type(order)._base_manager.filter(pk=order.pk).values_list(*_COLUMNS).first()
+    return contribution(*row) if row is not None else None
+
+
+def move(old, new):
+    """Apply an order change; ``old`` / ``new`` are ``contribution()`` results."""
+    if old == new:
+        return
+    from .models import Customer
+
+    deltas = defaultdict(lambda: [ZERO, ZERO, 0])
+    for entry, sign in ((old, -1), (new, 1)):
+        if entry is not None:
+            cid, due, spend, n = entry
+            d = deltas[cid]
+            d[0] += sign * due
+            d[1] += sign * spend
+            d[2] += sign * n
+
+    for cid, (due, spend, n) in deltas.items():
+        if due or spend or n:
+            Customer.objects.filter(pk=cid).update(
+                outstanding_due=F("outstanding_due") + due,
+                lifetime_spend=F("lifetime_spend") + spend,
+                order_count=F("order_count") + n,
+            )
+
+
+# =====================================================
+# RECONCILE
+# =====================================================
+def expected(apps=global_apps):
+    """{customer_id: (due, spend, count)} recomputed from the orders."""
+    Order = apps.get_model("orders", "Order")
+    rows = (
+        Order.objects
+        .filter(customer__isnull=False)
+        .exclude(status=CANCELLED)
+        .values("customer_id")
+        .annotate(due=Sum("due_total"), spend=Sum("grand_total"), n=Count("id"))
+        .order_by()
+    )
+    return {r["customer_id"]: (r["due"] or ZERO, r["spend"] or ZERO, r["n"]) for r in rows}
+
+
+def drift(apps=global_apps, batch_size=2000):
+    """[(customer_id, stored, expected)] for every customer whose columns are off."""
+    Customer = apps.get_model("customers", "Customer")
+    want = expected(apps)
+    found = []
+    columns = Customer.objects.order_by("pk").values_list("pk", "outstanding_due", "lifetime_spend", "order_count")
+    for pk, due, spend, n in columns.iterator(chunk_size=batch_size):
+        have = (due, spend, n)
+        should = want.get(pk, (ZERO, ZERO, 0))
+        if have != should:
+            found.append((pk, have, should))
+    return found
+
+
+def reconcile(apps=global_apps, fix=True, batch_size=1000):
+    """Find (and with ``fix``, correct) drifted customers; returns ``drift()``."""
+    Customer = apps.get_model("customers", "Customer")
+    found = drift(apps)
+    if fix and found:
+        Customer.objects.bulk_update(
+            [
+                Customer(pk=pk, outstanding_due=due, lifetime_spend=spend, order_count=n)
+                for pk, _, (due, spend, n) in found
+            ],
+            ["outstanding_due", "lifetime_spend", "order_count"],
+            batch_size=batch_size,
+        )
+    return found
@@ -0,0 +1,25 @@
+# customers/management/commands/reconcile_customer_totals.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from customers import balances
+
+
+class Command(BaseCommand):
+    help = "Compare the stored customer due / spend / order count with the orders and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report drift, change nothing.")
+        parser.add_argument("--show", type=int, default=20, help="List up to this many drifted customers.")
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            found = balances.reconcile(fix=not opts["check"])
+
+        for pk, have, should in found[: opts["show"]]:
+            self.stdout.write(
+                f"customer {pk}: due {have[0]} -> {should[0]}, spend {have[1]} -> {should[1]}, "
+                f"orders {have[2]} -> {should[2]}"
+            )
+        verb = "found" if opts["check"] else "fixed"
+        self.stdout.write(f"{verb} {len(found)} drifted customers")
@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-18 00:00
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+from search import schema
+
+
+def fill_balances(apps, schema_editor):
+    from customers import balances
+
+    balances.reconcile(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_remove_customer_email_and_more'),
+        ('orders', '0005_print_job'),
+        ('search', '0001_fts5_tables'),
+    ]
+
+    operations = [
+        # the AddFields rebuild customers_customer on SQLite (search.schema)
+        migrations.RunPython(schema.suspend_triggers, schema.restore_triggers),
+        migrations.AddField(
+            model_name='customer',
+            name='lifetime_spend',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='order_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='outstanding_due',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=12),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['outstanding_due', 'id'], name='customer_due_idx'),
+        ),
+        migrations.RunPython(schema.restore_triggers, schema.suspend_triggers),
+        migrations.RunPython(fill_balances, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,5 @@
 from decimal import Decimal
 from django.db import models
-from django.db.models import Sum
 from django.utils import timezone
 
 
@@ -12,27 +11,42 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+BALANCE_FIELDS = ("outstanding_due", "lifetime_spend", "order_count")
+
+
 class Customer(TimeStampedModel):
     name = models.CharField(max_length=150)
     phone = models.CharField(max_length=20, unique=True)
 
+    # totals over non-cancelled orders, maintained by customers.balances
+    outstanding_due = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"), editable=False)
+    lifetime_spend = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"), editable=False)
+    order_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["outstanding_due", "id"], name="customer_due_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.phone})"
 
+    def save(self, *args, **kwargs):
+        # a plain save of a loaded customer must not write back balances
+        # that orders may have moved since it was read
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in BALANCE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def total_due(self) -> Decimal:
         """
         Total outstanding due across all non-cancelled orders.
         """
-        from orders.models import Order  # avoid circular import
-
-        agg = (
-            Order.objects
-            .filter(customer=self)
-            .exclude(status=Order.Status.CANCELLED)
-            .aggregate(total=Sum("due_total"))
-        )
-        return agg["total"] or Decimal("0.00")
+        return self.outstanding_due
 
 
 class CustomerAddress(TimeStampedModel):
@@ -0,0 +1,230 @@
+# customers/phone_index.py
+"""
+Per-process phone index for the counter's phone suggest / autofill.
+
+Customers are kept in a phone-sorted array, so a typed prefix is a bisect
+and the 10 suggestions are the next 10 slots. Each entry also carries the
+customer's name and primary address, so one suggest response has everything
+the order form autofills.
+
+The index loads on first use and is then patched incrementally from the
+Customer/CustomerAddress signals (see ``customers.signals``). Other worker
+processes pick up changes when their copy is older than
+``CUSTOMER_PHONE_INDEX_TTL`` seconds; until then an exact lookup that misses
+asks the DB, so a customer just added in another worker is still found.
+Reloads read the table outside the lock, and other threads keep answering
+from the old copy meanwhile.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+# shorter queries only match by prefix; a substring scan of every customer
+# for one or two digits would mostly return noise anyway
+SUBSTRING_MIN_LENGTH = 4
+
+
+class PhoneEntry:
+    __slots__ = ("id", "name", "phone", "address")
+
+    def __init__(self, id, name, phone, address=""):
+        self.id = id
+        self.name = name
+        self.phone = phone
+        self.address = address or ""
+
+    def as_suggestion(self):
+        return {"phone": self.phone, "name": self.name, "address": self.address}
+
+    def as_autofill(self):
+        return {
+            "found": True,
+            "id": self.id,
+            "name": self.name,
+            "phone": self.phone,
+            "address": self.address,
+        }
+
+
+def primary_addresses(customer_ids=None):
+    """
+    customer id -> primary address line, same pick as the order form:
+    primary first, then newest.
+    """
+    from .models import CustomerAddress
+
+    qs = CustomerAddress.objects.order_by("customer_id", "-is_primary", "-created_at")
+    if customer_ids is not None:
+        qs = qs.filter(customer_id__in=customer_ids)
+
+    result = {}
+    for cid, line in qs.values_list("customer_id", "address_line").iterator(chunk_size=2000):
+        result.setdefault(cid, line)
+    return result
+
+
+class CustomerPhoneIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()   # one load at a time
+        self._phones = None   # sorted phones
+        self._entries = []    # entries, same order as _phones
+        self._by_id = {}
+        self._built_at = 0.0
+        self._changes = None  # updates that arrive while a load reads the table
+
+    # -----------------------------
+    # BUILD
+    # -----------------------------
+    def _is_stale(self):
+        ttl = getattr(settings, "CUSTOMER_PHONE_INDEX_TTL", 300)
+        return self._phones is None or bool(ttl and time.monotonic() - self._built_at > ttl)
+
+    def invalidate(self):
+        with self._lock:
+            self._phones = None
+
+    def build(self):
+        with self._build_lock:
+            self._build()
+
+    def _build(self):
+        from .models import Customer
+
+        with self._lock:
+            self._changes = []
+        try:
+            addresses = primary_addresses()
+            entries = [
+                PhoneEntry(cid, name, phone, addresses.get(cid))
+                for cid, name, phone in Customer.objects.order_by("phone").values_list("id", "name", "phone").iterator(chunk_size=2000)
+            ]
+        except BaseException:
+            with self._lock:
+                self._changes = None
+            raise
+
+        with self._lock:
+            changes, self._changes = self._changes, None
+            self._entries = entries
+            self._phones = [e.phone for e in entries]
+            self._by_id = {e.id: e for e in entries}
+            self._built_at = time.monotonic()
+            # the rows may have been read before these were committed
+            for change in changes:
+                change()
+
+    def _ensure_built(self):
+        if not self._is_stale():
+            return
+        # the first load is waited for; a reload is done by whichever thread
+        # gets here first while the others answer from the old copy
+        if self._build_lock.acquire(blocking=self._phones is None):
+            try:
+                if self._is_stale():
+                    self._build()
+            finally:
+                self._build_lock.release()
+
+    # -----------------------------
+    # INCREMENTAL UPDATES
+    # -----------------------------
+    def _remove(self, customer_id):
+        old = self._by_id.pop(customer_id, None)
+        if old is None:
+            return
+        i = bisect_left(self._phones, old.phone)
+        while i < len(self._entries) and self._phones[i] == old.phone:
+            if self._entries[i].id == customer_id:
+                del self._phones[i]
+                del self._entries[i]
+                return
+            i += 1
+
+    def _record(self, change):
+        if self._changes is not None:
+            self._changes.append(change)
+
+    def upsert(self, customer_id, name, phone, address=None):
+        with self._lock:
+            self._record(lambda: self.upsert(customer_id, name, phone, address))
+            if self._phones is None:
+                return  # not loaded yet; the next build sees the change
+            old = self._by_id.get(customer_id)
+            if address is None:
+                address = old.address if old else ""
+            self._remove(customer_id)
+
+            entry = PhoneEntry(customer_id, name, phone, address)
+            i = bisect_left(self._phones, phone)
+            self._phones.insert(i, phone)
+            self._entries.insert(i, entry)
+            self._by_id[customer_id] = entry
+
+    def remove(self, customer_id):
+        with self._lock:
+            self._record(lambda: self.remove(customer_id))
+            if self._phones is not None:
+                self._remove(customer_id)
+
+    def set_address(self, customer_id, address):
+        with self._lock:
+            self._record(lambda: self.set_address(customer_id, address))
+            entry = self._by_id.get(customer_id) if self._phones is not None else None
+            if entry is not None:
+                entry.address = address or ""
+
+    # -----------------------------
+    # QUERY
+    # -----------------------------
+    def suggest(self, q, limit=10):
+        """
+        Phones starting with ``q`` first, then (to keep the old ``icontains``
+        behaviour) phones that contain it elsewhere. That second pass scans
+        every entry, so it only runs for ``q`` of ``SUBSTRING_MIN_LENGTH``
+        digits or more, and on a copy taken under the lock: updates and
+        ``get()`` don't wait for the scan.
+        """
+        self._ensure_built()
+        with self._lock:
+            phones, entries = self._phones, self._entries
+            i = bisect_left(phones, q)
+            result = []
+            while i < len(phones) and len(result) < limit and phones[i].startswith(q):
+                result.append(entries[i])
+                i += 1
+            if len(result) >= limit or len(q) < SUBSTRING_MIN_LENGTH:
+                return result
+            entries = list(entries)   # upsert/remove edit the list in place
+
+        for e in entries:
+            if q in e.phone and not e.phone.startswith(q):
+                result.append(e)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def get(self, phone):
+        """The customer with exactly this phone; a miss is checked in the DB."""
+        self._ensure_built()
+        with self._lock:
+            i = bisect_left(self._phones, phone)
+            if i < len(self._phones) and self._phones[i] == phone:
+                return self._entries[i]
+        return self._load(phone)
+
+    def _load(self, phone):
+        from .models import Customer
+
+        row = Customer.objects.filter(phone=phone).values_list("id", "name").first()
+        if row is None:
+            return None
+        cid, name = row
+        entry = PhoneEntry(cid, name, phone, primary_addresses([cid]).get(cid))
+        self.upsert(cid, name, phone, entry.address)
+        return entry
+
+
+phone_index = CustomerPhoneIndex()
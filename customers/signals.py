@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Customer, CustomerAddress
+from .phone_index import phone_index, primary_addresses
+
+
+# index updates wait for commit so rolled back changes never show up
+
+
+@receiver(post_save, sender=Customer)
+def customer_saved(sender, instance, **kwargs):
+    cid, name, phone = instance.pk, instance.name, instance.phone
+    transaction.on_commit(lambda: phone_index.upsert(cid, name, phone))
+
+
+@receiver(post_delete, sender=Customer)
+def customer_deleted(sender, instance, **kwargs):
+    cid = instance.pk
+    transaction.on_commit(lambda: phone_index.remove(cid))
+
+
+@receiver([post_save, post_delete], sender=CustomerAddress)
+def address_changed(sender, instance, **kwargs):
+    cid = instance.customer_id
+
+    def refresh():
+        phone_index.set_address(cid, primary_addresses([cid]).get(cid, ""))
+
+    transaction.on_commit(refresh)
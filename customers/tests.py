@@ -1,3 +1,217 @@
+import io
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from orders.models import Order, Payment
+from payments.models import PaymentMethod
+
+from . import balances
+from .models import Customer, CustomerAddress
+from . import phone_index as phone_index_module
+from .phone_index import phone_index
+
+
+class PhoneIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.a = Customer.objects.create(name="Karim", phone="01711000111")
+        cls.b = Customer.objects.create(name="Rahim", phone="01711000222")
+        cls.c = Customer.objects.create(name="Salma", phone="01822017110")
+        CustomerAddress.objects.create(customer=cls.a, address_line="Old Road", is_primary=False)
+        CustomerAddress.objects.create(customer=cls.a, address_line="Dhanmondi 27", is_primary=True)
+
+    def setUp(self):
+        phone_index.invalidate()
+
+    def test_prefix_then_substring(self):
+        phones = [e.phone for e in phone_index.suggest("01711")]
+        self.assertEqual(phones, ["01711000111", "01711000222", "01822017110"])
+
+    def test_short_query_matches_prefix_only(self):
+        self.assertEqual([e.phone for e in phone_index.suggest("017")], ["01711000111", "01711000222"])
+        self.assertEqual(phone_index.suggest("711"), [])
+        self.assertEqual([e.phone for e in phone_index.suggest("7110")], ["01711000111", "01711000222", "01822017110"])
+
+    def test_warm_lookups_hit_no_db(self):
+        phone_index.suggest("0")
+        with self.assertNumQueries(0):
+            res = self.client.get(reverse("customers:phone_suggest"), {"q": "0171100"})
+            auto = self.client.get(reverse("customers:customer_by_phone"), {"phone": "01711000111"})
+
+        self.assertEqual(res.json()["results"][0], {
+            "phone": "01711000111", "name": "Karim", "address": "Dhanmondi 27",
+        })
+        self.assertEqual(auto.json()["address"], "Dhanmondi 27")
+        self.assertEqual(auto.json()["id"], self.a.id)
+
+    def test_incremental_updates(self):
+        phone_index.suggest("0")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            d = Customer.objects.create(name="Nasir", phone="01611000000")
+            CustomerAddress.objects.create(customer=d, address_line="Mirpur 10")
+        self.assertEqual(phone_index.get("01611000000").address, "Mirpur 10")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.b.phone = "01999000222"
+            self.b.save()
+        self.assertIsNone(phone_index.get("01711000222"))
+        self.assertEqual(phone_index.get("01999000222").name, "Rahim")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.c.delete()
+        self.assertEqual(phone_index.suggest("01822"), [])
+
+    def test_miss_checks_the_db(self):
+        phone_index.suggest("0")
+        # added by another worker: this process's index never saw the signal
+        d = Customer.objects.create(name="Nasir", phone="01611000000")
+        CustomerAddress.objects.create(customer=d, address_line="Mirpur 10")
+
+        with self.assertNumQueries(2):
+            entry = phone_index.get("01611000000")
+        self.assertEqual((entry.id, entry.address), (d.id, "Mirpur 10"))
+        with self.assertNumQueries(0):
+            self.assertEqual(phone_index.get("01611000000").name, "Nasir")
+
+    def test_reload_reads_the_table_outside_the_lock(self):
+        phone_index.suggest("0")
+        phone_index._built_at = 0.0   # past the TTL
+        seen = {}
+        original = phone_index_module.primary_addresses
+
+        def read_table(*args, **kwargs):
+            # another thread looks up a phone and a change commits meanwhile
+            reader = threading.Thread(target=lambda: seen.update(entry=phone_index.get("01711000222")))
+            reader.start()
+            reader.join(timeout=5)
+            seen["waited"] = reader.is_alive()
+            phone_index.upsert(4242, "Nasir", "01611000000", "Mirpur 10")
+            return original(*args, **kwargs)
+
+        with mock.patch.object(phone_index_module, "primary_addresses", side_effect=read_table):
+            phone_index.suggest("0")
+
+        self.assertFalse(seen["waited"])
+        self.assertEqual(seen["entry"].name, "Rahim")
+        with self.assertNumQueries(0):
+            self.assertEqual(phone_index.get("01611000000").address, "Mirpur 10")
+
+    def test_unknown_phone(self):
+        res = self.client.get(reverse("customers:customer_by_phone"), {"phone": "000"})
+        self.assertEqual(res.json(), {"found": False})
+
+
+class CustomerListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("clerk", password="pw", is_staff=True)
+        cls.customers = [Customer.objects.create(name=f"Customer {i:02d}", phone=f"0170000{i:04d}") for i in range(30)]
+        for i, c in enumerate(cls.customers[:12]):
+            Order.objects.create(order_no=f"ORD-C-{i}", customer=c, grand_total=Decimal(i + 1), due_total=Decimal(i + 1))
+        # cancelled orders don't count towards the due
+        Order.objects.create(order_no="ORD-C-X", customer=cls.customers[20], status=Order.Status.CANCELLED,
+                             grand_total=Decimal("99"), due_total=Decimal("99"))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def walk(self, **params):
+        seen, pages = [], 0
+        while True:
+            res = self.client.get(reverse("customers:customer_list"), params)
+            page = res.context["page"]
+            seen += [(c.pk, c.outstanding_due) for c in page]
+            pages += 1
+            if not page.has_next():
+                return seen, pages
+            params["after"] = page.next_cursor
+
+    def test_default_sort_pages_with_dues(self):
+        seen, pages = self.walk()
+        self.assertEqual(pages, 2)
+        self.assertEqual([pk for pk, _ in seen], [c.pk for c in reversed(self.customers)])
+        dues = dict(seen)
+        self.assertEqual(dues[self.customers[11].pk], Decimal("12"))
+        self.assertEqual(dues[self.customers[20].pk], Decimal("0"))
+
+    def test_due_sort_and_filter(self):
+        seen, _ = self.walk(sort="due_desc")
+        self.assertEqual(len(seen), 30)
+        self.assertEqual([d for _, d in seen[:3]], [Decimal("12"), Decimal("11"), Decimal("10")])
+
+        seen, _ = self.walk(due="due", sort="due_asc")
+        self.assertEqual([d for _, d in seen], [Decimal(i) for i in range(1, 13)])
+
+        seen, _ = self.walk(min_due="10", sort="name")
+        self.assertEqual([pk for pk, _ in seen], [c.pk for c in self.customers[9:12]])
+
+    def test_due_sort_reads_the_stored_balance(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("customers:customer_list"), {"sort": "due_desc", "due": "due"})
+        self.assertFalse(any("orders_order" in q["sql"] for q in ctx.captured_queries))
+
+
+class CustomerBalanceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.method = PaymentMethod.objects.create(name="Cash")
+        cls.a = Customer.objects.create(name="Karim", phone="01711000111")
+        cls.b = Customer.objects.create(name="Rahim", phone="01711000222")
+
+    def totals(self, customer):
+        customer.refresh_from_db()
+        return customer.outstanding_due, customer.lifetime_spend, customer.order_count
+
+    def test_order_changes_move_the_balance(self):
+        order = Order.objects.create(order_no="ORD-B-1", customer=self.a, grand_total=Decimal("100"), due_total=Decimal("100"))
+        self.assertEqual(self.totals(self.a), (Decimal("100"), Decimal("100"), 1))
+
+        Payment.objects.create(order=order, payment_method=self.method, amount=Decimal("30"))
+        self.assertEqual(self.totals(self.a), (Decimal("70"), Decimal("100"), 1))
+
+        order.refresh_from_db()
+        order.customer = self.b
+        order.save()
+        self.assertEqual(self.totals(self.a), (Decimal("0"), Decimal("0"), 0))
+        self.assertEqual(self.totals(self.b), (Decimal("70"), Decimal("100"), 1))
+
+        order.status = Order.Status.CANCELLED
+        order.save()
+        self.assertEqual(self.totals(self.b), (Decimal("0"), Decimal("0"), 0))
+
+        order.status = Order.Status.COMPLETED
+        order.save()
+        order.delete()
+        self.assertEqual(self.totals(self.b), (Decimal("0"), Decimal("0"), 0))
+        self.assertEqual(balances.drift(), [])
+
+    def test_customer_save_keeps_balances(self):
+        stale = Customer.objects.get(pk=self.a.pk)
+        Order.objects.create(order_no="ORD-B-2", customer=self.a, grand_total=Decimal("50"), due_total=Decimal("50"))
+        stale.name = "Karim Uddin"
+        stale.save()
+        self.assertEqual(self.totals(self.a), (Decimal("50"), Decimal("50"), 1))
+
+    def test_reconcile_finds_and_fixes_drift(self):
+        Order.objects.create(order_no="ORD-B-3", customer=self.a, grand_total=Decimal("40"), due_total=Decimal("40"))
+        Customer.objects.filter(pk=self.a.pk).update(outstanding_due=Decimal("1"))
+        Customer.objects.filter(pk=self.b.pk).update(order_count=3)
+
+        out = io.StringIO()
+        call_command("reconcile_customer_totals", "--check", stdout=out)
+        self.assertIn("found 2 drifted customers", out.getvalue())
+        self.assertEqual(self.totals(self.a)[0], Decimal("1"))
 
-# Create your tests here.
+        call_command("reconcile_customer_totals", stdout=io.StringIO())
+        self.assertEqual(self.totals(self.a), (Decimal("40"), Decimal("40"), 1))
+        self.assertEqual(self.totals(self.b), (Decimal("0"), Decimal("0"), 0))
+        self.assertEqual(balances.drift(), [])
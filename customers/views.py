@@ -7,29 +7,28 @@ from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_GET
 
-from .models import Customer, CustomerAddress
+from .models import Customer
+from .phone_index import phone_index
 from .forms import CustomerForm, CustomerAddressFormSet
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlencode
 
-from django.db.models import Q, Sum, Value, DecimalField
-from django.db.models.functions import Coalesce
-
-from orders.models import Order
+from search.query import search_filter
+from vhojon import keyset
+from vhojon.dbrouter import replica_reads
 
 
 # ---------- Your existing AJAX ----------
+# Both endpoints are served from the in-process phone index (no DB hit).
+# Suggestions already carry name + primary address, so picking one needs
+# no second request.
 @require_GET
 def phone_suggest(request):
     q = (request.GET.get("q") or "").strip()
     if not q:
         return JsonResponse({"results": []})
 
-    results = list(
-        Customer.objects
-        .filter(phone__icontains=q)
-        .order_by("phone")
-        .values("phone")[:10]
-    )
+    results = [e.as_suggestion() for e in phone_index.suggest(q, limit=10)]
     return JsonResponse({"results": results})
 
 
@@ -39,82 +38,71 @@ def customer_by_phone(request):
     if not phone:
         return JsonResponse({"found": False})
 
-    try:
-        c = Customer.objects.get(phone=phone)
-    except Customer.DoesNotExist:
+    entry = phone_index.get(phone)
+    if entry is None:
         return JsonResponse({"found": False})
 
-    addr = (
-        CustomerAddress.objects
-        .filter(customer=c)
-        .order_by("-is_primary", "-created_at")
-        .values_list("address_line", flat=True)
-        .first()
-    ) or ""
-
-    return JsonResponse({
-        "found": True,
-        "id": c.id,
-        "name": c.name,
-        "phone": c.phone,
-        "address": addr,
-    })
+    return JsonResponse(entry.as_autofill())
 
 
 # ---------- NEW: Customer CRUD ----------
 
 
 
+CUSTOMER_PAGE_SIZE = 25
+
+# sort param -> keyset ordering
+CUSTOMER_SORTS = {
+    "new": "-id",
+    "name": "name",
+    "due_desc": "-outstanding_due",
+    "due_asc": "outstanding_due",
+}
+
+
 @login_required
+@replica_reads
 def customer_list(request):
     q = (request.GET.get("q") or "").strip()
     due_filter = (request.GET.get("due") or "").strip()      # "" | "due" | "clear"
     min_due = (request.GET.get("min_due") or "").strip()     # numeric string
     sort = (request.GET.get("sort") or "new").strip()        # new | name | due_desc | due_asc
+    if sort not in CUSTOMER_SORTS:
+        sort = "new"
 
-    qs = (
-        Customer.objects
-        .annotate(
-            total_due_calc=Coalesce(
-                Sum(
-                    "orders__due_total",                           # ✅ FIXED: orders__
-                    filter=~Q(orders__status=Order.Status.CANCELLED)  # ✅ FIXED: orders__
-                ),
-                Value(Decimal("0.00")),
-                output_field=DecimalField(max_digits=12, decimal_places=2),
-            )
-        )
-    )
+    try:
+        min_due_value = Decimal(min_due) if min_due else None
+    except InvalidOperation:
+        min_due_value = None
 
+    # due filters / sorts use the stored balance (customer_due_idx)
+    qs = Customer.objects.all()
     if q:
-        qs = qs.filter(Q(name__icontains=q) | Q(phone__icontains=q))
+        qs = search_filter(qs, "customers", q)
 
     if due_filter == "due":
-        qs = qs.filter(total_due_calc__gt=0)
+        qs = qs.filter(outstanding_due__gt=0)
     elif due_filter == "clear":
-        qs = qs.filter(total_due_calc__lte=0)
-
-    if min_due:
-        try:
-            qs = qs.filter(total_due_calc__gte=Decimal(min_due))
-        except Exception:
-            pass
-
-    if sort == "name":
-        qs = qs.order_by("name")
-    elif sort == "due_desc":
-        qs = qs.order_by("-total_due_calc", "-id")
-    elif sort == "due_asc":
-        qs = qs.order_by("total_due_calc", "-id")
-    else:
-        qs = qs.order_by("-id")
+        qs = qs.filter(outstanding_due__lte=0)
+    if min_due_value is not None:
+        qs = qs.filter(outstanding_due__gte=min_due_value)
+
+    page = keyset.paginate(
+        qs, CUSTOMER_SORTS[sort],
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        size=CUSTOMER_PAGE_SIZE,
+    )
 
+    params = {"q": q, "due": due_filter, "min_due": min_due, "sort": sort}
     return render(request, "customers/customer_list.html", {
-        "customers": qs,
+        "customers": page.object_list,
+        "page": page,
         "q": q,
         "due": due_filter,
         "min_due": min_due,
         "sort": sort,
+        "filter_query": urlencode({k: v for k, v in params.items() if v}),
     })
 
 
@@ -135,7 +123,7 @@ def customer_detail(request, pk):
         due_orders = (
             Order.objects
             .filter(customer=customer, due_total__gt=0)
-            .exclude(status__iexact="cancelled")   # optional if you use cancelled
+            .exclude(status=Order.Status.CANCELLED)   # matches order_customer_due_idx
             .order_by("-id")[:20]
         )
     except Exception:
@@ -0,0 +1,195 @@
+# expenses/ledger.py
+"""
+Unified expense ledger.
+
+Every UtilityBill / RawMaterialPurchase / StaffSalaryPayment / OtherExpense
+has a mirror row in ``ExpenseEntry`` (type, date, title, amount, note),
+written from post_save / post_delete (``expenses.signals``). Renaming a
+utility type, material, unit, staff member or role re-titles their entries.
+
+The dashboard reads the ledger only:
+
+    ledger_totals(qs)          per-type sum + count, one GROUP BY query
+    ledger_page(qs, ...)       one page in date/amount order, keyset paged
+                               on (sort key, id) (``vhojon.keyset``)
+
+Title and amount helpers only touch model fields (not ``__str__``), so
+``rebuild()`` also works with the historical models in a migration.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.apps import apps as global_apps
+from django.db.models import Count, Sum
+
+from vhojon import keyset
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+
+PAGE_SIZE = 25
+
+
+class Kind:
+    """How one expense model maps onto a ledger row."""
+
+    def __init__(self, key, label, model, date_field, select_related, title_of, amount_of, url_prefix):
+        self.key = key
+        self.label = label
+        self.model_label = model
+        self.date_field = date_field
+        self.select_related = select_related
+        self.title_of = title_of
+        self.amount_of = amount_of
+        self.edit_url = f"expenses:{url_prefix}_edit"
+        self.delete_url = f"expenses:{url_prefix}_delete"
+
+    def model(self, apps=global_apps):
+        return apps.get_model(self.model_label)
+
+    def values(self, obj):
+        return {
+            "date": getattr(obj, self.date_field),
+            "title": self.title_of(obj)[:255],
+            "amount": self.amount_of(obj),
+            "note": obj.note or "",
+        }
+
+
+def _raw_title(x):
+    unit = x.unit.symbol or x.unit.name
+    # same digits whether the instance was just saved or read back
+    qty = Decimal(x.quantity or 0).quantize(Decimal("0.001"))
+    return f"{x.material.name} ({qty} {unit})"
+
+
+def _raw_amount(x):
+    return ((x.quantity or 0) * (x.unit_price or 0)).quantize(CENT, ROUND_HALF_UP)
+
+
+KINDS = {
+    k.key: k
+    for k in [
+        Kind("utility", "Utility", "expenses.UtilityBill", "bill_date", ["utility_type"],
+             lambda x: x.utility_type.name, lambda x: x.amount or ZERO, "utility"),
+        Kind("raw", "Raw", "expenses.RawMaterialPurchase", "purchase_date", ["material", "unit"],
+             _raw_title, _raw_amount, "raw"),
+        Kind("salary", "Salary", "expenses.StaffSalaryPayment", "pay_date", ["staff__role"],
+             lambda x: f"{x.staff.name} ({x.staff.role.name})", lambda x: x.amount or ZERO, "salary"),
+        Kind("other", "Other", "expenses.OtherExpense", "expense_date", [],
+             lambda x: x.title, lambda x: x.amount or ZERO, "other"),
+    ]
+}
+
+
+def kind_for(model):
+    label = model._meta.label
+    for kind in KINDS.values():
+        if kind.model_label == label:
+            return kind
+    return None
+
+
+# =====================================================
+# WRITE
+# =====================================================
+def _entry_model(apps=global_apps):
+    return apps.get_model("expenses", "ExpenseEntry")
+
+
+def sync(obj):
+    kind = kind_for(type(obj))
+    _entry_model().objects.update_or_create(kind=kind.key, source_id=obj.pk, defaults=kind.values(obj))
+
+
+def remove(obj):
+    kind = kind_for(type(obj))
+    _entry_model().objects.filter(kind=kind.key, source_id=obj.pk).delete()
+
+
+def retitle(kind_key, source_qs, batch_size=500):
+    """Recompute titles for the entries of ``source_qs`` (after a rename)."""
+    kind = KINDS[kind_key]
+    ExpenseEntry = _entry_model()
+
+    sources = source_qs.select_related(*kind.select_related).iterator(chunk_size=batch_size)
+    titles = {x.pk: kind.title_of(x)[:255] for x in sources}
+    if not titles:
+        return 0
+
+    entries = list(ExpenseEntry.objects.filter(kind=kind_key, source_id__in=list(titles)))
+    changed = []
+    for e in entries:
+        if e.title != titles[e.source_id]:
+            e.title = titles[e.source_id]
+            changed.append(e)
+    ExpenseEntry.objects.bulk_update(changed, ["title"], batch_size=batch_size)
+    return len(changed)
+
+
+def rebuild(apps=global_apps, batch_size=1000):
+    """Replace every ledger row from the four expense tables."""
+    ExpenseEntry = _entry_model(apps)
+    ExpenseEntry.objects.all().delete()
+
+    written = 0
+    for kind in KINDS.values():
+        qs = kind.model(apps).objects.select_related(*kind.select_related).order_by("pk")
+        batch = []
+        for obj in qs.iterator(chunk_size=batch_size):
+            batch.append(ExpenseEntry(kind=kind.key, source_id=obj.pk, **kind.values(obj)))
+            if len(batch) >= batch_size:
+                ExpenseEntry.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        ExpenseEntry.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+# =====================================================
+# READ
+# =====================================================
+def filter_dates(qs, from_date=None, to_date=None):
+    if from_date:
+        qs = qs.filter(date__gte=from_date)
+    if to_date:
+        qs = qs.filter(date__lte=to_date)
+    return qs
+
+
+def ledger_totals(qs):
+    """
+    {kind: {"total": Decimal, "count": int}} for every kind, plus "all".
+    """
+    totals = {k: {"total": ZERO, "count": 0} for k in KINDS}
+    for row in qs.values("kind").annotate(total=Sum("amount"), count=Count("id")).order_by():
+        totals[row["kind"]] = {"total": row["total"] or ZERO, "count": row["count"]}
+
+    totals["all"] = {
+        "total": sum((t["total"] for t in totals.values()), ZERO),
+        "count": sum(t["count"] for t in totals.values()),
+    }
+    return totals
+
+
+SORTS = {
+    # name: (field, descending)
+    "-date": ("date", True),
+    "date": ("date", False),
+    "-amount": ("amount", True),
+    "amount": ("amount", False),
+}
+DEFAULT_SORT = "-date"
+
+
+def ledger_page(qs, sort=DEFAULT_SORT, after=None, before=None, size=PAGE_SIZE):
+    """
+    One page of ``qs`` in ``sort`` order.
+
+    ``after`` / ``before`` are cursor tokens from a previous page. Returns
+    (entries, next_cursor, prev_cursor); a cursor is None at either end.
+    """
+    if sort not in SORTS:
+        sort = DEFAULT_SORT
+    page = keyset.paginate(qs, sort, after=after, before=before, size=size)
+    return page.object_list, page.next_cursor, page.prev_cursor
@@ -0,0 +1,14 @@
+# expenses/management/commands/rebuild_expense_ledger.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from expenses import ledger
+
+
+class Command(BaseCommand):
+    help = "Re-fill the ExpenseEntry ledger from the four expense tables."
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            written = ledger.rebuild()
+        self.stdout.write(f"wrote {written} ledger rows")
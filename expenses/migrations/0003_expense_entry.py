@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-17 23:31
+
+from django.db import migrations, models
+
+
+def fill_ledger(apps, schema_editor):
+    from expenses import ledger
+
+    ledger.rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0002_alter_staffsalarypayment_amount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('utility', 'Utility'), ('raw', 'Raw'), ('salary', 'Salary'), ('other', 'Other')], max_length=10)),
+                ('source_id', models.BigIntegerField()),
+                ('date', models.DateField()),
+                ('title', models.CharField(max_length=255)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('note', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'id'], name='expense_entry_date_idx'), models.Index(fields=['amount', 'id'], name='expense_entry_amount_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'source_id'), name='expense_entry_source_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0003_expense_entry'),
+        ('staff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otherexpense',
+            index=models.Index(fields=['expense_date', 'id'], name='other_expense_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rawmaterialpurchase',
+            index=models.Index(fields=['purchase_date', 'id'], name='raw_purchase_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffsalarypayment',
+            index=models.Index(fields=['pay_date', 'id'], name='salary_pay_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='utilitybill',
+            index=models.Index(fields=['bill_date', 'id'], name='utility_bill_date_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 00:08
+
+import vhojon.timewindow
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0004_expense_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='otherexpense',
+            name='expense_date',
+            field=models.DateField(default=vhojon.timewindow.business_day),
+        ),
+        migrations.AlterField(
+            model_name='rawmaterialpurchase',
+            name='purchase_date',
+            field=models.DateField(default=vhojon.timewindow.business_day),
+        ),
+        migrations.AlterField(
+            model_name='staffsalarypayment',
+            name='pay_date',
+            field=models.DateField(default=vhojon.timewindow.business_day),
+        ),
+        migrations.AlterField(
+            model_name='utilitybill',
+            name='bill_date',
+            field=models.DateField(default=vhojon.timewindow.business_day),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.db import models
-from django.utils import timezone
 from staff.models import Staff
+from vhojon import timewindow
 
 class UtilityType(models.Model):
     name = models.CharField(max_length=80, unique=True)  # e.g. Current Bill, Gas Bill
@@ -12,9 +12,14 @@ class UtilityType(models.Model):
 class UtilityBill(models.Model):
     utility_type = models.ForeignKey(UtilityType, on_delete=models.PROTECT, related_name="bills")
     amount = models.DecimalField(max_digits=12, decimal_places=2)
-    bill_date = models.DateField(default=timezone.now)
+    bill_date = models.DateField(default=timewindow.business_day)
     note = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["bill_date", "id"], name="utility_bill_date_idx"),
+        ]
+
     def __str__(self):
         return f"{self.utility_type} - {self.amount}"
 
@@ -44,10 +49,15 @@ class RawMaterialPurchase(models.Model):
     unit = models.ForeignKey(Unit, on_delete=models.PROTECT)
     quantity = models.DecimalField(max_digits=12, decimal_places=3)  # allow 1.250 kg
     unit_price = models.DecimalField(max_digits=12, decimal_places=2)  # price per unit
-    purchase_date = models.DateField(default=timezone.now)
+    purchase_date = models.DateField(default=timewindow.business_day)
     vendor = models.CharField(max_length=120, blank=True)
     note = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["purchase_date", "id"], name="raw_purchase_date_idx"),
+        ]
+
     @property
     def total(self):
         return (self.quantity or 0) * (self.unit_price or 0)
@@ -59,10 +69,15 @@ class RawMaterialPurchase(models.Model):
 class StaffSalaryPayment(models.Model):
     staff = models.ForeignKey(Staff, on_delete=models.PROTECT, related_name="salary_payments")
     amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
-    pay_date = models.DateField(default=timezone.now)
+    pay_date = models.DateField(default=timewindow.business_day)
     month = models.DateField(help_text="Use first day of the month (e.g. 2026-01-01).")
     note = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["pay_date", "id"], name="salary_pay_date_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if self.amount in (None, ""):
             self.amount = self.staff.monthly_salary
@@ -73,8 +88,46 @@ class StaffSalaryPayment(models.Model):
 class OtherExpense(models.Model):
     title = models.CharField(max_length=150)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
-    expense_date = models.DateField(default=timezone.now)
+    expense_date = models.DateField(default=timewindow.business_day)
     note = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["expense_date", "id"], name="other_expense_date_idx"),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.amount}"
+
+
+class ExpenseEntry(models.Model):
+    """
+    One row per expense of any type, kept in sync from the four expense
+    tables (``expenses.ledger``) so the dashboard can sort, page and total
+    them all with single queries.
+    """
+
+    class Kind(models.TextChoices):
+        UTILITY = "utility", "Utility"
+        RAW = "raw", "Raw"
+        SALARY = "salary", "Salary"
+        OTHER = "other", "Other"
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    source_id = models.BigIntegerField()
+    date = models.DateField()
+    title = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "source_id"], name="expense_entry_source_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["date", "id"], name="expense_entry_date_idx"),
+            models.Index(fields=["amount", "id"], name="expense_entry_amount_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title} - {self.amount}"
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from staff.models import Staff, StaffRole
+
+from . import ledger
+from .models import OtherExpense, RawMaterial, RawMaterialPurchase, StaffSalaryPayment, Unit, UtilityBill, UtilityType
+
+
+@receiver(post_save, sender=UtilityBill)
+@receiver(post_save, sender=RawMaterialPurchase)
+@receiver(post_save, sender=StaffSalaryPayment)
+@receiver(post_save, sender=OtherExpense)
+def expense_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata; run rebuild_expense_ledger afterwards
+    ledger.sync(instance)
+
+
+@receiver(post_delete, sender=UtilityBill)
+@receiver(post_delete, sender=RawMaterialPurchase)
+@receiver(post_delete, sender=StaffSalaryPayment)
+@receiver(post_delete, sender=OtherExpense)
+def expense_deleted(sender, instance, **kwargs):
+    ledger.remove(instance)
+
+
+# -----------------------------
+# Renames show up in the ledger titles
+# -----------------------------
+@receiver(post_save, sender=UtilityType)
+def utility_type_saved(sender, instance, created, **kwargs):
+    if not created:
+        ledger.retitle("utility", instance.bills.all())
+
+
+@receiver(post_save, sender=RawMaterial)
+def material_saved(sender, instance, created, **kwargs):
+    if not created:
+        ledger.retitle("raw", instance.purchases.all())
+
+
+@receiver(post_save, sender=Unit)
+def unit_saved(sender, instance, created, **kwargs):
+    if not created:
+        ledger.retitle("raw", RawMaterialPurchase.objects.filter(unit=instance))
+
+
+@receiver(post_save, sender=Staff)
+def staff_saved(sender, instance, created, **kwargs):
+    if not created:
+        ledger.retitle("salary", instance.salary_payments.all())
+
+
+@receiver(post_save, sender=StaffRole)
+def staff_role_saved(sender, instance, created, **kwargs):
+    if not created:
+        ledger.retitle("salary", StaffSalaryPayment.objects.filter(staff__role=instance))
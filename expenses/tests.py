@@ -1,3 +1,112 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from staff.models import Staff, StaffRole
+
+from . import ledger
+from .models import (
+    ExpenseEntry, OtherExpense, RawMaterial, RawMaterialPurchase, StaffSalaryPayment, Unit, UtilityBill, UtilityType,
+)
+
+
+class ExpenseLedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("admin", password="pw", is_staff=True)
+        cls.gas = UtilityType.objects.create(name="Gas")
+        cls.kg = Unit.objects.create(name="kilogram", symbol="kg")
+        cls.rice = RawMaterial.objects.create(name="Rice", default_unit=cls.kg)
+        cls.chef = StaffRole.objects.create(name="Chef")
+        cls.karim = Staff.objects.create(name="Karim", role=cls.chef, monthly_salary=Decimal("9000"))
+
+        start = date(2026, 1, 1)
+        for i in range(30):
+            day = start + timedelta(days=i % 10)
+            UtilityBill.objects.create(utility_type=cls.gas, amount=Decimal(100 + i), bill_date=day)
+            OtherExpense.objects.create(title=f"Misc {i}", amount=Decimal(i), expense_date=day)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_entries_follow_source_rows(self):
+        purchase = RawMaterialPurchase.objects.create(
+            material=self.rice, unit=self.kg, quantity=Decimal("2.500"), unit_price=Decimal("60.00"),
+        )
+        salary = StaffSalaryPayment.objects.create(staff=self.karim, month=date(2026, 1, 1))
+
+        entry = ExpenseEntry.objects.get(kind="raw", source_id=purchase.pk)
+        self.assertEqual((entry.title, entry.amount), ("Rice (2.500 kg)", Decimal("150.00")))
+        self.assertEqual(ExpenseEntry.objects.get(kind="salary").amount, Decimal("9000.00"))
+
+        purchase.unit_price = Decimal("70.00")
+        purchase.save()
+        self.rice.name = "Miniket Rice"
+        self.rice.save()
+        self.chef.name = "Head Chef"
+        self.chef.save()
+
+        entry.refresh_from_db()
+        self.assertEqual((entry.title, entry.amount), ("Miniket Rice (2.500 kg)", Decimal("175.00")))
+        self.assertEqual(ExpenseEntry.objects.get(kind="salary").title, "Karim (Head Chef)")
+
+        salary.delete()
+        self.assertFalse(ExpenseEntry.objects.filter(kind="salary").exists())
+
+    def test_rebuild_matches_incremental(self):
+        RawMaterialPurchase.objects.create(material=self.rice, unit=self.kg, quantity=Decimal("1"), unit_price=Decimal("5"))
+        fields = ("kind", "source_id", "date", "title", "amount", "note")
+        before = sorted(ExpenseEntry.objects.values_list(*fields))
+        ledger.rebuild()
+        self.assertEqual(sorted(ExpenseEntry.objects.values_list(*fields)), before)
+
+    def test_totals_in_one_query(self):
+        qs = ledger.filter_dates(ExpenseEntry.objects.all(), date(2026, 1, 1), date(2026, 1, 2))
+        with self.assertNumQueries(1):
+            totals = ledger.ledger_totals(qs)
+        # days 1-2 hold i = 0, 1, 10, 11, 20, 21
+        self.assertEqual(totals["utility"], {"total": Decimal("663"), "count": 6})
+        self.assertEqual(totals["other"], {"total": Decimal("63"), "count": 6})
+        self.assertEqual(totals["raw"], {"total": Decimal("0.00"), "count": 0})
+        self.assertEqual(totals["all"]["count"], 12)
+
+    def test_keyset_pages_cover_everything_once(self):
+        qs = ExpenseEntry.objects.all()
+        for sort, (field, desc) in ledger.SORTS.items():
+            seen, cursor, pages = [], None, []
+            while True:
+                rows, next_cursor, prev_cursor = ledger.ledger_page(qs, sort, after=cursor, size=7)
+                pages.append((rows, prev_cursor))
+                seen += rows
+                if not next_cursor:
+                    break
+                cursor = next_cursor
+
+            expected = list(qs.order_by(f"-{field}" if desc else field, "-id" if desc else "id"))
+            self.assertEqual(seen, expected, sort)
+
+            # walking back from the last page gives the previous page again
+            last_rows, last_prev = pages[-1]
+            back, _, _ = ledger.ledger_page(qs, sort, before=last_prev, size=7)
+            self.assertEqual(back, pages[-2][0])
+
+    def test_dashboard_renders_one_page(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(reverse("expenses:dashboard"), {"from_date": "2026-01-01", "sort": "-amount"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.context["expense_rows"]), ledger.PAGE_SIZE)
+        self.assertEqual(res.context["expense_rows"][0]["amount"], Decimal("129"))
+        self.assertEqual(res.context["row_count"], 60)
+        self.assertIsNotNone(res.context["next_cursor"])
+
+        source_reads = [q["sql"] for q in ctx.captured_queries if "expenses_utilitybill" in q["sql"]]
+        self.assertEqual(source_reads, [])
 
-# Create your tests here.
+        res = self.client.get(reverse("expenses:dashboard"), {"sort": "-amount", "after": res.context["next_cursor"]})
+        self.assertEqual(res.context["expense_rows"][0]["amount"], Decimal("104"))
@@ -1,6 +1,3 @@
-from datetime import date
-
-from django.db.models import Sum, F, DecimalField, ExpressionWrapper
 from django.http import JsonResponse
 from django.shortcuts import render
 from django.urls import reverse_lazy
@@ -8,119 +5,76 @@ from django.views.decorators.http import require_GET
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 
 from staff.models import Staff
-from .models import UtilityBill, RawMaterialPurchase, StaffSalaryPayment, OtherExpense
+from vhojon import timewindow
+from vhojon.dbrouter import replica_reads
+from . import ledger
+from .models import UtilityBill, RawMaterialPurchase, StaffSalaryPayment, OtherExpense, ExpenseEntry
 from .forms import UtilityBillForm, RawMaterialPurchaseForm, StaffSalaryPaymentForm, OtherExpenseForm
 
 
-def expense_dashboard(request):
-    from_str = request.GET.get("from_date")
-    to_str = request.GET.get("to_date")
-
-    from_date = date.fromisoformat(from_str) if from_str else None
-    to_date = date.fromisoformat(to_str) if to_str else None
-
-    def filter_range(qs, field):
-        if from_date and to_date:
-            return qs.filter(**{f"{field}__range": (from_date, to_date)})
-        if from_date:
-            return qs.filter(**{f"{field}__gte": from_date})
-        if to_date:
-            return qs.filter(**{f"{field}__lte": to_date})
-        return qs
-
-    utility_qs = filter_range(
-        UtilityBill.objects.select_related("utility_type"),
-        "bill_date"
-    )
-    raw_qs = filter_range(
-        RawMaterialPurchase.objects.select_related("material", "unit"),
-        "purchase_date"
-    )
-    salary_qs = filter_range(
-        StaffSalaryPayment.objects.select_related("staff"),
-        "pay_date"
-    )
-    other_qs = filter_range(
-        OtherExpense.objects.all(),
-        "expense_date"
-    )
-
-    raw_total_expr = ExpressionWrapper(
-        F("quantity") * F("unit_price"),
-        output_field=DecimalField(max_digits=12, decimal_places=2),
-    )
-
-    utility_total = utility_qs.aggregate(s=Sum("amount"))["s"] or 0
-    raw_total = raw_qs.annotate(t=raw_total_expr).aggregate(s=Sum("t"))["s"] or 0
-    salary_total = salary_qs.aggregate(s=Sum("amount"))["s"] or 0
-    other_total = other_qs.aggregate(s=Sum("amount"))["s"] or 0
+SORT_CHOICES = [
+    ("-date", "Newest"),
+    ("date", "Oldest"),
+    ("-amount", "Highest"),
+    ("amount", "Lowest"),
+]
 
-    grand_total = utility_total + raw_total + salary_total + other_total
 
-    # ✅ Combined list for dashboard table (WITH edit/delete info)
-    expense_rows = []
+@replica_reads
+def expense_dashboard(request):
+    from_date = timewindow.parse_date(request.GET.get("from_date"))
+    to_date = timewindow.parse_date(request.GET.get("to_date"))
 
-    for x in utility_qs:
-        expense_rows.append({
-            "type": "Utility",
-            "title": str(x.utility_type),
-            "amount": x.amount,
-            "date": x.bill_date,
-            "note": x.note,
-            "pk": x.pk,
-            "edit_url": "expenses:utility_edit",
-            "delete_url": "expenses:utility_delete",
-        })
+    sort = request.GET.get("sort") or ledger.DEFAULT_SORT
+    if sort not in ledger.SORTS:
+        sort = ledger.DEFAULT_SORT
 
-    for x in raw_qs:
-        expense_rows.append({
-            "type": "Raw",
-            "title": f"{x.material} ({x.quantity} {x.unit})",
-            "amount": x.total,
-            "date": x.purchase_date,
-            "note": x.note,
-            "pk": x.pk,
-            "edit_url": "expenses:raw_edit",
-            "delete_url": "expenses:raw_delete",
-        })
+    # ✅ everything comes from the unified ledger (expenses.ledger)
+    qs = ledger.filter_dates(ExpenseEntry.objects.all(), from_date, to_date)
+    totals = ledger.ledger_totals(qs)
 
-    for x in salary_qs:
-        expense_rows.append({
-            "type": "Salary",
-            "title": str(x.staff),
-            "amount": x.amount,
-            "date": x.pay_date,
-            "note": x.note,
-            "pk": x.pk,
-            "edit_url": "expenses:salary_edit",
-            "delete_url": "expenses:salary_delete",
-        })
+    entries, next_cursor, prev_cursor = ledger.ledger_page(
+        qs, sort,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
 
-    for x in other_qs:
+    expense_rows = []
+    for e in entries:
+        kind = ledger.KINDS[e.kind]
         expense_rows.append({
-            "type": "Other",
-            "title": x.title,
-            "amount": x.amount,
-            "date": x.expense_date,
-            "note": x.note,
-            "pk": x.pk,
-            "edit_url": "expenses:other_edit",
-            "delete_url": "expenses:other_delete",
+            "type": kind.label,
+            "title": e.title,
+            "amount": e.amount,
+            "date": e.date,
+            "note": e.note,
+            "pk": e.source_id,
+            "edit_url": kind.edit_url,
+            "delete_url": kind.delete_url,
         })
 
-    expense_rows.sort(key=lambda r: r["date"], reverse=True)
+    # filters kept on the sort / paging links
+    params = request.GET.copy()
+    for key in ("after", "before", "sort"):
+        params.pop(key, None)
 
     return render(request, "expenses/dashboard.html", {
-        "utility_total": utility_total,
-        "raw_total": raw_total,
-        "salary_total": salary_total,
-        "other_total": other_total,
-        "grand_total": grand_total,
+        "utility_total": totals["utility"]["total"],
+        "raw_total": totals["raw"]["total"],
+        "salary_total": totals["salary"]["total"],
+        "other_total": totals["other"]["total"],
+        "grand_total": totals["all"]["total"],
+        "row_count": totals["all"]["count"],
 
         "from_date": from_date,
         "to_date": to_date,
 
         "expense_rows": expense_rows,
+        "sort": sort,
+        "sort_choices": SORT_CHOICES,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+        "filter_query": params.urlencode(),
     })
 
 
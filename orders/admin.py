@@ -2,6 +2,7 @@
 
 from django.contrib import admin
 from .models import Order, OrderItem, Payment
+from .totals import deferred_recalc
 
 
 class OrderItemInline(admin.TabularInline):
@@ -78,6 +79,13 @@ class OrderAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
         obj.recalc_totals()
 
+    def save_related(self, request, form, formsets, change):
+        """
+        Inline item/payment rows recalc the order once, not once per row.
+        """
+        with deferred_recalc():
+            super().save_related(request, form, formsets, change)
+
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
@@ -0,0 +1,315 @@
+# orders/export.py
+"""
+Streaming export of orders, order items and payments (CSV / XLSX).
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` and encoded
+as they arrive, so memory stays flat whatever the row count:
+
+    export_response(...)   StreamingHttpResponse for the web
+    write_export(...)      same bytes into an open file (manage.py export_orders)
+
+XLSX is produced without any Excel library: the workbook is a zip written
+sequentially (``zipfile`` with data descriptors, so it needs no seeking) and
+the sheet XML is deflated row by row. Strings are inline, dates are real
+Excel dates.
+"""
+import csv
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Order, OrderItem, Payment
+
+CHUNK_SIZE = 2000
+
+
+# =====================================================
+# DATASETS
+# =====================================================
+class Dataset:
+    def __init__(self, name, model, columns, order_path):
+        self.name = name
+        self.model = model
+        self.headers = [h for h, _ in columns]
+        self.fields = [f for _, f in columns]
+        self.order_path = order_path   # lookup from this model to Order
+
+    def rows(self, orders_qs, chunk_size=CHUNK_SIZE):
+        if self.model is Order:
+            qs = orders_qs
+        else:
+            qs = self.model.objects.filter(**{f"{self.order_path}__in": orders_qs.values("pk")})
+        return qs.order_by("pk").values_list(*self.fields).iterator(chunk_size=chunk_size)
+
+
+DATASETS = {
+    d.name: d
+    for d in [
+        Dataset("orders", Order, [
+            ("Order ID", "id"),
+            ("Order No", "order_no"),
+            ("Created", "created_at"),
+            ("Status", "status"),
+            ("Source", "source"),
+            ("Customer", "customer__name"),
+            ("Phone", "customer__phone"),
+            ("Subtotal", "subtotal"),
+            ("Discount", "discount_amount"),
+            ("Tax", "tax_amount"),
+            ("Grand Total", "grand_total"),
+            ("Paid", "paid_total"),
+            ("Due", "due_total"),
+            ("Notes", "notes"),
+        ], order_path="pk"),
+        Dataset("items", OrderItem, [
+            ("Item ID", "id"),
+            ("Order ID", "order_id"),
+            ("Order No", "order__order_no"),
+            ("Order Date", "order__created_at"),
+            ("Product", "product__name"),
+            ("SKU", "product__sku"),
+            ("Qty", "qty"),
+            ("Unit Price", "unit_price"),
+            ("Discount", "discount_amount"),
+            ("Line Total", "line_total"),
+        ], order_path="order"),
+        Dataset("payments", Payment, [
+            ("Payment ID", "id"),
+            ("Order ID", "order_id"),
+            ("Order No", "order__order_no"),
+            ("Paid At", "paid_at"),
+            ("Method", "payment_method__name"),
+            ("Amount", "amount"),
+            ("Reference", "reference_no"),
+        ], order_path="order"),
+    ]
+}
+
+
+def _local(value):
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+# =====================================================
+# CSV
+# =====================================================
+class _Buffer:
+    """Write target for csv.writer that hands back what was written."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(dataset, orders_qs, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Buffer())
+    yield "\ufeff".encode()   # BOM so Excel opens UTF-8 (Bangla names) correctly
+    yield writer.writerow(dataset.headers).encode()
+
+    batch = []
+    for row in dataset.rows(orders_qs, chunk_size):
+        batch.append(writer.writerow([
+            v.strftime("%Y-%m-%d %H:%M:%S") if isinstance(v, datetime) else ("" if v is None else v)
+            for v in map(_local, row)
+        ]))
+        if len(batch) >= 200:
+            yield "".join(batch).encode()
+            batch = []
+    if batch:
+        yield "".join(batch).encode()
+
+
+# =====================================================
+# XLSX
+# =====================================================
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+_XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_CONTENT_TYPES = _XML_HEAD + (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = _XML_HEAD + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS = _XML_HEAD + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# style 1 = date + time, style 2 = date, style 3 = bold (header)
+_STYLES = _XML_HEAD + (
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '</cellXfs>'
+    '</styleSheet>'
+)
+
+
+def _workbook(sheet_name):
+    return _XML_HEAD + (
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+_ILLEGAL_XML = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+
+
+def _text_cell(value, style=""):
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{escape(value.translate(_ILLEGAL_XML))}</t></is></c>'
+
+
+def _cell(value):
+    if value is None or value == "":
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f"<c><v>{value}</v></c>"
+    if isinstance(value, datetime):
+        serial = (_local(value) - _EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c s="1"><v>{serial:.6f}</v></c>'
+    if isinstance(value, date):
+        return f'<c s="2"><v>{(value - _EXCEL_EPOCH.date()).days}</v></c>'
+    return _text_cell(str(value))
+
+
+class _Sink:
+    """
+    Non-seekable file object for zipfile: keeps what was written until
+    ``drain()`` (streaming), or forwards it to ``fileobj`` (disk).
+    """
+
+    def __init__(self, fileobj=None):
+        self.fileobj = fileobj
+        self.chunks = []
+
+    def write(self, data):
+        if self.fileobj is not None:
+            self.fileobj.write(data)
+        else:
+            self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_xlsx(dataset, orders_qs, chunk_size=CHUNK_SIZE, fileobj=None):
+    """
+    Yields the workbook in pieces (or, with ``fileobj``, writes it there and
+    yields nothing useful).
+    """
+    sink = _Sink(fileobj)
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _workbook(dataset.name.title()))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", _STYLES)
+        yield sink.drain()
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((
+                _XML_HEAD
+                + '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + "<row>" + "".join(_text_cell(h, ' s="3"') for h in dataset.headers) + "</row>"
+            ).encode())
+
+            batch = []
+            for row in dataset.rows(orders_qs, chunk_size):
+                batch.append("<row>" + "".join(map(_cell, row)) + "</row>")
+                if len(batch) >= 200:
+                    sheet.write("".join(batch).encode())
+                    batch = []
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(("".join(batch) + "</sheetData></worksheet>").encode())
+
+    yield sink.drain()
+
+
+# =====================================================
+# ENTRY POINTS
+# =====================================================
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", iter_csv),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", iter_xlsx),
+}
+
+
+def export_filename(dataset_name, fmt, day=None):
+    day = day or timezone.localdate()
+    return f"{dataset_name}-{day:%Y%m%d}.{fmt}"
+
+
+def export_response(dataset_name, fmt, orders_qs):
+    content_type, iter_rows = FORMATS[fmt]
+    response = StreamingHttpResponse(
+        (chunk for chunk in iter_rows(DATASETS[dataset_name], orders_qs) if chunk),
+        content_type=content_type,
+    )
+    response["Content-Disposition"] = f'attachment; filename="{export_filename(dataset_name, fmt)}"'
+    return response
+
+
+def write_export(dataset_name, fmt, orders_qs, fileobj, chunk_size=CHUNK_SIZE):
+    """Write one export into a binary file object; returns bytes written."""
+    dataset = DATASETS[dataset_name]
+    if fmt == "xlsx":
+        start = fileobj.tell()
+        for _ in iter_xlsx(dataset, orders_qs, chunk_size, fileobj=fileobj):
+            pass
+        return fileobj.tell() - start
+
+    written = 0
+    for chunk in iter_csv(dataset, orders_qs, chunk_size):
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
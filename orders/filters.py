@@ -0,0 +1,39 @@
+# orders/filters.py
+"""
+Order list filters, shared by ``order_list`` and the exports so both always
+select the same orders.
+"""
+from search.query import search_filter
+from vhojon import timewindow
+
+FILTER_KEYS = ("q", "status", "source", "due", "date_from", "date_to")
+
+
+def order_filters(params):
+    """Cleaned filter values from a GET QueryDict (or any dict)."""
+    filters = {key: (params.get(key) or "").strip() for key in FILTER_KEYS}
+    filters["date_from"] = timewindow.parse_date(filters["date_from"])
+    filters["date_to"] = timewindow.parse_date(filters["date_to"])
+    return filters
+
+
+def filter_orders(qs, q="", status="", source="", due="", date_from=None, date_to=None):
+    if q:
+        qs = search_filter(qs, "orders", q)
+
+    if status:
+        qs = qs.filter(status=status)
+
+    if source:
+        qs = qs.filter(source=source)
+
+    if due == "1":
+        qs = qs.filter(due_total__gt=0)
+    elif due == "0":
+        qs = qs.filter(due_total__lte=0)
+
+    # business days as a half-open created_at range (index friendly)
+    if date_from or date_to:
+        qs = qs.filter(timewindow.range_q("created_at", date_from, date_to))
+
+    return qs
@@ -1,11 +1,12 @@
 # orders/forms.py
 from decimal import Decimal
 from django import forms
-from django.forms import inlineformset_factory
+from django.forms import BaseInlineFormSet, inlineformset_factory
+from django.utils.functional import cached_property
 
 from .models import Order, OrderItem, Payment
 from customers.models import Customer, CustomerAddress
-from catalog.models import Product
+from catalog.fields import CatalogChoiceField, CatalogFormMixin, CatalogFormSetMixin, LazySelect
 
 
 # =====================================================
@@ -102,13 +103,61 @@ class OrderForm(forms.ModelForm):
         return dv
 
 
+# =====================================================
+# LINE FORMSETS (items, payments)
+# =====================================================
+class SavedLineField(forms.ModelChoiceField):
+    """
+    Hidden id of a saved line, found among the rows the formset loaded once
+    (``OrderLineFormSet.saved_lines``) instead of a ``get()`` per row.
+    """
+
+    def __init__(self, formset, **kwargs):
+        self.formset = formset
+        super().__init__(queryset=formset.get_queryset(), **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            pk = self.formset.model._meta.pk.to_python(value)
+        except forms.ValidationError:
+            pk = None
+        obj = self.formset.saved_lines.get(pk)
+        if obj is None:
+            raise forms.ValidationError(self.error_messages["invalid_choice"], code="invalid_choice")
+        return obj
+
+
+class OrderLineFormSet(CatalogFormSetMixin, BaseInlineFormSet):
+    """
+    Validation costs the same few queries for 1 or 40 lines: the saved rows
+    load once, products / payment methods come from the catalog cache (see
+    ``CatalogFormSetMixin``) and every row reuses those instances.
+    """
+
+    @cached_property
+    def saved_lines(self):
+        """pk -> saved line; the same instances the initial forms are bound to."""
+        return {obj.pk: obj for obj in self.get_queryset()}
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        name = self.model._meta.pk.name
+        old = form.fields[name]
+        form.fields[name] = SavedLineField(self, initial=old.initial, required=False, widget=old.widget)
+
+
 # =====================================================
 # ORDER ITEM FORM (✅ updated product widget for AJAX search)
 # =====================================================
-class OrderItemForm(forms.ModelForm):
-    product = forms.ModelChoiceField(
-        queryset=Product.objects.filter(is_active=True),
-        widget=forms.Select(attrs={
+class OrderItemForm(CatalogFormMixin, forms.ModelForm):
+    # validated against the catalog cache; the <select> only carries the
+    # chosen product, Select2 loads the rest from orders:product_search
+    product = CatalogChoiceField(
+        "product",
+        label_attr="label",
+        widget=LazySelect(attrs={
             "class": "js-product-search",  # ✅ used by JS to enable search dropdown
         })
     )
@@ -161,6 +210,7 @@ OrderItemFormSet = inlineformset_factory(
     Order,
     OrderItem,
     form=OrderItemForm,
+    formset=OrderLineFormSet,
     extra=1,
     can_delete=True,
 )
@@ -169,7 +219,9 @@ OrderItemFormSet = inlineformset_factory(
 # =====================================================
 # PAYMENT FORM
 # =====================================================
-class PaymentForm(forms.ModelForm):
+class PaymentForm(CatalogFormMixin, forms.ModelForm):
+    payment_method = CatalogChoiceField("payment_method")
+
     class Meta:
         model = Payment
         fields = ["payment_method", "amount", "reference_no"]
@@ -185,6 +237,7 @@ PaymentFormSet = inlineformset_factory(
     Order,
     Payment,
     form=PaymentForm,
+    formset=OrderLineFormSet,
     extra=1,
     can_delete=True,
 )
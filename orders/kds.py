@@ -0,0 +1,264 @@
+# orders/kds.py
+"""
+Kitchen display (KDS) live feed.
+
+``order_create`` / ``order_update`` / ``order_delete`` call ``publish_order``
+or ``publish_removed`` after commit. ``KitchenFeed`` remembers the last lines
+it sent for every open order and publishes only the difference (lines added,
+changed, removed) to the broker, which fans each event out to the connected
+kitchen screens (``views.kds_stream``, an async SSE view).
+
+The stream is served by the ASGI app (``vhojon/asgi.py``, e.g.
+``uvicorn vhojon.asgi:application``): each screen is a coroutine waiting on
+an ``asyncio.Queue``, not a worker thread. ``LocalBroker`` is in-process, so
+run the site as a single ASGI process, or point ``KDS_BROKER`` at a shared
+backend with the same ``subscribe`` / ``unsubscribe`` / ``publish`` API.
+
+Event types (``event:`` field of the SSE message):
+
+    snapshot   {"orders": [order, ...]}         full state, sent on connect
+    order      {"order": {...}, "replace": bool,
+                "added": [line], "changed": [line], "removed": [line_id]}
+    remove     {"order_id": id}                  completed / cancelled / deleted
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class Event:
+    __slots__ = ("id", "type", "data", "encoded")
+
+    def __init__(self, id, type, data):
+        self.id = id
+        self.type = type
+        self.data = data
+        # encoded once, shared by every connected screen
+        self.encoded = f"id: {id}\nevent: {type}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def sse_message(type, data, retry=None) -> bytes:
+    head = f"retry: {retry}\n" if retry else ""
+    return f"{head}event: {type}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+# =====================================================
+# BROKER
+# =====================================================
+class Subscription:
+    """
+    One connected screen. Lives on the event loop that created it; the broker
+    hands events over with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.maxsize = maxsize
+        self.backlog = []            # events missed since Last-Event-ID
+        self.needs_snapshot = True
+        self.overflowed = False
+
+    def _deliver(self, event):
+        if self.overflowed:
+            return
+        if self.queue.qsize() >= self.maxsize:
+            # screen isn't reading; drop its queue and make it resync
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(event)
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:
+            pass  # loop closed; the stream is gone
+
+    async def get(self, timeout):
+        """Next event, ``False`` on timeout, ``None`` after an overflow."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+
+class LocalBroker:
+    """
+    In-process pub/sub. Keeps the last ``KDS_REPLAY_EVENTS`` events so a
+    screen that reconnects with ``Last-Event-ID`` gets what it missed
+    instead of a full snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._recent = deque(maxlen=_setting("KDS_REPLAY_EVENTS", 200))
+        self._last_id = 0
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def subscribe(self, last_event_id=None):
+        sub = Subscription(asyncio.get_running_loop(), _setting("KDS_MAX_QUEUE", 500))
+        with self._lock:
+            if (
+                last_event_id is not None
+                and self._recent
+                and self._recent[0].id <= last_event_id + 1 <= self._last_id + 1
+            ):
+                sub.backlog = [e for e in self._recent if e.id > last_event_id]
+                sub.needs_snapshot = False
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def publish(self, type, data):
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, type, data)
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.deliver(event)
+        return event
+
+
+# =====================================================
+# ORDER STATE -> EVENTS
+# =====================================================
+def _open_orders():
+    from .models import Order
+
+    since = timezone.now() - timedelta(hours=_setting("KDS_WINDOW_HOURS", 12))
+    return Order.objects.filter(status=Order.Status.PENDING, created_at__gte=since).select_related("customer")
+
+
+def _order_header(order):
+    return {
+        "id": order.pk,
+        "order_no": order.order_no,
+        "source": order.source,
+        "status": order.status,
+        "created_at": order.created_at.isoformat(),
+        "customer": order.customer.name if order.customer else "",
+        "notes": order.notes or "",
+    }
+
+
+def _order_lines(order_ids):
+    from .models import OrderItem
+
+    lines = {oid: {} for oid in order_ids}
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .order_by("id")
+        .values_list("order_id", "id", "product__name", "qty")
+    )
+    for oid, item_id, name, qty in rows:
+        lines[oid][item_id] = {"id": item_id, "name": name, "qty": qty}
+    return lines
+
+
+class KitchenFeed:
+    def __init__(self, broker):
+        self.broker = broker
+        self._lock = threading.Lock()
+        self._sent = {}   # order id -> (header, {item id: line}) last published
+
+    def snapshot(self):
+        """Open orders with their lines, oldest first (2 queries)."""
+        orders = list(_open_orders().order_by("created_at", "id"))
+        lines = _order_lines([o.pk for o in orders])
+        return [
+            dict(_order_header(o), lines=list(lines[o.pk].values()))
+            for o in orders
+        ]
+
+    def publish_order(self, order_id):
+        if not self.broker.has_subscribers:
+            # nobody watching: skip the queries; screens start from a snapshot
+            self._sent.clear()
+            return None
+
+        order = _open_orders().filter(pk=order_id).first()
+        if order is None:
+            return self.publish_removed(order_id)
+
+        header = _order_header(order)
+        lines = _order_lines([order_id])[order_id]
+
+        with self._lock:
+            prev = self._sent.get(order_id)
+            self._sent[order_id] = (header, lines)
+
+            if prev is None:
+                data = {"order": header, "replace": True, "added": list(lines.values()), "changed": [], "removed": []}
+            else:
+                prev_header, prev_lines = prev
+                data = {
+                    "order": header,
+                    "replace": False,
+                    "added": [ln for lid, ln in lines.items() if lid not in prev_lines],
+                    "changed": [ln for lid, ln in lines.items() if lid in prev_lines and prev_lines[lid] != ln],
+                    "removed": [lid for lid in prev_lines if lid not in lines],
+                }
+                if header == prev_header and not (data["added"] or data["changed"] or data["removed"]):
+                    return None
+            return self.broker.publish("order", data)
+
+    def publish_removed(self, order_id):
+        with self._lock:
+            self._sent.pop(order_id, None)
+        if not self.broker.has_subscribers:
+            return None
+        return self.broker.publish("remove", {"order_id": order_id})
+
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+def get_feed():
+    global _feed
+    if _feed is None:
+        with _feed_lock:
+            if _feed is None:
+                broker_cls = import_string(_setting("KDS_BROKER", "orders.kds.LocalBroker"))
+                _feed = KitchenFeed(broker_cls())
+    return _feed
+
+
+def _safe(fn, order_id):
+    try:
+        fn(order_id)
+    except Exception:
+        # the kitchen screen is best effort; never fail a checkout over it
+        logger.exception("KDS publish for order %s failed", order_id)
+
+
+def publish_order(order_id):
+    _safe(get_feed().publish_order, order_id)
+
+
+def publish_removed(order_id):
+    _safe(get_feed().publish_removed, order_id)
@@ -0,0 +1,126 @@
+# orders/management/commands/bench_order_no.py
+"""
+Contention benchmark for the order number allocator.
+
+Runs N processes x M threads that each create orders as fast as they can and
+reports throughput, duplicate numbers and lock errors:
+
+    python manage.py bench_order_no --processes 4 --threads 4 --orders 200
+
+Orders are created on a fake business day (``--day``) so today's real
+sequence is not touched; they are deleted again unless ``--keep`` is given.
+"""
+import multiprocessing
+import threading
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, IntegrityError, connections
+
+PREFIX = "BENCH"
+
+
+def _thread_worker(day, n_orders, out):
+    from orders.models import Order
+    from orders.utils import generate_order_no
+
+    stats = {"ok": 0, "integrity": 0, "db_errors": 0, "numbers": []}
+    try:
+        for _ in range(n_orders):
+            try:
+                no = generate_order_no(prefix=PREFIX, day=day)
+                Order.objects.create(order_no=no)
+                stats["ok"] += 1
+                stats["numbers"].append(no)
+            except IntegrityError:
+                stats["integrity"] += 1
+            except DatabaseError:
+                stats["db_errors"] += 1
+    finally:
+        connections.close_all()
+    out.append(stats)
+
+
+def _process_worker(day, n_threads, n_orders, block_size, queue):
+    import django
+    django.setup()
+
+    from orders.utils import order_no_allocator
+
+    order_no_allocator.reset()
+    order_no_allocator.block_size = block_size
+
+    results = []
+    threads = [
+        threading.Thread(target=_thread_worker, args=(day, n_orders, results))
+        for _ in range(n_threads)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    queue.put(results)
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent order creation against the order number allocator."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=2)
+        parser.add_argument("--threads", type=int, default=4, help="Threads per process.")
+        parser.add_argument("--orders", type=int, default=100, help="Orders per thread.")
+        parser.add_argument("--block-size", type=int, default=10)
+        parser.add_argument("--day", default="2000-01-01", help="Fake business day used for the run.")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark orders.")
+
+    def handle(self, *args, **opts):
+        from orders.models import Order, OrderNumberSequence
+
+        day = date.fromisoformat(opts["day"])
+        day_prefix = f"{PREFIX}-{day.strftime('%Y%m%d')}-"
+
+        Order.objects.filter(order_no__startswith=day_prefix).delete()
+        OrderNumberSequence.objects.filter(day=day).delete()
+
+        # don't hand open connections to child processes
+        connections.close_all()
+
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        procs = [
+            ctx.Process(
+                target=_process_worker,
+                args=(day, opts["threads"], opts["orders"], opts["block_size"], queue),
+            )
+            for _ in range(opts["processes"])
+        ]
+
+        started = time.perf_counter()
+        for p in procs:
+            p.start()
+        results = [s for _ in procs for s in queue.get()]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - started
+
+        ok = sum(s["ok"] for s in results)
+        integrity = sum(s["integrity"] for s in results)
+        db_errors = sum(s["db_errors"] for s in results)
+        numbers = [n for s in results for n in s["numbers"]]
+        monotonic = all(s["numbers"] == sorted(s["numbers"]) for s in results)
+
+        self.stdout.write(
+            f"workers={opts['processes']}x{opts['threads']} block={opts['block_size']} "
+            f"orders={ok} in {elapsed:.2f}s ({ok / elapsed if elapsed else 0:.0f} orders/s)"
+        )
+        self.stdout.write(
+            f"duplicates={len(numbers) - len(set(numbers))} integrity_errors={integrity} "
+            f"db_errors={db_errors} per_worker_monotonic={monotonic}"
+        )
+        if numbers:
+            self.stdout.write(f"range: {min(numbers)} .. {max(numbers)}")
+
+        if not opts["keep"]:
+            Order.objects.filter(order_no__startswith=day_prefix).delete()
+            OrderNumberSequence.objects.filter(day=day).delete()
@@ -0,0 +1,99 @@
+# orders/management/commands/bench_receipts.py
+"""
+Micro-benchmark for receipt rendering.
+
+Renders the customer receipt / KOT for an in-memory order (no DB) and
+reports receipts per second for the compiled templates, next to the old
+string-concatenation builder for comparison:
+
+    python manage.py bench_receipts --items 12 --n 20000 --width 58
+"""
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from orders import receipt
+from orders.pos_printer import order_context
+
+
+class _Obj:
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+def _fake_order(n_items):
+    items = [
+        _Obj(
+            product=_Obj(name=f"Chicken Biriyani Special {i}"),
+            qty=i % 3 + 1,
+            unit_price=Decimal("250.00") + i,
+            line_total=(Decimal("250.00") + i) * (i % 3 + 1),
+        )
+        for i in range(n_items)
+    ]
+    subtotal = sum(it.line_total for it in items)
+    return _Obj(
+        order_no="ORD-20260101-000123",
+        created_at=datetime(2026, 1, 1, 13, 30),
+        customer=_Obj(name="Rahim Uddin", phone="01711000000"),
+        notes="Less spicy",
+        items=_Obj(all=lambda: items, select_related=lambda *a: _Obj(all=lambda: items)),
+        subtotal=subtotal,
+        discount_amount=Decimal("10.00"),
+        tax_amount=Decimal("0.00"),
+        grand_total=subtotal - 10,
+        paid_total=subtotal - 10,
+        due_total=Decimal("0.00"),
+    )
+
+
+def _legacy_receipt(ctx):
+    """The pre-template builder (string concat + ascii encode), kept for comparison."""
+    lines = ["\x1b\x40\x1b\x61\x01\x1b\x21\x30VHOJON BILASH\n\x1b\x21\x00Customer Receipt\n", "=" * 48 + "\n"]
+    lines.append("\x1b\x61\x00")
+    lines.append(f"Invoice: {ctx['order_no']}\n")
+    lines.append(f"Date   : {ctx['created_at'].strftime('%d-%b-%Y %I:%M %p')}\n")
+    lines.append(f"Customer: {ctx['customer_name']}\n")
+    lines.append(f"Phone   : {ctx['customer_phone']}\n")
+    lines.append("-" * 48 + "\n")
+    lines.append(f"{'Item':<24}{'Qty':>4}{'Price':>8}{'Total':>10}\n")
+    lines.append("-" * 48 + "\n")
+    for it in ctx["items"]:
+        lines.append(f"{it['name'][:24].ljust(24)}{it['qty']:>4}{it['unit']:>8}{it['total']:>10}\n")
+    lines.append("-" * 48 + "\n")
+    for label, key in (("Subtotal", "subtotal"), ("Grand Total", "grand_total"), ("Paid", "paid_total"), ("Due", "due_total")):
+        lines.append(f"{label:<28}{float(ctx[key]):>20.2f}\n")
+    lines.append("\x1b\x61\x01Thank you! Come again.\n\x1b\x61\x00\n\n\n\x1b\x64\x03\x1d\x56\x00")
+    return "".join(lines).encode("ascii", errors="ignore")
+
+
+class Command(BaseCommand):
+    help = "Benchmark ESC/POS receipt rendering (receipts per second)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--n", type=int, default=10000, help="Receipts to render per run.")
+        parser.add_argument("--items", type=int, default=8, help="Lines per receipt.")
+        parser.add_argument("--width", type=int, default=80, choices=sorted(receipt.PAPER_COLUMNS))
+        parser.add_argument("--codepage", default="cp437")
+
+    def _run(self, label, fn, n):
+        fn()  # warm up (compiles the template on first use)
+        started = time.perf_counter()
+        for _ in range(n):
+            fn()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:<22} {n / elapsed:>10.0f} receipts/s  ({elapsed * 1e6 / n:.1f} us each)")
+
+    def handle(self, *args, **opts):
+        n = opts["n"]
+        layout = receipt.Layout(width_mm=opts["width"], codepage=opts["codepage"])
+        order = _fake_order(opts["items"])
+        ctx = order_context(order)
+
+        self.stdout.write(f"paper={opts['width']}mm cols={layout.cols} items={opts['items']} n={n}")
+        self._run("legacy string builder", lambda: _legacy_receipt(ctx), n)
+        self._run("compiled receipt", lambda: receipt.render("customer_receipt", ctx, layout), n)
+        self._run("compiled kot", lambda: receipt.render("kot", ctx, layout), n)
+        self._run("context + receipt", lambda: receipt.render("customer_receipt", order_context(order), layout), n)
@@ -0,0 +1,59 @@
+# orders/management/commands/export_orders.py
+"""
+Write the order / item / payment exports to disk, streaming from the DB:
+
+    python manage.py export_orders --from 2026-01-01 --to 2026-01-31 --out exports/
+    python manage.py export_orders --dataset payments --format xlsx --status completed
+
+Filters are the same as the order list (and the export buttons on it).
+"""
+import os
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.export import CHUNK_SIZE, DATASETS, FORMATS, export_filename, write_export
+from orders.filters import filter_orders
+from orders.models import Order
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value} (use YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = "Export orders, order items and payments to CSV/XLSX files with constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", choices=[*DATASETS, "all"], default="all")
+        parser.add_argument("--format", choices=list(FORMATS), default="csv")
+        parser.add_argument("--from", dest="date_from", type=_date)
+        parser.add_argument("--to", dest="date_to", type=_date)
+        parser.add_argument("--status", default="", choices=["", *Order.Status.values])
+        parser.add_argument("--source", default="", choices=["", *Order.Source.values])
+        parser.add_argument("--due", default="", choices=["", "0", "1"])
+        parser.add_argument("--out", default=".", help="Output directory.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **opts):
+        os.makedirs(opts["out"], exist_ok=True)
+        orders_qs = filter_orders(
+            Order.objects.all(),
+            status=opts["status"],
+            source=opts["source"],
+            due=opts["due"],
+            date_from=opts["date_from"],
+            date_to=opts["date_to"],
+        )
+
+        names = list(DATASETS) if opts["dataset"] == "all" else [opts["dataset"]]
+        for name in names:
+            path = os.path.join(opts["out"], export_filename(name, opts["format"], opts["date_to"]))
+            started = time.perf_counter()
+            with open(path, "wb") as fh:
+                size = write_export(name, opts["format"], orders_qs, fh, chunk_size=opts["chunk_size"])
+            self.stdout.write(f"{path}: {size / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,43 @@
+# orders/management/commands/run_fake_printer.py
+"""
+Local stand-in for a LAN receipt printer: accepts raw TCP on port 9100 and
+writes every received chunk to stdout (or appends it to --out).
+
+    python manage.py run_fake_printer --port 9100
+    POS_PRINT_TRANSPORT = "lan", POS_PRINTER["HOST"] = "127.0.0.1"
+"""
+import socketserver
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Listen like an ESC/POS LAN printer and dump what it receives."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=9100)
+        parser.add_argument("--out", help="Append received bytes to this file.")
+
+    def handle(self, *args, **opts):
+        command = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                command.stdout.write(f"connection from {self.client_address[0]}")
+                while True:
+                    chunk = self.request.recv(65536)
+                    if not chunk:
+                        break
+                    if opts["out"]:
+                        with open(opts["out"], "ab") as f:
+                            f.write(chunk)
+                    command.stdout.write(chunk.decode("ascii", errors="replace"))
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        with socketserver.ThreadingTCPServer((opts["host"], opts["port"]), Handler) as server:
+            self.stdout.write(f"fake printer listening on {opts['host']}:{opts['port']}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
@@ -0,0 +1,39 @@
+# orders/management/commands/run_print_spooler.py
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.print_queue import PrinterWorker, get_printers
+
+
+class Command(BaseCommand):
+    help = "Run the print spooler: one worker thread per configured printer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("printers", nargs="*", help="Printer names (default: all configured).")
+        parser.add_argument("--once", action="store_true", help="Print what is due, then exit.")
+
+    def handle(self, *args, **opts):
+        configured = get_printers()
+        names = opts["printers"] or list(configured)
+        unknown = set(names) - set(configured)
+        if unknown:
+            raise CommandError(f"Unknown printer(s): {', '.join(sorted(unknown))}")
+
+        stop = threading.Event()
+        workers = [
+            PrinterWorker(name, configured[name], stop_event=stop, drain=opts["once"])
+            for name in names
+        ]
+        for w in workers:
+            w.start()
+            self.stdout.write(f"spooler started for printer '{w.printer}'")
+
+        try:
+            for w in workers:
+                while w.is_alive():
+                    w.join(timeout=1)
+        except KeyboardInterrupt:
+            stop.set()
+            for w in workers:
+                w.join()
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-17 23:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_number_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrintJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('printer', models.CharField(default='default', max_length=50)),
+                ('kind', models.CharField(choices=[('kot', 'Kitchen Order Ticket'), ('receipt', 'Customer Receipt')], max_length=10)),
+                ('data', models.BinaryField()),
+                ('dedupe_key', models.CharField(db_index=True, max_length=100)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('printing', 'Printing'), ('printed', 'Printed'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('printed_at', models.DateTimeField(blank=True, null=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='print_jobs', to='orders.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['printer', 'status', 'next_attempt_at'], name='printjob_queue_idx')],
+            },
+        ),
+    ]
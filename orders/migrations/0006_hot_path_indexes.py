@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_customer_balances'),
+        ('orders', '0005_print_job'),
+        ('payments', '0002_remove_paymentmethod_type_paymentmethod_is_active'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'id'], name='order_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('due_total__gt', 0)), fields=['id'], name='order_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('due_total__gt', 0), models.Q(('status', 'cancelled'), _negated=True)), fields=['customer', 'id'], name='order_customer_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['paid_at'], name='payment_paid_at_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 00:30
+
+from django.db import migrations, models
+
+
+def drop_pending_duplicates(apps, schema_editor):
+    # keep the oldest pending copy of each job, fail the rest
+    PrintJob = apps.get_model("orders", "PrintJob")
+    seen = set()
+    extra = []
+    pending = PrintJob.objects.filter(status__in=["queued", "printing"]).order_by("id")
+    for pk, key in pending.values_list("id", "dedupe_key"):
+        if key in seen:
+            extra.append(pk)
+        seen.add(key)
+    PrintJob.objects.filter(pk__in=extra).update(status="failed", last_error="Duplicate of an earlier pending job")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_pending_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='printjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'printing'])), fields=('dedupe_key',), name='printjob_pending_dedupe_uniq'),
+        ),
+    ]
@@ -2,13 +2,15 @@
 
 from decimal import Decimal
 from django.db import models, transaction
-from django.db.models import Sum
+from django.db.models import Q, Sum
 from django.utils import timezone
 
 from customers.models import Customer, CustomerAddress
 from catalog.models import Product
 from payments.models import PaymentMethod
 
+from . import totals
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(default=timezone.now, editable=False)
@@ -91,6 +93,19 @@ class Order(TimeStampedModel):
     notes = models.TextField(blank=True, null=True)
     ordered_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        # matched to the query shapes in vhojon.queryplan (check_query_plans)
+        indexes = [
+            models.Index(fields=["status", "id"], name="order_status_idx"),
+            models.Index(fields=["created_at", "id"], name="order_created_idx"),
+            models.Index(fields=["id"], condition=Q(due_total__gt=0), name="order_due_idx"),
+            models.Index(
+                fields=["customer", "id"],
+                condition=Q(due_total__gt=0) & ~Q(status="cancelled"),
+                name="order_customer_due_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.order_no
 
@@ -112,16 +127,27 @@ class Order(TimeStampedModel):
         """
         Order-level discount applied on subtotal (after item-level discounts).
         """
-        if not self.discount_type or self.discount_value in (None, ""):
-            return Decimal("0.00")
+        return totals.calc_discount(self.subtotal, self.discount_type, self.discount_value)
 
-        value = Decimal(self.discount_value)
+    def _set_totals(self, items_total: Decimal, paid: Decimal):
+        self.subtotal = items_total
+        self.discount_amount = self._calc_discount_amount()
+        self.grand_total = totals.calc_grand_total(self.subtotal, self.discount_amount, self.tax_amount)
+        self.paid_total = paid
+        self.due_total = totals.calc_due(self.grand_total, paid)
 
-        if self.discount_type == self.DiscountType.FIXED:
-            return max(Decimal("0.00"), min(value, self.subtotal))
+    def apply_totals(self, items, payments):
+        """
+        Compute totals in memory from unsaved/saved OrderItem and Payment
+        instances (e.g. the live rows of the order formsets). Does not save.
+        """
+        items_total = Decimal("0.00")
+        for it in items:
+            it.compute_line()
+            items_total += it.line_total
 
-        percent = min(max(value, Decimal("0.00")), Decimal("100.00"))
-        return (self.subtotal * percent / Decimal("100.00")).quantize(Decimal("0.01"))
+        paid = sum((p.amount or Decimal("0.00") for p in payments), Decimal("0.00"))
+        self._set_totals(items_total, paid)
 
     @transaction.atomic
     def recalc_totals(self):
@@ -130,17 +156,8 @@ class Order(TimeStampedModel):
         Then order-level discount applies, then tax, then payments => due.
         """
         items_total = self.items.aggregate(total=Sum("line_total"))["total"] or Decimal("0.00")
-        self.subtotal = items_total
-
-        self.discount_amount = self._calc_discount_amount()
-
-        self.grand_total = max(
-            Decimal("0.00"),
-            (self.subtotal - self.discount_amount + (self.tax_amount or Decimal("0.00"))),
-        ).quantize(Decimal("0.01"))
-
-        # update paid & due
-        self.recalc_payments(save=False)
+        paid = self.payments.aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
+        self._set_totals(items_total, paid)
 
         self.save(update_fields=[
             "subtotal",
@@ -155,7 +172,7 @@ class Order(TimeStampedModel):
     def recalc_payments(self, save=True):
         paid = self.payments.aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
         self.paid_total = paid
-        self.due_total = max(Decimal("0.00"), (self.grand_total or Decimal("0.00")) - paid).quantize(Decimal("0.01"))
+        self.due_total = totals.calc_due(self.grand_total, paid)
 
         if save:
             self.save(update_fields=["paid_total", "due_total", "updated_at"])
@@ -209,21 +226,15 @@ class OrderItem(TimeStampedModel):
         return f"{self.product.name} x {self.qty}"
 
     def _calc_discount_amount(self, gross: Decimal) -> Decimal:
-        if not self.discount_type or self.discount_value in (None, ""):
-            return Decimal("0.00")
-
-        dv = Decimal(self.discount_value)
+        return totals.calc_discount(gross, self.discount_type, self.discount_value)
 
-        if self.discount_type == self.DiscountType.FIXED:
-            return max(Decimal("0.00"), min(dv, gross))
-
-        pct = max(Decimal("0.00"), min(Decimal("100.00"), dv))
-        return (gross * pct / Decimal("100.00")).quantize(Decimal("0.01"))
+    def compute_line(self):
+        self.discount_amount, self.line_total = totals.calc_line(
+            self.qty, self.unit_price, self.discount_type, self.discount_value
+        )
 
     def save(self, *args, **kwargs):
-        gross = (Decimal(self.qty) * Decimal(self.unit_price)).quantize(Decimal("0.01"))
-        self.discount_amount = self._calc_discount_amount(gross)
-        self.line_total = max(Decimal("0.00"), (gross - self.discount_amount)).quantize(Decimal("0.01"))
+        self.compute_line()
         super().save(*args, **kwargs)
 
 
@@ -241,5 +252,72 @@ class Payment(TimeStampedModel):
     reference_no = models.CharField(max_length=100, blank=True, null=True)
     paid_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["paid_at"], name="payment_paid_at_idx"),
+        ]
+
     def __str__(self):
         return f"{self.order.order_no} - {self.amount}"
+
+
+class OrderNumberSequence(models.Model):
+    """
+    Per business day counter behind ``orders.utils.generate_order_no``.
+    Workers reserve blocks of numbers from ``last_value`` (see utils).
+    """
+    day = models.DateField(unique=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day:%Y%m%d} @ {self.last_value}"
+
+
+class PrintJob(TimeStampedModel):
+    """
+    Spooled ESC/POS job. Views enqueue rendered bytes; the print spooler
+    (``manage.py run_print_spooler``) sends them with retry/backoff.
+    """
+    class Kind(models.TextChoices):
+        KOT = "kot", "Kitchen Order Ticket"
+        RECEIPT = "receipt", "Customer Receipt"
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        PRINTING = "printing", "Printing"
+        PRINTED = "printed", "Printed"
+        FAILED = "failed", "Failed"
+
+    printer = models.CharField(max_length=50, default="default")
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="print_jobs",
+    )
+    data = models.BinaryField()
+    dedupe_key = models.CharField(max_length=100, db_index=True)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    printed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["printer", "status", "next_attempt_at"], name="printjob_queue_idx"),
+        ]
+        constraints = [
+            # one pending copy per job; enqueue() relies on it under concurrent requests
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=Q(status__in=["queued", "printing"]),
+                name="printjob_pending_dedupe_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
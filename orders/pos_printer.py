@@ -1,6 +1,8 @@
 # orders/pos_printer.py
 from django.conf import settings
 
+from . import receipt
+
 try:
     import win32print
 except ImportError:
@@ -10,17 +12,6 @@ except ImportError:
 # =====================================================
 # Helpers
 # =====================================================
-def _line(n=48, ch="-"):
-    return ch * n + "\n"
-
-
-def _money(v):
-    try:
-        return f"{float(v):.2f}"
-    except Exception:
-        return "0.00"
-
-
 def get_windows_printer_name():
     name = getattr(settings, "WINDOWS_POS_PRINTER_NAME", None)
     if not name:
@@ -52,14 +43,15 @@ def _get_order_items(order):
 # =====================================================
 # RAW PRINT
 # =====================================================
-def _raw_print(data: bytes):
+def _raw_print(data: bytes, name=None):
+    """RAW job to the Windows printer ``name`` (default WINDOWS_POS_PRINTER_NAME)."""
     if not getattr(settings, "POS_PRINTER_ENABLED", True):
         return False, "Printer disabled (DEV MODE)."
 
     if win32print is None:
         return False, "pywin32 not installed"
 
-    printer_name = get_windows_printer_name()
+    printer_name = name or get_windows_printer_name()
 
     try:
         hPrinter = win32print.OpenPrinter(printer_name)
@@ -80,117 +72,127 @@ def _raw_print(data: bytes):
         return False, str(e)
 
 
+# =====================================================
+# TEMPLATES (compiled once per paper width, see orders.receipt)
+# =====================================================
+def _time(ctx):
+    return ctx["created_at"].strftime("%d-%b-%Y %I:%M %p") if ctx["created_at"] else ""
+
+
+_CUSTOMER_LINES = [
+    receipt.field("Customer: {}", "customer_name"),
+    receipt.field("Phone   : {}", "customer_phone"),
+]
+
+_KOT_ROW = [("qty_label", 6, "<"), ("name", None, "<")]
+
+receipt.register("kot", [
+    receipt.init(),
+    receipt.raw(receipt.ALIGN_CENTER + receipt.SIZE_DOUBLE),
+    receipt.text("KITCHEN ORDER"),
+    receipt.raw(receipt.SIZE_NORMAL),
+    receipt.rule("="),
+    receipt.raw(receipt.ALIGN_LEFT),
+    receipt.field("Order: {}", "order_no"),
+    receipt.field("Time : {}", _time),
+    *_CUSTOMER_LINES,
+    receipt.section(lambda ctx: ctx["notes"], [
+        receipt.rule(),
+        receipt.field("Note: {}", "notes"),
+    ]),
+    receipt.rule("="),
+    receipt.text("ITEMS"),
+    receipt.rule(),
+    receipt.each("items", receipt.columns(_KOT_ROW), empty_text="** NO ITEMS FOUND **"),
+    receipt.raw(receipt.FEED_AND_CUT),
+])
+
+_RECEIPT_ROW = [("name", None, "<"), ("qty", 4, ">"), ("unit", 8, ">"), ("total", 9, ">")]
+
+receipt.register("customer_receipt", [
+    receipt.init(),
+    receipt.raw(receipt.ALIGN_CENTER + receipt.SIZE_DOUBLE),
+    receipt.text("VHOJON BILASH"),
+    receipt.raw(receipt.SIZE_NORMAL),
+    receipt.text("Customer Receipt"),
+    receipt.rule("="),
+    receipt.raw(receipt.ALIGN_LEFT),
+    receipt.field("Invoice: {}", "order_no"),
+    receipt.field("Date   : {}", _time),
+    *_CUSTOMER_LINES,
+    receipt.rule(),
+    receipt.header(["Item", "Qty", "Price", "Total"], _RECEIPT_ROW),
+    receipt.rule(),
+    receipt.each("items", receipt.columns(_RECEIPT_ROW), empty_text="NO ITEMS"),
+    receipt.rule(),
+    receipt.pair("Subtotal", "subtotal"),
+    receipt.pair("Discount", "discount_amount", negative=True, when=lambda ctx: ctx["discount_amount"] > 0),
+    receipt.pair("Tax", "tax_amount", when=lambda ctx: ctx["tax_amount"] > 0),
+    receipt.rule("="),
+    receipt.pair("Grand Total", "grand_total"),
+    receipt.pair("Paid", "paid_total"),
+    receipt.pair("Due", "due_total"),
+    receipt.rule(),
+    receipt.raw(receipt.ALIGN_CENTER),
+    receipt.text("Thank you! Come again."),
+    receipt.raw(receipt.ALIGN_LEFT),
+    receipt.raw(receipt.FEED_AND_CUT),
+])
+
+
+def order_context(order):
+    """
+    Plain dict of everything the templates print, read from the order once.
+    """
+    customer = getattr(order, "customer", None)
+    items = []
+    for it in _get_order_items(order):
+        qty = it.qty or 0
+        items.append({
+            "name": ((it.product.name if it.product else "") or "").strip(),
+            "qty": qty,
+            "qty_label": f"{qty} x",
+            "unit": receipt.money(it.unit_price),
+            "total": receipt.money(it.line_total),
+        })
+
+    return {
+        "order_no": order.order_no,
+        "created_at": order.created_at,
+        "customer_name": customer.name if customer else "",
+        "customer_phone": customer.phone if customer else "",
+        "notes": getattr(order, "notes", "") or "",
+        "items": items,
+        "subtotal": order.subtotal,
+        "discount_amount": order.discount_amount or 0,
+        "tax_amount": order.tax_amount or 0,
+        "grand_total": order.grand_total,
+        "paid_total": order.paid_total,
+        "due_total": order.due_total,
+    }
+
+
 # =====================================================
 # CHEF KOT
 # =====================================================
-def print_chef_kot(order):
-    items = _get_order_items(order)
-
-    lines = []
-    lines.append("\x1b\x40")          # init
-    lines.append("\x1b\x61\x01")      # center
-    lines.append("\x1b\x21\x30")      # double size
-    lines.append("KITCHEN ORDER\n")
-    lines.append("\x1b\x21\x00")
-    lines.append(_line(48, "="))
-
-    lines.append("\x1b\x61\x00")
-    lines.append(f"Order: {order.order_no}\n")
-    lines.append(f"Time : {order.created_at.strftime('%d-%b-%Y %I:%M %p')}\n")
-
-    if getattr(order, "customer", None):
-        if order.customer.name:
-            lines.append(f"Customer: {order.customer.name}\n")
-        if order.customer.phone:
-            lines.append(f"Phone   : {order.customer.phone}\n")
-
-    if getattr(order, "notes", None):
-        lines.append(_line())
-        lines.append(f"Note: {order.notes}\n")
-
-    lines.append(_line(48, "="))
-    lines.append("ITEMS\n")
-    lines.append(_line())
-
-    # 🔴 CRITICAL FIX: ensure items exist
-    if not items:
-        lines.append("** NO ITEMS FOUND **\n")
-    else:
-        for it in items:
-            pname = (it.product.name or "").strip()
-            qty = it.qty or 0
-            lines.append(f"{qty} x {pname}\n")
-
-    # 🔴 FEED before cut (VERY IMPORTANT)
-    lines.append("\n\n\n")
-    lines.append("\x1b\x64\x03")  # feed 3 lines
-    lines.append("\x1d\x56\x00")  # cut
-
-    data = "".join(lines).encode("ascii", errors="ignore")
-    return _raw_print(data)
+def build_chef_kot(order, layout=None) -> bytes:
+    return receipt.render("kot", order_context(order), layout)
 
 
 # =====================================================
 # CUSTOMER RECEIPT
 # =====================================================
+def build_customer_receipt(order, layout=None) -> bytes:
+    return receipt.render("customer_receipt", order_context(order), layout)
+
+
+# =====================================================
+# DIRECT PRINT (blocks until the printer answers)
+# Views go through orders.print_queue instead.
+# =====================================================
+def print_chef_kot(order):
+    return _raw_print(build_chef_kot(order))
+
+
 def print_customer_receipt(order):
-    items = _get_order_items(order)
-
-    lines = []
-    lines.append("\x1b\x40")
-    lines.append("\x1b\x61\x01")
-    lines.append("\x1b\x21\x30")
-    lines.append("VHOJON BILASH\n")
-    lines.append("\x1b\x21\x00")
-    lines.append("Customer Receipt\n")
-    lines.append(_line(48, "="))
-
-    lines.append("\x1b\x61\x00")
-    lines.append(f"Invoice: {order.order_no}\n")
-    lines.append(f"Date   : {order.created_at.strftime('%d-%b-%Y %I:%M %p')}\n")
-
-    if getattr(order, "customer", None):
-        if order.customer.name:
-            lines.append(f"Customer: {order.customer.name}\n")
-        if order.customer.phone:
-            lines.append(f"Phone   : {order.customer.phone}\n")
-
-    lines.append(_line())
-    lines.append(f"{'Item':<24}{'Qty':>4}{'Price':>8}{'Total':>10}\n")
-    lines.append(_line())
-
-    if not items:
-        lines.append("NO ITEMS\n")
-    else:
-        for it in items:
-            name = ((it.product.name or "")[:24]).ljust(24)
-            qty = it.qty or 0
-            unit = it.unit_price or 0
-            total = it.line_total or 0
-            lines.append(
-                f"{name}{qty:>4}{_money(unit):>8}{_money(total):>10}\n"
-            )
-
-    lines.append(_line())
-    lines.append(f"{'Subtotal':<28}{_money(order.subtotal):>20}\n")
-    if order.discount_amount > 0:
-        lines.append(f"{'Discount':<28}-{_money(order.discount_amount):>19}\n")
-    if order.tax_amount > 0:
-        lines.append(f"{'Tax':<28}{_money(order.tax_amount):>20}\n")
-
-    lines.append(_line(48, "="))
-    lines.append(f"{'Grand Total':<28}{_money(order.grand_total):>20}\n")
-    lines.append(f"{'Paid':<28}{_money(order.paid_total):>20}\n")
-    lines.append(f"{'Due':<28}{_money(order.due_total):>20}\n")
-
-    lines.append(_line())
-    lines.append("\x1b\x61\x01")
-    lines.append("Thank you! Come again.\n")
-    lines.append("\x1b\x61\x00")
-
-    lines.append("\n\n\n")
-    lines.append("\x1b\x64\x03")
-    lines.append("\x1d\x56\x00")
-
-    data = "".join(lines).encode("ascii", errors="ignore")
-    return _raw_print(data)
+    return _raw_print(build_customer_receipt(order))
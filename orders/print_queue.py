@@ -0,0 +1,300 @@
+# orders/print_queue.py
+"""
+Print spooler.
+
+Views call ``enqueue()`` with already rendered ESC/POS bytes and return at
+once; the job is stored in ``PrintJob``. ``manage.py run_print_spooler``
+runs one ``PrinterWorker`` thread per configured printer. Each worker keeps
+its printer connection open between jobs, and on failure reconnects and
+retries with exponential backoff until ``POS_PRINT_MAX_ATTEMPTS``.
+
+Printers come from ``settings.POS_PRINTERS`` (name -> config). Without it a
+single "default" printer is built from the older settings:
+
+    POS_PRINT_TRANSPORT = "windows"   # win32 RAW print to WINDOWS_POS_PRINTER_NAME
+    POS_PRINT_TRANSPORT = "lan"       # TCP to POS_PRINTER["HOST"]:POS_PRINTER["PORT"]
+"""
+import hashlib
+import logging
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import PrintJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRINTER = "default"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# =====================================================
+# PRINTER CONFIG / CONNECTIONS
+# =====================================================
+def get_printers():
+    printers = _setting("POS_PRINTERS", None)
+    if printers:
+        return printers
+
+    lan = _setting("POS_PRINTER", {})
+    return {
+        DEFAULT_PRINTER: {
+            "TRANSPORT": _setting("POS_PRINT_TRANSPORT", "windows"),
+            "NAME": _setting("WINDOWS_POS_PRINTER_NAME", None),
+            "HOST": lan.get("HOST"),
+            "PORT": lan.get("PORT", 9100),
+        }
+    }
+
+
+class LanPrinterConnection:
+    """
+    Raw TCP (port 9100) connection, kept open across jobs.
+
+    Printers drop idle connections (or lose them on a power cycle), and a
+    ``sendall()`` on such a socket still succeeds: the bytes sit in the
+    kernel buffer and the job would count as printed. So an idle socket is
+    checked before reuse and reopened if the printer closed it or it has
+    been idle longer than ``POS_PRINT_IDLE_SECONDS``.
+    """
+
+    def __init__(self, host, port=9100, timeout=10):
+        if not host:
+            raise ValueError("LAN printer HOST is not set")
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock = None
+        self._last_used = 0.0
+
+    def send(self, data: bytes):
+        if self._sock is not None and self._is_stale():
+            self.close()
+        if self._sock is None:
+            self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            self._sock.sendall(data)
+        except OSError:
+            self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def _is_stale(self):
+        idle = _setting("POS_PRINT_IDLE_SECONDS", 30)
+        if idle and time.monotonic() - self._last_used > idle:
+            return True
+        try:
+            self._sock.setblocking(False)
+            try:
+                peeked = self._sock.recv(1, socket.MSG_PEEK)
+            finally:
+                self._sock.settimeout(self.timeout)
+        except (BlockingIOError, InterruptedError):
+            return False   # open, nothing to read
+        except OSError:
+            return True    # reset by the printer
+        return peeked == b""   # EOF; status bytes mean it is still there
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+
+class WindowsPrinterConnection:
+    """
+    RAW job through the Windows spooler (pywin32); the OS keeps the device open.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def send(self, data: bytes):
+        from .pos_printer import _raw_print
+
+        ok, msg = _raw_print(data, self.name)
+        if not ok:
+            raise OSError(msg)
+
+    def close(self):
+        pass
+
+
+def open_printer(config):
+    transport = (config.get("TRANSPORT") or "windows").lower()
+    if transport == "lan":
+        return LanPrinterConnection(
+            config.get("HOST"),
+            config.get("PORT", 9100),
+            timeout=config.get("TIMEOUT", 10),
+        )
+    if transport == "windows":
+        return WindowsPrinterConnection(config.get("NAME"))
+    raise ValueError(f"Unknown printer transport: {transport}")
+
+
+# =====================================================
+# QUEUE
+# =====================================================
+def enqueue(order, kind, data: bytes, printer=DEFAULT_PRINTER):
+    """
+    Queue ``data`` for ``printer``. Returns (job, created).
+
+    The same bytes for the same order are not queued twice while a copy is
+    still pending, or if one printed in the last
+    ``POS_PRINT_DEDUPE_SECONDS`` (a double click at the counter). The
+    pending case is enforced by a partial unique index on ``dedupe_key``, so
+    two requests that both miss the check still end up with one job.
+    """
+    digest = hashlib.sha1(data).hexdigest()[:16]
+    key = f"{printer}:{kind}:{order.pk}:{digest}"
+
+    dup = _duplicate(key)
+    if dup:
+        return dup, False
+
+    try:
+        with transaction.atomic():
+            job = PrintJob.objects.create(
+                printer=printer,
+                kind=kind,
+                order=order,
+                data=data,
+                dedupe_key=key,
+            )
+    except IntegrityError:
+        # a concurrent request queued the same job after our check
+        dup = _duplicate(key)
+        if dup is None:
+            raise
+        return dup, False
+    return job, True
+
+
+def _duplicate(key):
+    recent = timezone.now() - timedelta(seconds=_setting("POS_PRINT_DEDUPE_SECONDS", 10))
+    return (
+        PrintJob.objects.filter(dedupe_key=key)
+        .filter(
+            Q(status__in=[PrintJob.Status.QUEUED, PrintJob.Status.PRINTING])
+            | Q(status=PrintJob.Status.PRINTED, printed_at__gte=recent)
+        )
+        .order_by("-id")
+        .first()
+    )
+
+
+def claim_next(printer):
+    """
+    Atomically move the oldest due job of ``printer`` to PRINTING.
+    """
+    now = timezone.now()
+    candidates = (
+        PrintJob.objects.filter(printer=printer, status=PrintJob.Status.QUEUED, next_attempt_at__lte=now)
+        .order_by("id")
+        .values_list("id", flat=True)[:5]
+    )
+    for pk in candidates:
+        claimed = PrintJob.objects.filter(pk=pk, status=PrintJob.Status.QUEUED).update(
+            status=PrintJob.Status.PRINTING,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return PrintJob.objects.get(pk=pk)
+    return None
+
+
+def retry_delay(attempts):
+    base = _setting("POS_PRINT_RETRY_BASE_SECONDS", 2)
+    cap = _setting("POS_PRINT_RETRY_MAX_SECONDS", 60)
+    return min(cap, base * (2 ** max(0, attempts - 1)))
+
+
+def mark_printed(job):
+    now = timezone.now()
+    PrintJob.objects.filter(pk=job.pk).update(
+        status=PrintJob.Status.PRINTED, printed_at=now, last_error="", updated_at=now
+    )
+
+
+def mark_failed(job, error):
+    now = timezone.now()
+    if job.attempts >= _setting("POS_PRINT_MAX_ATTEMPTS", 5):
+        status, next_at = PrintJob.Status.FAILED, now
+    else:
+        status, next_at = PrintJob.Status.QUEUED, now + timedelta(seconds=retry_delay(job.attempts))
+
+    PrintJob.objects.filter(pk=job.pk).update(
+        status=status, next_attempt_at=next_at, last_error=str(error)[:1000], updated_at=now
+    )
+
+
+def requeue_stuck(printer):
+    """
+    Jobs left PRINTING by a worker that died go back to the queue.
+    Assumes one spooler process per printer.
+    """
+    return PrintJob.objects.filter(printer=printer, status=PrintJob.Status.PRINTING).update(
+        status=PrintJob.Status.QUEUED, updated_at=timezone.now()
+    )
+
+
+# =====================================================
+# WORKER
+# =====================================================
+class PrinterWorker(threading.Thread):
+    def __init__(self, printer, config, poll_interval=None, stop_event=None, drain=False):
+        super().__init__(name=f"print-spooler-{printer}", daemon=True)
+        self.printer = printer
+        self.config = config
+        self.poll_interval = poll_interval or _setting("POS_PRINT_POLL_SECONDS", 0.5)
+        self.stop_event = stop_event or threading.Event()
+        self.drain = drain  # exit once nothing is due (tests / one-shot runs)
+        self.conn = None
+
+    def process_one(self):
+        """
+        Print one due job. Returns False if nothing was due.
+        """
+        job = claim_next(self.printer)
+        if job is None:
+            return False
+
+        try:
+            if self.conn is None:
+                self.conn = open_printer(self.config)
+            self.conn.send(bytes(job.data))
+        except Exception as e:
+            logger.warning("Print job %s on %s failed: %s", job.pk, self.printer, e)
+            if self.conn is not None:
+                self.conn.close()
+            mark_failed(job, e)
+        else:
+            mark_printed(job)
+        return True
+
+    def run(self):
+        requeue_stuck(self.printer)
+        try:
+            while not self.stop_event.is_set():
+                if not self.process_one():
+                    if self.drain:
+                        break
+                    self.stop_event.wait(self.poll_interval)
+        finally:
+            if self.conn is not None:
+                self.conn.close()
+            connection.close()
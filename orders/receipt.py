@@ -0,0 +1,366 @@
+# orders/receipt.py
+"""
+ESC/POS receipt layout engine.
+
+A template is a list of ops (``text``, ``field``, ``columns``, ``pair``,
+``each`` ...). ``compile_template`` turns it, once per paper width /
+codepage, into a flat list of segments:
+
+    bytes                     -> copied as-is (commands, rules, labels)
+    callable(ctx, buf)        -> writes one field straight into the bytearray
+
+so rendering a receipt is a single pass that appends into one ``bytearray``.
+
+Paper: 80 mm = 48 columns, 58 mm = 32 columns (Font A).
+
+Text goes out in the printer codepage (``POS_PRINTER_CODEPAGE``). A line that
+the codepage can't hold (e.g. Bangla product names) is drawn as a raster
+image when Pillow and a font (``POS_RASTER_FONT``) are available; otherwise
+the missing characters print as "?" instead of silently vanishing.
+"""
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from django.conf import settings
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageOps
+except ImportError:
+    Image = None
+
+# ESC/POS commands
+INIT = b"\x1b\x40"
+ALIGN_LEFT = b"\x1b\x61\x00"
+ALIGN_CENTER = b"\x1b\x61\x01"
+SIZE_NORMAL = b"\x1b\x21\x00"
+SIZE_DOUBLE = b"\x1b\x21\x30"
+FEED_AND_CUT = b"\n\n\n\x1b\x64\x03\x1d\x56\x00"
+
+PAPER_COLUMNS = {80: 48, 58: 32}
+PAPER_DOTS = {80: 576, 58: 384}
+
+# python codec -> ESC t n
+CODEPAGES = {
+    "cp437": 0,
+    "cp850": 2,
+    "cp860": 3,
+    "cp863": 4,
+    "cp865": 5,
+    "cp1252": 16,
+    "cp866": 17,
+    "cp852": 18,
+    "cp858": 19,
+}
+
+CENT = Decimal("0.01")
+
+
+def money(v) -> str:
+    try:
+        return str(Decimal(v or 0).quantize(CENT))
+    except (InvalidOperation, TypeError, ValueError):
+        return "0.00"
+
+
+# =====================================================
+# LAYOUT (paper width, encoding, raster fallback)
+# =====================================================
+class Layout:
+    def __init__(self, width_mm=80, codepage="cp437", raster_font=None, raster_font_size=22):
+        if width_mm not in PAPER_COLUMNS:
+            raise ValueError(f"Unsupported paper width: {width_mm} mm")
+        if codepage not in CODEPAGES:
+            raise ValueError(f"Unsupported printer codepage: {codepage}")
+        self.width_mm = width_mm
+        self.cols = PAPER_COLUMNS[width_mm]
+        self.dots = PAPER_DOTS[width_mm]
+        self.codepage = codepage
+        self.select_codepage = b"\x1b\x74" + bytes([CODEPAGES[codepage]])
+        self.raster_font = raster_font
+        self.raster_font_size = raster_font_size
+
+    def can_encode(self, text):
+        try:
+            text.encode(self.codepage)
+            return True
+        except UnicodeEncodeError:
+            return False
+
+    def encode(self, text) -> bytes:
+        return text.encode(self.codepage, errors="replace")
+
+    @property
+    def can_raster(self):
+        return Image is not None and bool(self.raster_font)
+
+    # -----------------------------
+    # CELLS -> BYTES
+    # A line is a list of (text, start_col, width, align) cells.
+    # -----------------------------
+    def cells_text(self, cells) -> str:
+        out = []
+        pos = 0
+        for text, start, width, align in cells:
+            if start > pos:
+                out.append(" " * (start - pos))
+            text = text[:width]
+            out.append(text.rjust(width) if align == ">" else text.ljust(width))
+            pos = start + width
+        return "".join(out).rstrip()
+
+    def write_cells(self, buf, cells):
+        if not self.can_raster or all(c[0].isascii() or self.can_encode(c[0]) for c in cells):
+            buf += self.encode(self.cells_text(cells))
+            buf += b"\n"
+        else:
+            buf += self.raster_cells(cells)
+
+    def raster_cells(self, cells) -> bytes:
+        font = _load_font(self.raster_font, self.raster_font_size)
+        dot_per_col = self.dots // self.cols
+        height = self.raster_font_size + 6
+
+        img = Image.new("L", (self.dots, height), 255)
+        draw = ImageDraw.Draw(img)
+        for text, start, width, align in cells:
+            x0 = start * dot_per_col
+            box = min(width, self.cols - start) * dot_per_col
+            while text and draw.textlength(text, font=font) > box:
+                text = text[:-1]
+            x = x0 + box - draw.textlength(text, font=font) if align == ">" else x0
+            draw.text((x, 2), text, font=font, fill=0)
+
+        # GS v 0: 1 bit per dot, 1 = black
+        bits = ImageOps.invert(img).convert("1").tobytes()
+        wb = self.dots // 8
+        return b"\x1d\x76\x30\x00" + bytes([wb & 0xFF, wb >> 8, height & 0xFF, height >> 8]) + bits
+
+
+@lru_cache(maxsize=4)
+def _load_font(path, size):
+    return ImageFont.truetype(path, size)
+
+
+def default_layout():
+    return Layout(
+        width_mm=getattr(settings, "POS_PAPER_WIDTH_MM", 80),
+        codepage=getattr(settings, "POS_PRINTER_CODEPAGE", "cp437"),
+        raster_font=getattr(settings, "POS_RASTER_FONT", None),
+    )
+
+
+# =====================================================
+# TEMPLATE OPS
+# Each op compiles to a list of segments for a given layout.
+# =====================================================
+def raw(data: bytes):
+    return lambda layout: [data]
+
+
+def init():
+    """Reset the printer, then select the layout's codepage."""
+    return lambda layout: [INIT + layout.select_codepage]
+
+
+def text(value: str):
+    """Fixed text line."""
+    return lambda layout: [_static_line(layout, value)]
+
+
+def rule(ch="-"):
+    return lambda layout: [(ch * layout.cols + "\n").encode("ascii")]
+
+
+def field(fmt: str, key, when=None):
+    """
+    ``fmt`` with one ``{}`` filled from ``key`` (a ctx key or callable).
+    Skipped when the value is empty, or ``when(ctx)`` is false.
+    """
+    getter = _getter(key)
+
+    def compile_op(layout):
+        prefix, _, suffix = fmt.partition("{}")
+
+        if layout.can_encode(prefix + suffix) and not layout.can_raster:
+            # common case: literal parts pre-encoded, only the value encodes per render
+            head, tail = layout.encode(prefix), layout.encode(suffix) + b"\n"
+
+            def seg(ctx, buf):
+                if when is not None and not when(ctx):
+                    return
+                value = getter(ctx)
+                if value in (None, ""):
+                    return
+                value = str(value)
+                buf += head
+                buf += value.encode("ascii") if value.isascii() else layout.encode(value)
+                buf += tail
+            return [seg]
+
+        def seg(ctx, buf):
+            if when is not None and not when(ctx):
+                return
+            value = getter(ctx)
+            if value in (None, ""):
+                return
+            layout.write_cells(buf, [(f"{prefix}{value}{suffix}", 0, layout.cols * 4, "<")])
+        return [seg]
+
+    return compile_op
+
+
+def pair(label, key, negative=False, when=None):
+    """Label on the left, money value right-aligned to the paper edge."""
+    getter = _getter(key)
+
+    def compile_op(layout):
+        value_w = max(12, layout.cols // 2 - 4)
+        label_bytes = layout.encode(label[: layout.cols - value_w].ljust(layout.cols - value_w))
+
+        def seg(ctx, buf):
+            if when is not None and not when(ctx):
+                return
+            value = money(getter(ctx))
+            if negative:
+                value = "-" + value
+            buf += label_bytes
+            buf += value.rjust(value_w).encode("ascii")
+            buf += b"\n"
+        return [seg]
+
+    return compile_op
+
+
+def columns(spec):
+    """
+    Header-less row layout: ``spec`` is [(key, weight_or_width, align)].
+    Widths: ints are fixed columns, ``None`` takes the remaining space.
+    Compiles to a callable that writes one row from a row dict.
+    """
+    def compile_op(layout):
+        fixed = sum(w for _, w, _ in spec if w)
+        flex = max(1, layout.cols - fixed)
+        cells = []
+        pos = 0
+        for key, width, align in spec:
+            width = width or flex
+            cells.append((_getter(key), pos, width, align))
+            pos += width
+
+        # fast path: cells are contiguous, so the whole row is one str.format
+        if all(isinstance(key, str) for key, _, _ in spec):
+            row_fmt = "".join(f"{{{key}!s:{a}{w}.{w}}}" for (key, _, _), (_, _, w, a) in zip(spec, cells))
+            format_row = row_fmt.format_map
+        else:
+            row_fmt = "".join(f"{{!s:{a}{w}.{w}}}" for _, _, w, a in cells)
+            format_row = lambda row: row_fmt.format(*[get(row) for get, _, _, _ in cells])
+
+        def seg(row, buf):
+            line = format_row(row).rstrip()
+            if line.isascii():
+                buf += line.encode("ascii")
+                buf += b"\n"
+            else:
+                layout.write_cells(buf, [(str(get(row)), start, w, a) for get, start, w, a in cells])
+        return seg
+
+    return compile_op
+
+
+def header(spec_labels, spec):
+    """Column titles laid out with the same widths as ``columns(spec)``."""
+    def compile_op(layout):
+        row = dict(zip([k for k, _, _ in spec], spec_labels))
+        buf = bytearray()
+        columns(spec)(layout)(row, buf)
+        return [bytes(buf)]
+    return compile_op
+
+
+def each(key, row_op, empty_text=None):
+    """Repeat ``row_op`` (a ``columns`` op) for every row in ``ctx[key]``."""
+    def compile_op(layout):
+        write_row = row_op(layout)
+        empty = _static_line(layout, empty_text) if empty_text else b""
+
+        def seg(ctx, buf):
+            rows = ctx.get(key) or []
+            if not rows:
+                buf += empty
+            for row in rows:
+                write_row(row, buf)
+        return [seg]
+    return compile_op
+
+
+def section(when, ops):
+    """Ops rendered only if ``when(ctx)`` is true."""
+    def compile_op(layout):
+        inner = CompiledTemplate(layout, ops)
+
+        def seg(ctx, buf):
+            if when(ctx):
+                inner.render_into(ctx, buf)
+        return [seg]
+    return compile_op
+
+
+def _getter(key):
+    if callable(key):
+        return key
+    return lambda ctx: ctx.get(key)
+
+
+def _static_line(layout, value):
+    buf = bytearray()
+    layout.write_cells(buf, [(value, 0, layout.cols * 4, "<")])
+    return bytes(buf)
+
+
+# =====================================================
+# COMPILED TEMPLATE
+# =====================================================
+class CompiledTemplate:
+    def __init__(self, layout, ops):
+        self.layout = layout
+        segments = []
+        for op in ops:
+            for seg in op(layout):
+                # merge adjacent literals into one bytes object
+                if isinstance(seg, bytes) and segments and isinstance(segments[-1], bytes):
+                    segments[-1] += seg
+                else:
+                    segments.append(seg)
+        self.segments = segments
+
+    def render_into(self, ctx, buf):
+        for seg in self.segments:
+            if isinstance(seg, bytes):
+                buf += seg
+            else:
+                seg(ctx, buf)
+
+    def render(self, ctx) -> bytes:
+        buf = bytearray()
+        self.render_into(ctx, buf)
+        return bytes(buf)
+
+
+_registry = {}
+
+
+def register(name, ops):
+    _registry[name] = ops
+    compile_template.cache_clear()
+
+
+@lru_cache(maxsize=32)
+def compile_template(name, width_mm, codepage, raster_font):
+    layout = Layout(width_mm=width_mm, codepage=codepage, raster_font=raster_font)
+    return CompiledTemplate(layout, _registry[name])
+
+
+def render(name, ctx, layout=None) -> bytes:
+    layout = layout or default_layout()
+    tpl = compile_template(name, layout.width_mm, layout.codepage, layout.raster_font)
+    return tpl.render(ctx)
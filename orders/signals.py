@@ -1,15 +1,86 @@
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
+import threading
 
-from .models import OrderItem, Payment
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from customers import balances
+
+from . import totals
+from .models import Order, OrderItem, Payment
+
+# Sent by orders.checkout after payments are written with bulk_create /
+# bulk_update (no per-row post_save). Args: created=[Payment],
+# updated=[(Payment, old_amount)].
+payments_bulk_saved = Signal()
+
+# pks of orders whose delete is under way (see order_deleting)
+_deleting = threading.local()
+
+
+def _being_deleted(order_id):
+    return order_id in getattr(_deleting, "pks", ())
 
 
 @receiver([post_save, post_delete], sender=OrderItem)
 def orderitem_changed(sender, instance, **kwargs):
+    if _being_deleted(instance.order_id):
+        return
+    if totals.is_deferred():
+        totals.mark_dirty(instance.order)
+        return
     instance.order.recalc_totals()
 
 
 @receiver([post_save, post_delete], sender=Payment)
 def payment_changed(sender, instance, **kwargs):
+    if _being_deleted(instance.order_id):
+        return
+    if totals.is_deferred():
+        totals.mark_dirty(instance.order)
+        return
     # payments affect paid_total/due_total
     instance.order.recalc_payments()
+
+
+@receiver(pre_delete, sender=Order)
+def order_deleting(sender, instance, **kwargs):
+    # The cascade deletes items / payments before the order row; recalcing
+    # (and re-saving) the order from their signals is wasted work and would
+    # move the customer balance by a total that order_deleted never sees.
+    if not hasattr(_deleting, "pks"):
+        _deleting.pks = set()
+    _deleting.pks.add(instance.pk)
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    # nothing left to recalc for a deleted order
+    getattr(_deleting, "pks", set()).discard(instance.pk)
+    totals.mark_clean(instance)
+    balances.move(balances.of(instance), None)
+
+
+# -----------------------------
+# Customer balance columns (customers.balances)
+# -----------------------------
+_UNTOUCHED = object()
+
+
+@receiver(pre_save, sender=Order)
+def order_balance_before(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        instance._balance_old = None
+    elif update_fields is not None and not balances.TRACKED_FIELDS.intersection(update_fields):
+        instance._balance_old = _UNTOUCHED
+    else:
+        # the instance already carries the new values; read what is stored
+        instance._balance_old = balances.stored(instance)
+
+
+@receiver(post_save, sender=Order)
+def order_balance_after(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata; run reconcile_customer_totals afterwards
+    old = getattr(instance, "_balance_old", _UNTOUCHED)
+    if old is not _UNTOUCHED:
+        balances.move(old, balances.of(instance))
@@ -1,3 +1,793 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.cache import catalog_cache
+from catalog.models import Category, Product
+from customers.models import Customer
+from payments.models import PaymentMethod
+from vhojon import dbprofile, keyset, timewindow
+
+from .forms import OrderItemFormSet
+from .models import Order, OrderItem, OrderNumberSequence, Payment, PrintJob
+from . import kds, print_queue, receipt
+from .export import DATASETS, write_export
+from .pos_printer import build_chef_kot, build_customer_receipt
+from .print_queue import PrinterWorker, enqueue
+from .totals import deferred_recalc
+from .utils import OrderNoAllocator, format_order_no, generate_order_no, order_no_allocator
+
+
+def order_post_data(products, method, paid="0.00", discount_value=""):
+    data = {
+        "source": Order.Source.STORE,
+        "status": Order.Status.PENDING,
+        "discount_type": "percent" if discount_value else "",
+        "discount_value": discount_value,
+        "tax_amount": "0.00",
+        "notes": "",
+
+        "items-TOTAL_FORMS": str(len(products)),
+        "items-INITIAL_FORMS": "0",
+        "items-MIN_NUM_FORMS": "0",
+        "items-MAX_NUM_FORMS": "1000",
+
+        "payments-TOTAL_FORMS": "1",
+        "payments-INITIAL_FORMS": "0",
+        "payments-MIN_NUM_FORMS": "0",
+        "payments-MAX_NUM_FORMS": "1000",
+        "payments-0-payment_method": str(method.pk),
+        "payments-0-amount": paid,
+        "payments-0-reference_no": "",
+    }
+    for i, p in enumerate(products):
+        data[f"items-{i}-product"] = str(p.pk)
+        data[f"items-{i}-qty"] = "2"
+        data[f"items-{i}-unit_price"] = ""
+        data[f"items-{i}-discount_type"] = ""
+        data[f"items-{i}-discount_value"] = ""
+    return data
+
+
+class OrderTotalsTestBase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("cashier", password="pw", is_staff=True)
+        category = Category.objects.create(name="Rice")
+        cls.products = [
+            Product.objects.create(category=category, name=f"Item {i}", sku=f"SKU{i}", sale_price=Decimal("10.00"))
+            for i in range(30)
+        ]
+        cls.method = PaymentMethod.objects.create(name="Cash")
+
+    def setUp(self):
+        # test data is never committed, so nothing bumps the catalog generation
+        catalog_cache.invalidate()
+        self.client.force_login(self.user)
+
+    def post_order(self, n, **kwargs):
+        return self.client.post(
+            reverse("orders:order_create"),
+            order_post_data(self.products[:n], self.method, **kwargs),
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+
+
+class OrderCreateTotalsTests(OrderTotalsTestBase):
+    def test_totals_computed_in_memory(self):
+        res = self.post_order(3, paid="25.00", discount_value="10")
+        self.assertEqual(res.status_code, 200, res.content)
+
+        order = Order.objects.get(pk=res.json()["order_id"])
+        self.assertEqual(order.subtotal, Decimal("60.00"))
+        self.assertEqual(order.discount_amount, Decimal("6.00"))
+        self.assertEqual(order.grand_total, Decimal("54.00"))
+        self.assertEqual(order.paid_total, Decimal("25.00"))
+        self.assertEqual(order.due_total, Decimal("29.00"))
+        self.assertEqual(order.items.count(), 3)
+
+    def test_order_row_written_once(self):
+        self.post_order(1)   # warm the catalog cache and the session
+        counts = []
+        for n in (1, 30):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.post_order(n, paid="5.00")
+            self.assertEqual(res.status_code, 200, res.content)
+
+            sql = [q["sql"] for q in ctx.captured_queries]
+            order_writes = [s for s in sql if s.startswith(('INSERT INTO "orders_order"', 'UPDATE "orders_order"'))]
+            item_inserts = [s for s in sql if s.startswith('INSERT INTO "orders_orderitem"')]
+            aggregates = [s for s in sql if "SUM(" in s]
+
+            self.assertEqual(len(order_writes), 1, order_writes)
+            self.assertEqual(len(item_inserts), 1)
+            self.assertEqual(aggregates, [])
+            counts.append(len(sql))
+
+        # checkout cost does not depend on the number of lines
+        self.assertEqual(counts[0], counts[1])
+
+
+class OrderUpdateBulkTests(OrderTotalsTestBase):
+    def test_update_adds_changes_and_deletes_rows(self):
+        order = Order.objects.create(order_no="ORD-T-U")
+        keep = OrderItem.objects.create(order=order, product=self.products[0], qty=1, unit_price=Decimal("10.00"))
+        drop = OrderItem.objects.create(order=order, product=self.products[1], qty=1, unit_price=Decimal("10.00"))
+
+        data = order_post_data([self.products[2]], self.method, paid="15.00")
+        data.update({
+            "items-TOTAL_FORMS": "3",
+            "items-INITIAL_FORMS": "2",
+            "items-0-id": str(keep.pk),
+            "items-0-product": str(self.products[0].pk),
+            "items-0-qty": "4",
+            "items-0-unit_price": "10.00",
+            "items-1-id": str(drop.pk),
+            "items-1-product": str(self.products[1].pk),
+            "items-1-qty": "1",
+            "items-1-unit_price": "10.00",
+            "items-1-DELETE": "on",
+            "items-2-product": str(self.products[2].pk),
+            "items-2-qty": "2",
+        })
+        for key in ("items-0-discount_type", "items-0-discount_value", "items-1-discount_type",
+                    "items-1-discount_value", "items-2-unit_price", "items-2-discount_type",
+                    "items-2-discount_value"):
+            data.setdefault(key, "")
+
+        res = self.client.post(reverse("orders:order_update", args=[order.pk]), data)
+        self.assertEqual(res.status_code, 302)
+
+        order.refresh_from_db()
+        self.assertEqual(order.items.count(), 2)
+        self.assertFalse(OrderItem.objects.filter(pk=drop.pk).exists())
+        self.assertEqual(OrderItem.objects.get(pk=keep.pk).line_total, Decimal("40.00"))
+        self.assertEqual(order.subtotal, Decimal("60.00"))
+        self.assertEqual(order.paid_total, Decimal("15.00"))
+        self.assertEqual(order.due_total, Decimal("45.00"))
+
+
+class OrderItemFormSetTests(OrderTotalsTestBase):
+    def bound_formset(self, order, products):
+        data = order_post_data(products, self.method)
+        for i, item in enumerate(order.items.order_by("id")):
+            data[f"items-{i}-id"] = str(item.pk)
+        data["items-INITIAL_FORMS"] = str(order.items.count())
+        return OrderItemFormSet(data, instance=order, prefix="items")
+
+    def test_rows_render_only_the_selected_product(self):
+        order = Order.objects.create(order_no="ORD-T-F")
+        OrderItem.objects.create(order=order, product=self.products[3], qty=1, unit_price=Decimal("10.00"))
+
+        formset = OrderItemFormSet(instance=order, prefix="items")
+        saved = str(formset.forms[0]["product"])
+        self.assertEqual(saved.count("<option"), 2)
+        self.assertIn(f'<option value="{self.products[3].pk}" selected>Item 3 (SKU3)</option>', saved)
+        self.assertEqual(str(formset.empty_form["product"]).count("<option"), 1)
+
+    def test_validation_queries_do_not_grow_with_rows(self):
+        order = Order.objects.create(order_no="ORD-T-V")
+        catalog_cache.get()
+        counts = []
+        for n in (1, 25):
+            with CaptureQueriesContext(connection) as ctx:
+                formset = self.bound_formset(order, self.products[:n])
+                self.assertTrue(formset.is_valid(), formset.errors)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_update_queries_do_not_grow_with_saved_lines(self):
+        catalog_cache.get()
+        counts = []
+        for n in (2, 12):
+            order = Order.objects.create(order_no=f"ORD-T-S{n}")
+            data = order_post_data(self.products[:n], self.method)
+            data.update({"items-INITIAL_FORMS": str(n), "payments-TOTAL_FORMS": str(n), "payments-INITIAL_FORMS": str(n)})
+            for i, product in enumerate(self.products[:n]):
+                item = OrderItem.objects.create(order=order, product=product, qty=1, unit_price=Decimal("10.00"))
+                pay = Payment.objects.create(order=order, payment_method=self.method, amount=Decimal("1.00"))
+                data.update({
+                    f"items-{i}-id": str(item.pk),
+                    f"payments-{i}-id": str(pay.pk),
+                    f"payments-{i}-payment_method": str(self.method.pk),
+                    f"payments-{i}-amount": "2.00",
+                    f"payments-{i}-reference_no": "",
+                })
+
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(reverse("orders:order_update", args=[order.pk]), data)
+            self.assertEqual(res.status_code, 302)
+            counts.append(len(ctx.captured_queries))
+            self.assertEqual(Order.objects.get(pk=order.pk).paid_total, Decimal("2.00") * n)
+        self.assertEqual(counts[0], counts[1])
+
+    def test_saved_line_ids_come_from_this_order_only(self):
+        order = Order.objects.create(order_no="ORD-T-O")
+        mine = OrderItem.objects.create(order=order, product=self.products[0], qty=1, unit_price=Decimal("10.00"))
+        other = Order.objects.create(order_no="ORD-T-X")
+        theirs = OrderItem.objects.create(order=other, product=self.products[1], qty=1, unit_price=Decimal("10.00"))
+        catalog_cache.get()
+
+        for value, valid in ((mine.pk, True), (theirs.pk, False), ("abc", False)):
+            formset = self.bound_formset(order, self.products[:1])
+            formset.data = {**formset.data, "items-0-id": str(value)}
+            self.assertEqual(formset.is_valid(), valid, formset.errors)
+            if not valid:
+                self.assertIn("id", formset.errors[0])
+
+    def test_inactive_product_stays_valid_on_its_saved_line_only(self):
+        order = Order.objects.create(order_no="ORD-T-I")
+        OrderItem.objects.create(order=order, product=self.products[0], qty=1, unit_price=Decimal("10.00"))
+        Product.objects.filter(pk=self.products[0].pk).update(is_active=False)
+        catalog_cache.invalidate()
+        catalog_cache.get()
+
+        with CaptureQueriesContext(connection) as ctx:
+            formset = self.bound_formset(order, [self.products[0], self.products[0]])
+            self.assertFalse(formset.is_valid())
+        product_queries = [q["sql"] for q in ctx.captured_queries if 'FROM "catalog_product"' in q["sql"]]
+        self.assertEqual(len(product_queries), 1)   # one id__in for the saved line
+        self.assertEqual(formset.errors[0], {})
+        self.assertIn("product", formset.errors[1])
+
+
+class DeferredRecalcTests(OrderTotalsTestBase):
+    def test_pending_orders_recalculated_on_exit(self):
+        order = Order.objects.create(order_no="ORD-T-1")
+
+        with deferred_recalc():
+            for p in self.products[:5]:
+                OrderItem.objects.create(order=order, product=p, qty=1, unit_price=p.sale_price)
+            Payment.objects.create(order=order, payment_method=self.method, amount=Decimal("20.00"))
+
+            order.refresh_from_db()
+            self.assertEqual(order.subtotal, Decimal("0.00"))
+
+        order.refresh_from_db()
+        self.assertEqual(order.grand_total, Decimal("50.00"))
+        self.assertEqual(order.due_total, Decimal("30.00"))
+
+    def test_signals_still_recalc_outside_block(self):
+        order = Order.objects.create(order_no="ORD-T-2")
+        OrderItem.objects.create(order=order, product=self.products[0], qty=3, unit_price=Decimal("10.00"))
+
+        order.refresh_from_db()
+        self.assertEqual(order.grand_total, Decimal("30.00"))
+
+
+class OrderNoAllocatorTests(TransactionTestCase):
+    def test_blocks_reserved_once_per_block_size(self):
+        day = date(2026, 10, 17)
+        alloc = OrderNoAllocator(block_size=5)
+
+        values = [alloc.next_value(day) for _ in range(7)]
+
+        self.assertEqual(values, [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(OrderNumberSequence.objects.get(day=day).last_value, 10)
+
+    def test_workers_get_disjoint_blocks(self):
+        day = date(2026, 10, 17)
+        a, b = OrderNoAllocator(block_size=3), OrderNoAllocator(block_size=3)
+
+        self.assertEqual([a.next_value(day), b.next_value(day), a.next_value(day)], [1, 4, 2])
+
+    def test_new_day_starts_new_sequence(self):
+        alloc = OrderNoAllocator(block_size=3)
+        alloc.next_value(date(2026, 10, 17))
+
+        self.assertEqual(alloc.next_value(date(2026, 10, 18)), 1)
+
+    def test_format(self):
+        self.assertEqual(format_order_no(date(2026, 10, 17), 123), "ORD-20261017-000123")
+
+    @override_settings(BUSINESS_DAY_CUTOFF_HOUR=3)
+    def test_numbered_by_business_day(self):
+        order_no_allocator.reset()
+        self.addCleanup(order_no_allocator.reset)
+        after_midnight = timezone.make_aware(datetime(2026, 10, 18, 1, 30))
+
+        with mock.patch("django.utils.timezone.now", return_value=after_midnight):
+            self.assertEqual(generate_order_no(), "ORD-20261017-000001")
+        self.assertEqual(OrderNumberSequence.objects.get().day, date(2026, 10, 17))
+
+
+class OrderNoInTransactionTests(TestCase):
+    def test_no_block_cached_inside_transaction(self):
+        day = date(2026, 10, 17)
+        alloc = OrderNoAllocator(block_size=50)
+
+        self.assertEqual([alloc.next_value(day), alloc.next_value(day)], [1, 2])
+        self.assertEqual(OrderNumberSequence.objects.get(day=day).last_value, 2)
+
+
+class FakeLanPrinter:
+    """
+    Local TCP stand-in for a port 9100 printer (ephemeral port in tests).
+    """
+
+    def __init__(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+        self.received = b""
+        self.connections = 0
+        self._open = []
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self._open.append(conn)
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn):
+        with conn:
+            try:
+                while chunk := conn.recv(65536):
+                    self.received += chunk
+            except OSError:
+                pass
+
+    def hang_up(self):
+        """Close every accepted connection, like a printer dropping idle clients."""
+        while self._open:
+            conn = self._open.pop()
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def wait_for(self, n_bytes, timeout=2):
+        deadline = timezone.now() + timedelta(seconds=timeout)
+        while len(self.received) < n_bytes and timezone.now() < deadline:
+            threading.Event().wait(0.01)
+
+    def close(self):
+        self.server.close()
+
+
+@override_settings(POS_PRINTER_ENABLED=True, POS_PRINT_MAX_ATTEMPTS=2)
+class PrintQueueTests(OrderTotalsTestBase):
+    def setUp(self):
+        super().setUp()
+        self.order = Order.objects.create(order_no="ORD-P-1")
+        OrderItem.objects.create(order=self.order, product=self.products[0], qty=2, unit_price=Decimal("10.00"))
+
+    def test_endpoint_enqueues_and_suppresses_duplicates(self):
+        url = reverse("orders:order_print_chef", args=[self.order.pk])
+        first = self.client.get(url).json()
+        second = self.client.get(url).json()
+
+        self.assertEqual(first["status"], "queued")
+        self.assertFalse(first["duplicate"])
+        self.assertTrue(second["duplicate"])
+        self.assertEqual(first["job_id"], second["job_id"])
+        self.assertEqual(PrintJob.objects.count(), 1)
+
+        status = self.client.get(first["status_url"]).json()
+        self.assertEqual(status["status"], "queued")
+
+    def test_worker_prints_over_persistent_connection(self):
+        printer = FakeLanPrinter()
+        self.addCleanup(printer.close)
+        worker = PrinterWorker("default", {"TRANSPORT": "lan", "HOST": "127.0.0.1", "PORT": printer.port})
+
+        a, _ = enqueue(self.order, PrintJob.Kind.KOT, b"KOT-BYTES")
+        b, _ = enqueue(self.order, PrintJob.Kind.RECEIPT, b"RECEIPT-BYTES")
+        self.assertTrue(worker.process_one())
+        self.assertTrue(worker.process_one())
+        self.assertFalse(worker.process_one())
+        worker.conn.close()
+
+        printer.wait_for(len(b"KOT-BYTESRECEIPT-BYTES"))
+        self.assertEqual(printer.received, b"KOT-BYTESRECEIPT-BYTES")
+        self.assertEqual(printer.connections, 1)
+        self.assertEqual(
+            list(PrintJob.objects.order_by("id").values_list("status", flat=True)),
+            ["printed", "printed"],
+        )
+
+    def test_reconnects_when_the_printer_dropped_the_idle_connection(self):
+        printer = FakeLanPrinter()
+        self.addCleanup(printer.close)
+        worker = PrinterWorker("default", {"TRANSPORT": "lan", "HOST": "127.0.0.1", "PORT": printer.port})
+        self.addCleanup(lambda: worker.conn and worker.conn.close())
+
+        enqueue(self.order, PrintJob.Kind.KOT, b"KOT-BYTES")
+        self.assertTrue(worker.process_one())
+        printer.wait_for(len(b"KOT-BYTES"))
+        printer.hang_up()
+        threading.Event().wait(0.1)   # let the FIN reach the worker's socket
+
+        enqueue(self.order, PrintJob.Kind.RECEIPT, b"RECEIPT-BYTES")
+        self.assertTrue(worker.process_one())
+
+        printer.wait_for(len(b"KOT-BYTESRECEIPT-BYTES"))
+        self.assertEqual(printer.received, b"KOT-BYTESRECEIPT-BYTES")
+        self.assertEqual(printer.connections, 2)
+        self.assertEqual(
+            list(PrintJob.objects.order_by("id").values_list("status", flat=True)),
+            ["printed", "printed"],
+        )
+
+    @override_settings(WINDOWS_POS_PRINTER_NAME="POSPrinter POS80", POS_PRINTERS={
+        "kitchen": {"TRANSPORT": "windows", "NAME": "Kitchen POS58"},
+        "counter": {"TRANSPORT": "windows", "NAME": "Counter POS80"},
+    })
+    def test_windows_jobs_go_to_their_own_printer(self):
+        printed = []
+        win32print = mock.Mock()
+        win32print.OpenPrinter.side_effect = lambda name: name
+        win32print.WritePrinter.side_effect = lambda handle, data: printed.append((handle, data))
+
+        enqueue(self.order, PrintJob.Kind.KOT, b"KOT-BYTES", printer="kitchen")
+        enqueue(self.order, PrintJob.Kind.RECEIPT, b"RECEIPT-BYTES", printer="counter")
+        with mock.patch("orders.pos_printer.win32print", win32print):
+            for name, config in print_queue.get_printers().items():
+                self.assertTrue(PrinterWorker(name, config).process_one())
+
+        self.assertEqual(sorted(printed), [("Counter POS80", b"RECEIPT-BYTES"), ("Kitchen POS58", b"KOT-BYTES")])
+
+    def test_retry_with_backoff_then_fail(self):
+        closed = socket.socket()
+        closed.bind(("127.0.0.1", 0))
+        port = closed.getsockname()[1]
+        closed.close()  # nothing listens here
+        worker = PrinterWorker("default", {"TRANSPORT": "lan", "HOST": "127.0.0.1", "PORT": port, "TIMEOUT": 1})
+
+        job, _ = enqueue(self.order, PrintJob.Kind.KOT, b"X")
+        with self.assertLogs("orders.print_queue", "WARNING"):
+            worker.process_one()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.next_attempt_at, timezone.now())
+        self.assertTrue(job.last_error)
+
+        # not due yet
+        self.assertFalse(worker.process_one())
+
+        PrintJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+        with self.assertLogs("orders.print_queue", "WARNING"):
+            worker.process_one()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+
+
+class PrintQueueConcurrencyTests(TransactionTestCase):
+    """Two requests enqueue the same ticket at once, on a real SQLite file."""
+
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("copies the SQLite test database to a file")
+        self.order = Order.objects.create(order_no="ORD-P-C")
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "pos.sqlite3")
+        connection.ensure_connection()
+        target = sqlite3.connect(self.path)
+        connection.connection.backup(target)
+        target.close()
+
+    def test_both_miss_the_check_and_one_job_is_queued(self):
+        checked = threading.Barrier(2, timeout=10)
+        first_check = threading.local()
+        real_duplicate = print_queue._duplicate
+        results, errors = [], []
+
+        def duplicate_then_wait(key):
+            found = real_duplicate(key)
+            if not getattr(first_check, "done", False):
+                first_check.done = True
+                checked.wait()   # neither inserts before both have checked
+            return found
+
+        def request():
+            try:
+                results.append(enqueue(self.order, PrintJob.Kind.KOT, b"KOT-BYTES"))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        original = connections.settings["default"]
+        connections.settings["default"] = {**original, **dbprofile.sqlite(self.path)}
+        try:
+            with mock.patch.object(print_queue, "_duplicate", duplicate_then_wait):
+                threads = [threading.Thread(target=request) for _ in range(2)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+        finally:
+            connections.settings["default"] = original
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(created for _, created in results), [False, True])
+        self.assertEqual(results[0][0].pk, results[1][0].pk)
+        with sqlite3.connect(self.path) as db:
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM orders_printjob").fetchone()[0], 1)
+
+
+class ReceiptTests(OrderTotalsTestBase):
+    def setUp(self):
+        super().setUp()
+        customer = Customer.objects.create(name="রহিম Uddin", phone="01711000000")
+        self.order = Order.objects.create(order_no="ORD-R-1", customer=customer)
+        OrderItem.objects.create(order=self.order, product=self.products[0], qty=3, unit_price=Decimal("10.00"))
+        self.order.refresh_from_db()
+
+    def lines(self, data):
+        return data.decode("cp437").split("\n")
+
+    def test_customer_receipt_columns_fit_paper(self):
+        for width_mm, cols in ((80, 48), (58, 32)):
+            data = build_customer_receipt(self.order, receipt.Layout(width_mm=width_mm))
+            lines = self.lines(data)
+
+            self.assertIn("-" * cols, lines)
+            self.assertNotIn("-" * (cols + 1), data.decode("cp437"))
+            row = next(line for line in lines if line.startswith("Item 0"))
+            self.assertEqual(len(row), cols)
+            self.assertTrue(row.endswith("3   10.00    30.00"))
+            total = next(line for line in lines if line.startswith("Grand Total"))
+            self.assertEqual(len(total), cols)
+            self.assertTrue(total.endswith("30.00"))
+
+    def test_non_ascii_is_replaced_not_dropped(self):
+        data = build_chef_kot(self.order, receipt.Layout(width_mm=80))
+        self.assertIn("Customer: ???? Uddin", self.lines(data))
+        self.assertIn("3 x   Item 0", self.lines(data))
+
+    def test_discount_and_tax_lines_only_when_set(self):
+        lines = self.lines(build_customer_receipt(self.order))
+        self.assertFalse(any(line.startswith(("Discount", "Tax")) for line in lines))
+
+        self.order.discount_amount = Decimal("2.5")
+        lines = self.lines(build_customer_receipt(self.order))
+        discount = next(line for line in lines if line.startswith("Discount"))
+        self.assertTrue(discount.endswith(" -2.50"))
+
+    def test_template_compiled_once_per_layout(self):
+        receipt.compile_template.cache_clear()
+        layout = receipt.Layout(width_mm=58)
+        build_customer_receipt(self.order, layout)
+        build_customer_receipt(self.order, layout)
+        info = receipt.compile_template.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+    def test_money(self):
+        self.assertEqual(receipt.money(Decimal("1.005")), "1.00")
+        self.assertEqual(receipt.money(None), "0.00")
+        self.assertEqual(receipt.money("abc"), "0.00")
+
+
+class KitchenDisplayTests(OrderTotalsTestBase):
+    def setUp(self):
+        super().setUp()
+        kds._feed = None
+        self.addCleanup(setattr, kds, "_feed", None)
+        self.order = Order.objects.create(order_no="ORD-K-1", notes="No onion")
+        self.item = OrderItem.objects.create(order=self.order, product=self.products[0], qty=1, unit_price=Decimal("10.00"))
+
+    async def read_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), 2)
+        fields = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n") if not line.startswith("retry"))
+        return fields["event"], json.loads(fields["data"])
+
+    async def test_stream_sends_snapshot_then_line_diffs(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("orders:kds_stream"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+
+        event, data = await self.read_event(stream)
+        self.assertEqual(event, "snapshot")
+        self.assertEqual([o["order_no"] for o in data["orders"]], ["ORD-K-1"])
+        self.assertEqual(data["orders"][0]["lines"][0]["qty"], 1)
+
+        # first publish for an order carries all its lines
+        await sync_to_async(kds.publish_order)(self.order.pk)
+        event, data = await self.read_event(stream)
+        self.assertEqual(event, "order")
+        self.assertTrue(data["replace"])
+
+        def change_lines():
+            OrderItem.objects.filter(pk=self.item.pk).update(qty=3)
+            OrderItem.objects.create(order=self.order, product=self.products[1], qty=2, unit_price=Decimal("10.00"))
+            kds.publish_order(self.order.pk)
+
+        await sync_to_async(change_lines)()
+        event, data = await self.read_event(stream)
+        self.assertFalse(data["replace"])
+        self.assertEqual([(ln["name"], ln["qty"]) for ln in data["changed"]], [("Item 0", 3)])
+        self.assertEqual([(ln["name"], ln["qty"]) for ln in data["added"]], [("Item 1", 2)])
+        self.assertEqual(data["removed"], [])
+
+        def complete():
+            Order.objects.filter(pk=self.order.pk).update(status=Order.Status.COMPLETED)
+            kds.publish_order(self.order.pk)
+
+        await sync_to_async(complete)()
+        event, data = await self.read_event(stream)
+        self.assertEqual((event, data), ("remove", {"order_id": self.order.pk}))
+        await stream.aclose()
+
+    def test_publish_without_screens_runs_no_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            kds.publish_order(self.order.pk)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_order_create_publishes_after_commit(self):
+        feed = kds.get_feed()
+        published = []
+        feed.publish_order = published.append
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_order(1)
+        self.assertEqual(published, [Order.objects.latest("id").pk])
+
+    async def test_broker_fans_out_from_worker_threads(self):
+        broker = kds.LocalBroker()
+        subs = [broker.subscribe() for _ in range(50)]
+
+        # sync views publish from their own thread
+        thread = threading.Thread(target=broker.publish, args=("remove", {"order_id": 1}))
+        thread.start()
+        thread.join()
+
+        events = await asyncio.gather(*(sub.get(2) for sub in subs))
+        self.assertEqual({e.id for e in events}, {1})
+
+        late = broker.subscribe(last_event_id=0)
+        self.assertFalse(late.needs_snapshot)
+        self.assertEqual([e.id for e in late.backlog], [1])
+        self.assertTrue(broker.subscribe(last_event_id=99).needs_snapshot)
+
+
+class OrderExportTests(OrderTotalsTestBase):
+    def setUp(self):
+        super().setUp()
+        self.old = Order.objects.create(order_no="ORD-E-1", status=Order.Status.COMPLETED)
+        Order.objects.filter(pk=self.old.pk).update(created_at=timewindow.day_start(date(2026, 1, 5)))
+        self.new = Order.objects.create(order_no="ORD-E-2", source=Order.Source.ONLINE, notes="Ring, don't knock")
+        Order.objects.filter(pk=self.new.pk).update(created_at=timewindow.day_start(date(2026, 1, 6)))
+        OrderItem.objects.create(order=self.new, product=self.products[0], qty=2, unit_price=Decimal("10.00"))
+        Payment.objects.create(order=self.new, payment_method=self.method, amount=Decimal("20.00"))
+
+    def export(self, **params):
+        res = self.client.get(reverse("orders:order_export"), params)
+        self.assertEqual(res.status_code, 200)
+        return b"".join(res.streaming_content)
+
+    def csv_rows(self, **params):
+        return list(csv.reader(io.StringIO(self.export(**params).decode("utf-8-sig"))))
+
+    def test_csv_streams_filtered_orders(self):
+        rows = self.csv_rows(dataset="orders", format="csv")
+        self.assertEqual(rows[0], DATASETS["orders"].headers)
+        self.assertEqual([r[1] for r in rows[1:]], ["ORD-E-1", "ORD-E-2"])
+        self.assertEqual(rows[2][13], "Ring, don't knock")
+
+        self.assertEqual([r[1] for r in self.csv_rows(status=Order.Status.COMPLETED)[1:]], ["ORD-E-1"])
+        self.assertEqual([r[1] for r in self.csv_rows(source=Order.Source.ONLINE)[1:]], ["ORD-E-2"])
+        self.assertEqual([r[1] for r in self.csv_rows(date_from="2026-01-06", date_to="2026-01-06")[1:]], ["ORD-E-2"])
+        self.assertEqual(self.csv_rows(date_to="2026-01-04")[1:], [])
+
+    def test_items_and_payments_follow_order_filters(self):
+        items = self.csv_rows(dataset="items", date_to="2026-01-06")
+        self.assertEqual([(r[2], r[4], r[6]) for r in items[1:]], [("ORD-E-2", "Item 0", "2")])
+
+        payments = self.csv_rows(dataset="payments", status=Order.Status.COMPLETED)
+        self.assertEqual(payments[1:], [])
+
+    def test_xlsx_is_a_valid_workbook(self):
+        data = self.export(dataset="payments", format="xlsx")
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            self.assertIsNone(zf.testzip())
+            sheet = zf.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 2)
+        self.assertIn("ORD-E-2", sheet)
+        self.assertIn("<c><v>20.00</v></c>", sheet)
+        self.assertIn('<c s="1">', sheet)   # paid_at as a real date
+
+    def test_unknown_dataset_or_format(self):
+        for params in ({"dataset": "users"}, {"format": "pdf"}):
+            res = self.client.get(reverse("orders:order_export"), params)
+            self.assertEqual(res.status_code, 400)
+
+    def test_rows_are_read_in_chunks(self):
+        for i in range(5):
+            Order.objects.create(order_no=f"ORD-E-X{i}")
+        out = io.BytesIO()
+        with CaptureQueriesContext(connection) as ctx:
+            write_export("orders", "csv", Order.objects.all(), out, chunk_size=2)
+        self.assertEqual(out.getvalue().decode("utf-8-sig").count("\n"), 8)
+        self.assertEqual(len(ctx.captured_queries), 1)   # one cursor, fetched in chunks
+
+    def test_management_command_writes_files(self):
+        with tempfile.TemporaryDirectory() as out:
+            call_command("export_orders", "--out", out, "--to", "2026-01-06", "--format", "xlsx", stdout=io.StringIO())
+            for name in DATASETS:
+                with zipfile.ZipFile(f"{out}/{name}-20260106.xlsx") as zf:
+                    self.assertIsNone(zf.testzip())
+
+
+class OrderListPagingTests(OrderTotalsTestBase):
+    def setUp(self):
+        super().setUp()
+        self.orders = [
+            Order.objects.create(order_no=f"ORD-L-{i}", status=Order.Status.COMPLETED if i % 2 else Order.Status.PENDING)
+            for i in range(23)
+        ]
+
+    def get(self, **params):
+        res = self.client.get(reverse("orders:order_list"), params)
+        self.assertEqual(res.status_code, 200)
+        return res.context["page"]
+
+    def test_cursor_pages_cover_every_order_once(self):
+        seen, pages, params = [], [], {}
+        while True:
+            page = self.get(**params)
+            pages.append(page)
+            seen += [o.pk for o in page]
+            if not page.has_next():
+                break
+            params = {"after": page.next_cursor}
+
+        self.assertEqual(seen, sorted((o.pk for o in self.orders), reverse=True))
+        self.assertEqual([len(p) for p in pages], [10, 10, 3])
+        self.assertFalse(pages[0].has_previous())
+
+        back = self.get(before=pages[-1].prev_cursor)
+        self.assertEqual([o.pk for o in back], [o.pk for o in pages[1]])
+
+    def test_filters_and_bounded_count(self):
+        res = self.client.get(reverse("orders:order_list"), {"status": Order.Status.PENDING})
+        page = res.context["page"]
+        self.assertEqual((page.count, page.count_capped), (12, False))
+        self.assertEqual({o.status for o in page}, {Order.Status.PENDING})
+        # the next link keeps the filters
+        self.assertContains(res, f"?status=pending&after={page.next_cursor}")
+
+        self.assertEqual(keyset.count_upto(Order.objects.all(), limit=5), (5, True))
+
+    def test_deep_page_costs_the_same_as_the_first(self):
+        deep_cursor = self.get(after=self.get().next_cursor).next_cursor
+        with CaptureQueriesContext(connection) as first:
+            self.get()
+        with CaptureQueriesContext(connection) as deep:
+            self.get(after=deep_cursor)
+
+        self.assertEqual(len(first.captured_queries), len(deep.captured_queries))
+        self.assertFalse(any("OFFSET" in q["sql"] for q in deep.captured_queries))
+
+    def test_bad_cursor_gives_the_first_page(self):
+        self.assertEqual([o.pk for o in self.get(after="not-a-cursor")], [o.pk for o in self.get()])
@@ -0,0 +1,127 @@
+# orders/totals.py
+"""
+Order totals engine.
+
+All money math for an order lives here so it can run in memory (from formset
+data) as well as from the database (``Order.recalc_totals``):
+
+    line:   gross = qty * unit_price, minus item discount  => line_total
+    order:  subtotal = sum(line_total), minus order discount, plus tax => grand_total
+            paid = sum(payment.amount), due = grand_total - paid
+
+``deferred_recalc()`` holds off the OrderItem/Payment signal recalcs while a
+view saves a whole order, so the Order row is written once instead of once
+per line.
+"""
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+HUNDRED = Decimal("100.00")
+
+
+# =====================================================
+# LINE / ORDER MATH
+# =====================================================
+def calc_discount(base, discount_type, discount_value) -> Decimal:
+    """
+    Discount on ``base``: fixed amount (capped at base) or percent (0..100).
+    """
+    if not discount_type or discount_value in (None, ""):
+        return ZERO
+
+    from .models import Order   # models imports this module
+
+    value = Decimal(discount_value)
+
+    if discount_type == Order.DiscountType.FIXED:
+        return max(ZERO, min(value, base))
+
+    pct = max(ZERO, min(HUNDRED, value))
+    return (base * pct / HUNDRED).quantize(CENT)
+
+
+def calc_line(qty, unit_price, discount_type=None, discount_value=None):
+    """
+    Returns (discount_amount, line_total) for one order line.
+    """
+    gross = (Decimal(qty or 0) * Decimal(unit_price or 0)).quantize(CENT)
+    discount = calc_discount(gross, discount_type, discount_value)
+    return discount, max(ZERO, gross - discount).quantize(CENT)
+
+
+def calc_grand_total(subtotal, discount_amount, tax_amount) -> Decimal:
+    return max(ZERO, subtotal - discount_amount + (tax_amount or ZERO)).quantize(CENT)
+
+
+def calc_due(grand_total, paid) -> Decimal:
+    return max(ZERO, (grand_total or ZERO) - paid).quantize(CENT)
+
+
+def live_formset_instances(formset):
+    """
+    Instances that will exist after ``formset.save()``: changed/new rows and
+    untouched existing rows, minus deleted ones and blank extra rows.
+    Call only after ``formset.is_valid()``.
+    """
+    deleted = set(id(f) for f in formset.deleted_forms)
+    rows = []
+    for f in formset.forms:
+        if id(f) in deleted:
+            continue
+        if f.instance.pk is None and not f.has_changed():
+            continue
+        rows.append(f.save(commit=False))
+    return rows
+
+
+# =====================================================
+# DEFERRED RECALC
+# =====================================================
+_state = threading.local()
+
+
+def is_deferred() -> bool:
+    return getattr(_state, "depth", 0) > 0
+
+
+def mark_dirty(order):
+    """
+    Called by signals while deferred: remember the order instead of recalculating.
+    """
+    _state.pending[order.pk] = order
+
+
+def mark_clean(order):
+    """
+    The caller already wrote final totals for this order (or deleted it).
+    """
+    if is_deferred():
+        _state.pending.pop(order.pk, None)
+
+
+@contextmanager
+def deferred_recalc():
+    """
+    Suspend per-row totals recalcs from signals. Orders touched inside the
+    block and not settled with ``mark_clean`` are recalculated once on exit.
+    Nested blocks are folded into the outermost one.
+    """
+    depth = getattr(_state, "depth", 0)
+    if depth == 0:
+        _state.pending = {}
+    _state.depth = depth + 1
+
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        _state.depth = depth
+        if depth == 0:
+            pending, _state.pending = _state.pending, {}
+            if ok:
+                for order in pending.values():
+                    order.recalc_totals()
@@ -13,6 +13,7 @@ urlpatterns = [
 
     # Orders
     path("", views.order_list, name="order_list"),
+    path("export/", views.order_export, name="order_export"),
     path("create/", views.order_create, name="order_create"),
     path("<int:pk>/", views.order_detail, name="order_detail"),
     path("<int:pk>/update/", views.order_update, name="order_update"),
@@ -24,4 +25,9 @@ urlpatterns = [
     # ✅ Print endpoints (AJAX)
     path("<int:pk>/print/chef/", views.order_print_chef, name="order_print_chef"),
     path("<int:pk>/print/customer/", views.order_print_customer, name="order_print_customer"),
+    path("print-jobs/<int:job_id>/", views.print_job_status, name="print_job_status"),
+
+    # Kitchen display (SSE stream served by vhojon/asgi.py)
+    path("kds/", views.kds_board, name="kds_board"),
+    path("kds/stream/", views.kds_stream, name="kds_stream"),
 ]
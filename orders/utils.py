@@ -1,7 +1,88 @@
-from django.utils import timezone
+import threading
 
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
 
-def generate_order_no(prefix="ORD"):
-    # Example: ORD-20260104-000001 (you can improve with DB sequence later)
-    today = timezone.localdate().strftime("%Y%m%d")
-    return f"{prefix}-{today}-{timezone.now().strftime('%H%M%S%f')}"
+from vhojon import timewindow
+
+ORDER_NO_DIGITS = 6
+
+
+# =====================================================
+# ORDER NUMBER SEQUENCE
+# =====================================================
+class OrderNoAllocator:
+    """
+    Hands out per-day order numbers from blocks reserved in
+    ``OrderNumberSequence``. One allocator per process; the DB row is only
+    touched once per ``block_size`` orders, so there is no lock per order.
+
+    Blocks are only cached when reserved outside a transaction (committed
+    right away). Inside an atomic block a rollback would un-reserve the
+    numbers, so then exactly one number is reserved and not cached.
+    """
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._day = None
+        self._next = 0
+        self._end = 0  # inclusive
+
+    def get_block_size(self):
+        return max(1, int(self.block_size or getattr(settings, "ORDER_NO_BLOCK_SIZE", 10)))
+
+    def _reserve(self, day, size) -> int:
+        """
+        Reserve ``size`` numbers for ``day``; returns the last one reserved.
+        """
+        from .models import OrderNumberSequence
+
+        with transaction.atomic():
+            seq = OrderNumberSequence.objects.filter(day=day)
+            if not seq.update(last_value=F("last_value") + size):
+                try:
+                    with transaction.atomic():
+                        OrderNumberSequence.objects.create(day=day, last_value=size)
+                    return size
+                except IntegrityError:
+                    # another worker created today's row first
+                    seq.update(last_value=F("last_value") + size)
+            return seq.values_list("last_value", flat=True).get()
+
+    def next_value(self, day=None) -> int:
+        day = day or timewindow.business_day()
+
+        if connection.in_atomic_block:
+            return self._reserve(day, 1)
+
+        with self._lock:
+            if self._day != day or self._next > self._end:
+                size = self.get_block_size()
+                self._end = self._reserve(day, size)
+                self._next = self._end - size + 1
+                self._day = day
+
+            value = self._next
+            self._next += 1
+            return value
+
+    def reset(self):
+        with self._lock:
+            self._day = None
+            self._next = self._end = 0
+
+
+order_no_allocator = OrderNoAllocator()
+
+
+def format_order_no(day, value, prefix="ORD"):
+    return f"{prefix}-{day.strftime('%Y%m%d')}-{value:0{ORDER_NO_DIGITS}d}"
+
+
+def generate_order_no(prefix="ORD", day=None):
+    # Example: ORD-20260104-000001; after-midnight orders before the
+    # business day cutoff keep the previous day's prefix, as in the reports
+    day = day or timewindow.business_day()
+    return format_order_no(day, order_no_allocator.next_value(day), prefix=prefix)
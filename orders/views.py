@@ -1,23 +1,36 @@
 # orders/views.py
 from decimal import Decimal
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.db import transaction
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from django.core.paginator import Paginator
 
 from customers.models import CustomerAddress
-from catalog.models import Product
+from catalog.search import product_index
+from vhojon import keyset
 
 from .forms import CustomerCreateOrSelectForm, OrderForm, OrderItemFormSet, PaymentFormSet
-from .models import Order
+from .models import Order, PrintJob
 from .utils import generate_order_no
+from .totals import deferred_recalc, live_formset_instances
+from .checkout import save_order_lines
+from .filters import FILTER_KEYS, filter_orders, order_filters
+from .export import DATASETS, FORMATS, export_response
+from . import kds
 
-# ✅ Printer helpers (USB-Windows printing if you replaced orders/pos_printer.py)
-from .pos_printer import print_chef_kot, print_customer_receipt
+# ✅ Printer helpers: render ESC/POS bytes here, the spooler sends them
+from .pos_printer import build_chef_kot, build_customer_receipt
+from .print_queue import enqueue
+
+
+ORDER_PAGE_SIZE = 10
 
 
 def is_ajax(request):
@@ -33,75 +46,68 @@ def product_search(request):
     page = int(request.GET.get("page") or 1)
     page_size = 10
 
-    qs = Product.objects.filter(is_active=True).order_by("name")
-
-    if q:
-        qs = qs.filter(Q(name__icontains=q) | Q(sku__icontains=q))
-
-    start = (page - 1) * page_size
-    end = start + page_size
-
-    results = []
-    for p in qs[start:end]:
-        label = p.name
-        if getattr(p, "sku", None):
-            label = f"{p.name} ({p.sku})"
-
-        results.append({
-            "id": p.id,
-            "text": label,
-            "price": str(p.sale_price),
-        })
+    # served from the in-process index; no COUNT(*) just for "more"
+    entries, more = product_index.search(q, limit=page_size, offset=(page - 1) * page_size)
 
     return JsonResponse({
-        "results": results,
-        "pagination": {"more": qs.count() > end},
+        "results": [e.as_result() for e in entries],
+        "pagination": {"more": more},
     })
 
 
 # =====================================================
 # ✅ CREATE ORDER
 # =====================================================
-@login_required
 @transaction.atomic
+def _save_new_order(cust_form, form, items_formset, pay_formset, order_no):
+    customer = cust_form.get_or_create_customer()
+
+    order = form.save(commit=False)
+    order.order_no = order_no
+    order.customer = customer
+
+    if customer:
+        addr = (
+            CustomerAddress.objects.filter(customer=customer)
+            .order_by("-is_primary", "-created_at")
+            .first()
+        )
+        order.customer_address = addr
+
+    if not order.source:
+        order.source = Order.Source.STORE
+    if not order.status:
+        order.status = Order.Status.PENDING
+
+    # totals are computed in memory so the Order row is written once
+    order.apply_totals(
+        live_formset_instances(items_formset),
+        live_formset_instances(pay_formset),
+    )
+
+    order.save()
+    save_order_lines(order, items_formset, pay_formset)
+    transaction.on_commit(lambda: kds.publish_order(order.pk))
+    return order
+
+
+@login_required
 def order_create(request):
     if request.method == "POST":
         cust_form = CustomerCreateOrSelectForm(request.POST)
         form = OrderForm(request.POST)
 
-        temp_order = Order(order_no=generate_order_no())
+        temp_order = Order(order_no="TEMP")
         items_formset = OrderItemFormSet(request.POST, instance=temp_order)
         pay_formset = PaymentFormSet(request.POST, instance=temp_order)
 
         if cust_form.is_valid() and form.is_valid() and items_formset.is_valid() and pay_formset.is_valid():
-            customer = cust_form.get_or_create_customer()
-
-            order = form.save(commit=False)
-            order.order_no = generate_order_no()
-            order.customer = customer
-
-            if customer:
-                addr = (
-                    CustomerAddress.objects.filter(customer=customer)
-                    .order_by("-is_primary", "-created_at")
-                    .first()
-                )
-                order.customer_address = addr
-
-            if not order.source:
-                order.source = Order.Source.STORE
-            if not order.status:
-                order.status = Order.Status.PENDING
-
-            order.save()
-
-            items_formset.instance = order
-            items_formset.save()
-
-            pay_formset.instance = order
-            pay_formset.save()
-
-            order.recalc_totals()
+            # number is taken before the write transaction: a failed save
+            # leaves a gap in the day's sequence instead of a reused number
+            order = _save_new_order(
+                cust_form, form, items_formset, pay_formset,
+                order_no=generate_order_no(),
+            )
 
             # ✅ redirect to print options page
             if is_ajax(request):
@@ -164,38 +170,53 @@ def order_print_options(request, pk):
 
 
 # =====================================================
-# ✅ PRINT CHEF KOT (AJAX)
+# ✅ PRINT CHEF KOT / CUSTOMER RECEIPT (AJAX)
+# Jobs go to the print spooler; the page polls print_job_status.
 # =====================================================
-@login_required
-def order_print_chef(request, pk):
-    order = get_object_or_404(Order, pk=pk)
-
-    ok, msg = print_chef_kot(order)
-
-    # 🔥 force show exact message
-    if not ok:
+def _enqueue_print(order, kind, data):
+    if not getattr(settings, "POS_PRINTER_ENABLED", True):
         return JsonResponse({
             "ok": False,
-            "error": msg
+            "error": "Printer disabled (DEV MODE)."
         }, status=400)
 
-    return JsonResponse({"ok": True, "message": msg})
+    job, created = enqueue(order, kind, data)
+
+    return JsonResponse({
+        "ok": True,
+        "job_id": job.pk,
+        "status": job.status,
+        "duplicate": not created,
+        "status_url": reverse("orders:print_job_status", args=[job.pk]),
+    })
 
 
 @login_required
-def order_print_customer(request, pk):
-    order = get_object_or_404(Order, pk=pk)
+def order_print_chef(request, pk):
+    order = get_object_or_404(Order.objects.select_related("customer"), pk=pk)
+    return _enqueue_print(order, PrintJob.Kind.KOT, build_chef_kot(order))
 
-    ok, msg = print_customer_receipt(order)
 
-    if not ok:
-        return JsonResponse({
-            "ok": False,
-            "error": msg
-        }, status=400)
+@login_required
+def order_print_customer(request, pk):
+    order = get_object_or_404(Order.objects.select_related("customer"), pk=pk)
+    return _enqueue_print(order, PrintJob.Kind.RECEIPT, build_customer_receipt(order))
 
-    return JsonResponse({"ok": True, "message": msg})
 
+@login_required
+def print_job_status(request, job_id):
+    job = get_object_or_404(
+        PrintJob.objects.only("status", "attempts", "last_error", "next_attempt_at"),
+        pk=job_id,
+    )
+    return JsonResponse({
+        "ok": job.status != PrintJob.Status.FAILED,
+        "job_id": job.pk,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.last_error,
+        "next_attempt_at": job.next_attempt_at.isoformat(),
+    })
 
 
 # =====================================================
@@ -228,42 +249,27 @@ def create_pos_order(request):
 # =====================================================
 @login_required
 def order_list(request):
-    qs = Order.objects.select_related("customer").order_by("-id")
-
-    q = request.GET.get("q", "").strip()
-    status = request.GET.get("status", "").strip()
-    source = request.GET.get("source", "").strip()
-    due = request.GET.get("due", "").strip()
-
-    if q:
-        qs = qs.filter(
-            Q(order_no__icontains=q) |
-            Q(customer__name__icontains=q) |
-            Q(customer__phone__icontains=q)
-        )
-
-    if status:
-        qs = qs.filter(status=status)
-
-    if source:
-        qs = qs.filter(source=source)
-
-    if due == "1":
-        qs = qs.filter(due_total__gt=0)
-    elif due == "0":
-        qs = qs.filter(due_total__lte=0)
-
-    paginator = Paginator(qs, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    filters = order_filters(request.GET)
+    qs = filter_orders(Order.objects.select_related("customer"), **filters)
+
+    page = keyset.paginate(
+        qs, "-id",
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        size=ORDER_PAGE_SIZE,
+        count_limit=keyset.COUNT_LIMIT,
+    )
 
     context = {
-        "page_obj": page_obj,
-        "orders": page_obj.object_list,
-        "q": q,
-        "status": status,
-        "source": source,
-        "due": due,
+        "page": page,
+        "orders": page.object_list,
+        "q": filters["q"],
+        "status": filters["status"],
+        "source": filters["source"],
+        "due": filters["due"],
+        "date_from": filters["date_from"],
+        "date_to": filters["date_to"],
+        "filter_query": urlencode({k: v for k, v in request.GET.items() if k in FILTER_KEYS and v}),
         "status_choices": getattr(Order.Status, "choices", []),
         "source_choices": getattr(Order.Source, "choices", []),
         "due_choices": [
@@ -275,6 +281,20 @@ def order_list(request):
     return render(request, "orders/order_list.html", context)
 
 
+# =====================================================
+# ✅ EXPORT (CSV / XLSX, streamed)
+# =====================================================
+@login_required
+def order_export(request):
+    dataset = request.GET.get("dataset") or "orders"
+    fmt = request.GET.get("format") or "csv"
+    if dataset not in DATASETS or fmt not in FORMATS:
+        return JsonResponse({"ok": False, "error": "Unknown dataset or format."}, status=400)
+
+    orders_qs = filter_orders(Order.objects.all(), **order_filters(request.GET))
+    return export_response(dataset, fmt, orders_qs)
+
+
 # =====================================================
 # ✅ UPDATE ORDER
 # =====================================================
@@ -289,11 +309,15 @@ def order_update(request, pk):
         pay_formset = PaymentFormSet(request.POST, instance=order)
 
         if form.is_valid() and items_formset.is_valid() and pay_formset.is_valid():
-            order = form.save()
-            items_formset.save()
-            pay_formset.save()
+            order = form.save(commit=False)
+            order.apply_totals(
+                live_formset_instances(items_formset),
+                live_formset_instances(pay_formset),
+            )
 
-            order.recalc_totals()
+            order.save()
+            save_order_lines(order, items_formset, pay_formset)
+            transaction.on_commit(lambda: kds.publish_order(order.pk))
 
             messages.success(request, f"Order updated: {order.order_no}")
             return redirect("orders:order_detail", pk=order.pk)
@@ -322,9 +346,71 @@ def order_delete(request, pk):
     order = get_object_or_404(Order, pk=pk)
 
     if request.method == "POST":
-        order_no = order.order_no
-        order.delete()
+        order_no, order_id = order.order_no, order.pk
+        with deferred_recalc():
+            order.delete()
+        transaction.on_commit(lambda: kds.publish_removed(order_id))
         messages.success(request, f"Order deleted: {order_no}")
         return redirect("orders:order_list")
 
     return render(request, "orders/order_delete.html", {"order": order})
+
+
+# =====================================================
+# ✅ KITCHEN DISPLAY (KDS)
+# =====================================================
+@login_required
+def kds_board(request):
+    return render(request, "orders/kds_board.html")
+
+
+async def _kds_events(request, feed):
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID") or "")
+    except ValueError:
+        last_event_id = None
+
+    heartbeat = getattr(settings, "KDS_HEARTBEAT_SECONDS", 15)
+    sub = feed.broker.subscribe(last_event_id)
+    try:
+        # subscribed first, so nothing published while the snapshot loads is lost
+        if sub.needs_snapshot:
+            orders = await sync_to_async(feed.snapshot)()
+            yield kds.sse_message("snapshot", {"orders": orders}, retry=3000)
+        for event in sub.backlog:
+            yield event.encoded
+
+        while True:
+            event = await sub.get(heartbeat)
+            if event is False:
+                yield b": ping\n\n"
+            elif event is None:
+                # fell too far behind: close, the screen reconnects and resyncs
+                return
+            else:
+                yield event.encoded
+    finally:
+        feed.broker.unsubscribe(sub)
+
+
+@login_required
+async def kds_stream(request):
+    """
+    Server-Sent Events for the kitchen screens. Needs the ASGI server: under
+    WSGI every open screen would hold a worker thread, so there the view
+    sends one snapshot and lets the browser reconnect.
+    """
+    feed = kds.get_feed()
+
+    if not isinstance(request, ASGIRequest):
+        orders = await sync_to_async(feed.snapshot)()
+        response = StreamingHttpResponse(
+            [kds.sse_message("snapshot", {"orders": orders}, retry=5000)],
+            content_type="text/event-stream",
+        )
+    else:
+        response = StreamingHttpResponse(_kds_events(request, feed), content_type="text/event-stream")
+
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+    return response
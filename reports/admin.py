@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import DailyFinanceSummary
+
+
+@admin.register(DailyFinanceSummary)
+class DailyFinanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ("date", "category", "amount", "count")
+    list_filter = ("category",)
+    date_hierarchy = "date"
@@ -0,0 +1,41 @@
+# reports/management/commands/check_query_plans.py
+"""
+EXPLAIN the hot query shapes (vhojon.queryplan) and fail on full scans:
+
+    python manage.py check_query_plans
+    python manage.py check_query_plans orders.list_due --plan
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from vhojon import queryplan
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the registered hot queries and report any that read a whole table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help="Only these shapes (default: all).")
+        parser.add_argument("--plan", action="store_true", help="Print every plan, not just the failing ones.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **opts):
+        unknown = [n for n in opts["names"] if n not in queryplan.HOT_QUERIES]
+        if unknown:
+            raise CommandError(f"Unknown query: {', '.join(unknown)} (see vhojon/queryplan.py)")
+
+        reports = queryplan.check(opts["names"], using=opts["database"])
+        for r in reports:
+            if r.ok:
+                note = f"  (sorts: {'; '.join(r.sorts)})" if r.sorts else ""
+                self.stdout.write(f"ok    {r.name}{note}")
+            else:
+                self.stdout.write(self.style.ERROR(f"SCAN  {r.name}: full scan of {', '.join(r.scans)}"))
+                self.stdout.write(f"      {r.sql}")
+            if opts["plan"] or not r.ok:
+                for line in r.plan.splitlines():
+                    self.stdout.write(f"      | {line}")
+
+        failed = [r.name for r in reports if not r.ok]
+        if failed:
+            raise CommandError(f"{len(failed)} of {len(reports)} hot queries do full scans: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS(f"{len(reports)} hot queries use indexes"))
@@ -0,0 +1,35 @@
+# reports/management/commands/rebuild_finance_summary.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports import rollup
+from reports.models import DailyFinanceSummary
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date: {value} (use YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = "Recompute DailyFinanceSummary rows from the payment, order and expense tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", help="First day (YYYY-MM-DD); default: all history.")
+        parser.add_argument("--to", dest="end", help="Last day (YYYY-MM-DD); default: all history.")
+        parser.add_argument(
+            "--category", action="append", choices=DailyFinanceSummary.Category.values,
+            help="Only these categories (repeatable).",
+        )
+
+    def handle(self, *args, **opts):
+        start = _date(opts["start"]) if opts["start"] else None
+        end = _date(opts["end"]) if opts["end"] else None
+        if start and end and start > end:
+            raise CommandError("--from is after --to")
+
+        written = rollup.rebuild(start, end, categories=opts["category"])
+        self.stdout.write(f"wrote {written} summary rows")
@@ -0,0 +1,73 @@
+# reports/management/commands/sql_profile_report.py
+"""
+Rank views by SQL cost from the profiler log (vhojon.sqlprofile):
+
+    python manage.py sql_profile_report --top 10
+    python manage.py sql_profile_report --file logs/sql_profile.jsonl.1
+"""
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class _ViewStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_ms = 0.0
+        self.repeated = {}    # sql -> [times seen, max count, caller]
+
+    def add(self, entry):
+        self.requests += 1
+        self.queries += entry["queries"]
+        self.max_queries = max(self.max_queries, entry["queries"])
+        self.db_ms += entry["db_ms"]
+        for r in entry.get("repeated", []):
+            seen = self.repeated.setdefault(r["sql"], [0, 0, r.get("caller")])
+            seen[0] += 1
+            seen[1] = max(seen[1], r["count"])
+            seen[2] = seen[2] or r.get("caller")
+
+
+class Command(BaseCommand):
+    help = "Summarise the SQL profiler log: worst views, N+1 suspects and where they run."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=str(getattr(settings, "SQL_PROFILER_LOG_FILE", "")))
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--sort", choices=["queries", "db_ms", "requests"], default="queries")
+
+    def handle(self, *args, **opts):
+        stats = defaultdict(_ViewStats)
+        try:
+            with open(opts["file"], encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    stats[entry.get("view") or entry.get("path")].add(entry)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        def key(item):
+            s = item[1]
+            if opts["sort"] == "requests":
+                return s.requests
+            if opts["sort"] == "db_ms":
+                return s.db_ms / s.requests
+            return s.queries / s.requests
+
+        ranked = sorted(stats.items(), key=key, reverse=True)[: opts["top"]]
+        for view, s in ranked:
+            self.stdout.write(
+                f"{view}: {s.requests} logged requests, "
+                f"{s.queries / s.requests:.1f} queries avg ({s.max_queries} max), "
+                f"{s.db_ms / s.requests:.1f} ms DB avg"
+            )
+            for sql, (seen, most, caller) in sorted(s.repeated.items(), key=lambda r: -r[1][1]):
+                self.stdout.write(f"    N+1 x{most} in {seen} requests at {caller or '?'}")
+                self.stdout.write(f"        {sql[:160]}")
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-17 23:29
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFinanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('category', models.CharField(choices=[('sales', 'Sales (payments)'), ('orders', 'Orders'), ('utility', 'Utility bills'), ('raw', 'Raw material purchases'), ('salary', 'Staff salary'), ('other', 'Other expenses')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date', 'category'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'category'), name='daily_finance_summary_uniq')],
+            },
+        ),
+    ]
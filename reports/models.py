@@ -1,3 +1,35 @@
+from decimal import Decimal
+
 from django.db import models
 
-# Create your models here.
+
+class DailyFinanceSummary(models.Model):
+    """
+    One row per business day and category: the day's total and row count.
+    Kept up to date by ``reports.signals``; ``manage.py rebuild_finance_summary``
+    recomputes it from the source tables.
+    """
+
+    class Category(models.TextChoices):
+        SALES = "sales", "Sales (payments)"
+        ORDERS = "orders", "Orders"
+        UTILITY = "utility", "Utility bills"
+        RAW = "raw", "Raw material purchases"
+        SALARY = "salary", "Staff salary"
+        OTHER = "other", "Other expenses"
+
+    EXPENSE_CATEGORIES = (Category.UTILITY, Category.RAW, Category.SALARY, Category.OTHER)
+
+    date = models.DateField()
+    category = models.CharField(max_length=20, choices=Category.choices)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "category"], name="daily_finance_summary_uniq"),
+        ]
+        ordering = ["-date", "category"]
+
+    def __str__(self):
+        return f"{self.date} {self.category}: {self.amount} ({self.count})"
@@ -0,0 +1,252 @@
+# reports/rollup.py
+"""
+Daily finance rollup.
+
+``DailyFinanceSummary`` holds one row per (business day, category) with the
+day's total amount and row count; datetime sources are split into days by
+``vhojon.timewindow`` (cutoff hour included). Every source table below feeds one
+category; ``reports.signals`` applies each save/delete as a delta with a
+single ``UPDATE ... SET amount = amount + x``, inside the caller's
+transaction. ``rebuild()`` recomputes a date range from the source tables
+(backfills, or after a raw SQL import that skipped the signals).
+"""
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+from vhojon import timewindow
+
+from .models import DailyFinanceSummary
+
+Category = DailyFinanceSummary.Category
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+
+
+class Source:
+    """
+    How one model feeds the rollup: the category, the date field and the
+    amount (a field name, or ``amount_of`` / ``amount_expr`` for computed
+    amounts, with ``amount_fields`` naming the columns they read). ``None``
+    amount means the category only counts rows.
+    """
+
+    def __init__(self, model, category, date_field, amount=None, amount_of=None, amount_expr=None, amount_fields=()):
+        self.model_label = model
+        self.category = category
+        self.date_field = date_field
+        self.amount = amount
+        self._amount_of = amount_of
+        self._amount_expr = amount_expr
+        self.fields = (date_field,) + ((amount,) if amount is not None else tuple(amount_fields))
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def is_datetime(self):
+        return isinstance(self.model._meta.get_field(self.date_field), models.DateTimeField)
+
+    @property
+    def tracks_changes(self):
+        """False when neither the date nor the amount can change after insert."""
+        return self.amount is not None or self._amount_of is not None
+
+    def day_of(self, obj):
+        value = getattr(obj, self.date_field)
+        if value is None:
+            return None
+        return timewindow.business_day(value) if self.is_datetime else value
+
+    def amount_of(self, obj):
+        if self._amount_of is not None:
+            return self._amount_of(obj)
+        if self.amount is None:
+            return ZERO
+        return getattr(obj, self.amount) or ZERO
+
+    def amount_expr(self):
+        if self._amount_expr is not None:
+            return self._amount_expr
+        if self.amount is None:
+            return Value(ZERO)
+        return F(self.amount)
+
+    def day_expr(self):
+        return timewindow.day_expr(self.date_field) if self.is_datetime else F(self.date_field)
+
+    def entry(self, obj):
+        """(day, amount) this row contributes, or None."""
+        day = self.day_of(obj)
+        return None if day is None else (day, self.amount_of(obj))
+
+    def stored_entry(self, pk):
+        """``entry()`` of the row as stored, reading only ``fields``."""
+        row = self.model._base_manager.filter(pk=pk).values_list(*self.fields).first()
+        return None if row is None else self.entry(SimpleNamespace(**dict(zip(self.fields, row))))
+
+
+def _raw_total(obj):
+    return ((obj.quantity or 0) * (obj.unit_price or 0)).quantize(CENT, ROUND_HALF_UP)
+
+
+SOURCES = [
+    Source("orders.Payment", Category.SALES, "paid_at", amount="amount"),
+    Source("orders.Order", Category.ORDERS, "created_at"),
+    Source("expenses.UtilityBill", Category.UTILITY, "bill_date", amount="amount"),
+    Source(
+        "expenses.RawMaterialPurchase", Category.RAW, "purchase_date",
+        amount_of=_raw_total,
+        amount_expr=Round(F("quantity") * F("unit_price"), 2),
+        amount_fields=("quantity", "unit_price"),
+    ),
+    Source("expenses.StaffSalaryPayment", Category.SALARY, "pay_date", amount="amount"),
+    Source("expenses.OtherExpense", Category.OTHER, "expense_date", amount="amount"),
+]
+
+
+def source_for(model):
+    label = model._meta.label
+    for src in SOURCES:
+        if src.model_label == label:
+            return src
+    return None
+
+
+# =====================================================
+# INCREMENTAL
+# =====================================================
+def add(category, day, amount=ZERO, count=0):
+    if day is None or (not amount and not count):
+        return
+
+    with transaction.atomic():
+        row = DailyFinanceSummary.objects.filter(date=day, category=category)
+        if row.update(amount=F("amount") + amount, count=F("count") + count):
+            return
+        try:
+            with transaction.atomic():
+                DailyFinanceSummary.objects.create(date=day, category=category, amount=amount, count=count)
+        except IntegrityError:
+            # another request created the day's row first
+            row.update(amount=F("amount") + amount, count=F("count") + count)
+
+
+def apply_deltas(category, deltas):
+    """
+    ``deltas`` is [(day, amount, count)]; rows for the same day are merged
+    into one UPDATE.
+    """
+    merged = defaultdict(lambda: [ZERO, 0])
+    for day, amount, count in deltas:
+        merged[day][0] += amount
+        merged[day][1] += count
+    for day, (amount, count) in merged.items():
+        add(category, day, amount, count)
+
+
+def move(src, old, new):
+    """
+    Apply a row change: ``old`` / ``new`` are ``Source.entry()`` results
+    (None for insert / delete).
+    """
+    if old == new:
+        return
+    deltas = []
+    if old is not None:
+        deltas.append((old[0], -old[1], -1))
+    if new is not None:
+        deltas.append((new[0], new[1], 1))
+    apply_deltas(src.category, deltas)
+
+
+# =====================================================
+# REBUILD
+# =====================================================
+def source_rows(src, start=None, end=None):
+    """The source's rows in days [start, end], as an index range on the date column."""
+    qs = src.model.objects.exclude(**{f"{src.date_field}__isnull": True})
+    if src.is_datetime:
+        return qs.filter(timewindow.range_q(src.date_field, start, end))
+    if start is not None:
+        qs = qs.filter(**{f"{src.date_field}__gte": start})
+    if end is not None:
+        qs = qs.filter(**{f"{src.date_field}__lte": end})
+    return qs
+
+
+def aggregate_source(src, start=None, end=None):
+    """{day: (amount, count)} straight from the source table."""
+    rows = (
+        source_rows(src, start, end)
+        .annotate(day=src.day_expr())
+        .values("day")
+        .annotate(
+            total=Coalesce(Sum(src.amount_expr()), ZERO, output_field=models.DecimalField()),
+            n=Count("pk"),
+        )
+        .order_by()
+    )
+    return {r["day"]: (r["total"], r["n"]) for r in rows}
+
+
+@transaction.atomic
+def rebuild(start=None, end=None, categories=None, batch_size=1000):
+    """
+    Replace the summary rows in [start, end] (inclusive, open ends allowed)
+    with totals recomputed from the source tables. Returns rows written.
+    """
+    sources = [s for s in SOURCES if categories is None or s.category in categories]
+
+    stale = DailyFinanceSummary.objects.filter(category__in=[s.category for s in sources])
+    if start is not None:
+        stale = stale.filter(date__gte=start)
+    if end is not None:
+        stale = stale.filter(date__lte=end)
+    stale.delete()
+
+    rows = [
+        DailyFinanceSummary(date=day, category=src.category, amount=amount, count=n)
+        for src in sources
+        for day, (amount, n) in aggregate_source(src, start, end).items()
+    ]
+    DailyFinanceSummary.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+# =====================================================
+# READ
+# =====================================================
+def period_totals(start, today, end=None):
+    """
+    Per category: amount/count from ``start`` (to ``end``, if given) and for
+    ``today``, from at most one summary row per day and category (one query).
+    """
+    qs = DailyFinanceSummary.objects.filter(date__gte=start)
+    if end is not None:
+        qs = qs.filter(date__lte=end)
+    rows = (
+        qs
+        .values("category")
+        .annotate(
+            period_amount=Sum("amount"),
+            period_count=Sum("count"),
+            today_amount=Coalesce(Sum("amount", filter=Q(date=today)), ZERO, output_field=models.DecimalField()),
+            today_count=Coalesce(Sum("count", filter=Q(date=today)), 0),
+        )
+        .order_by()
+    )
+    totals = {
+        c: {"period_amount": ZERO, "period_count": 0, "today_amount": ZERO, "today_count": 0}
+        for c in Category.values
+    }
+    for r in rows:
+        totals[r.pop("category")] = r
+    return totals
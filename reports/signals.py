@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from orders.signals import payments_bulk_saved
+
+from . import rollup
+
+
+_UNTOUCHED = object()
+
+
+def _old_entry(sender, instance, update_fields=None, **kwargs):
+    src = rollup.source_for(sender)
+    if instance.pk is None or not src.tracks_changes:
+        instance._rollup_old = None
+    elif update_fields is not None and not set(src.fields).intersection(update_fields):
+        instance._rollup_old = _UNTOUCHED
+    else:
+        # the instance already carries the new values; read what is stored
+        instance._rollup_old = src.stored_entry(instance.pk)
+
+
+def _saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return  # loaddata; run rebuild_finance_summary afterwards
+    src = rollup.source_for(sender)
+    if created:
+        rollup.move(src, None, src.entry(instance))
+    elif src.tracks_changes:
+        old = getattr(instance, "_rollup_old", None)
+        if old is not _UNTOUCHED:
+            rollup.move(src, old, src.entry(instance))
+
+
+def _deleted(sender, instance, **kwargs):
+    src = rollup.source_for(sender)
+    rollup.move(src, src.entry(instance), None)
+
+
+def _payments_bulk_saved(sender, created, updated, **kwargs):
+    """
+    ``orders.checkout`` writes payments with bulk_create/bulk_update, which
+    send no per-row signals. ``updated`` is [(payment, old_amount)].
+    """
+    src = rollup.source_for(sender)
+    deltas = [(src.day_of(p), p.amount or rollup.ZERO, 1) for p in created]
+    deltas += [(src.day_of(p), (p.amount or rollup.ZERO) - (old or rollup.ZERO), 0) for p, old in updated]
+    rollup.apply_deltas(src.category, deltas)
+
+
+def connect():
+    for src in rollup.SOURCES:
+        model = src.model
+        uid = f"reports.rollup.{src.model_label}"
+        pre_save.connect(_old_entry, sender=model, dispatch_uid=uid)
+        post_save.connect(_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(_deleted, sender=model, dispatch_uid=uid)
+
+    payments_bulk_saved.connect(_payments_bulk_saved, dispatch_uid="reports.rollup.payments_bulk_saved")
@@ -0,0 +1,28 @@
+# search/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from search import schema
+
+
+class Command(BaseCommand):
+    help = "Re-fill the FTS5 search tables from their source tables (SQLite only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tables", nargs="*", help=f"Subset of: {', '.join(schema.TABLES)}")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **opts):
+        connection = connections[opts["database"]]
+        if connection.vendor != "sqlite":
+            raise CommandError("FTS5 search tables only exist on SQLite.")
+
+        tables = opts["tables"] or list(schema.TABLES)
+        unknown = set(tables) - set(schema.TABLES)
+        if unknown:
+            raise CommandError(f"Unknown table(s): {', '.join(sorted(unknown))}")
+
+        with transaction.atomic(using=opts["database"]), connection.cursor() as cursor:
+            for table in tables:
+                schema.rebuild(cursor, table)
+                self.stdout.write(f"rebuilt {table}")
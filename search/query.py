@@ -0,0 +1,77 @@
+# search/query.py
+"""
+Query adapter the list views call instead of chaining ``__icontains``:
+
+    qs = search_filter(qs, "orders", q)
+
+On SQLite the text is matched against the FTS5 shadow table (an index
+lookup). Queries shorter than a trigram, or other DB backends, fall back to
+the old ``icontains`` filter over the same fields.
+"""
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# index name -> (FTS5 table, fields searched by the icontains fallback)
+INDEXES = {
+    "orders": ("search_order_fts", ["order_no", "customer__name", "customer__phone"]),
+    "customers": ("search_customer_fts", ["name", "phone"]),
+    "products": ("search_product_fts", ["name", "sku", "category__name"]),
+    "staff": ("search_staff_fts", ["name", "phone", "role__name"]),
+}
+
+# trigram tokenizer can't match anything shorter
+MIN_FTS_LENGTH = 3
+
+
+def fts_enabled(using="default"):
+    return (
+        getattr(settings, "SEARCH_FTS_ENABLED", True)
+        and connections[using].vendor == "sqlite"
+    )
+
+
+def match_expression(q):
+    """
+    The whole query as one FTS5 phrase: a substring match with trigrams.
+    """
+    return '"' + q.replace('"', '""') + '"'
+
+
+def icontains_filter(qs, fields, q):
+    cond = Q()
+    for field in fields:
+        cond |= Q(**{f"{field}__icontains": q})
+    return qs.filter(cond)
+
+
+def search_filter(qs, index, q, ranked=False):
+    """
+    Filter ``qs`` down to rows matching ``q`` in the given index.
+
+    ``ranked=True`` orders by FTS5 bm25 rank (best first) instead of keeping
+    the queryset's own ordering; only applies to the FTS path.
+    """
+    table, fields = INDEXES[index]
+    q = (q or "").strip()
+    if not q:
+        return qs
+
+    if len(q) < MIN_FTS_LENGTH or not fts_enabled(qs.db):
+        return icontains_filter(qs, fields, q)
+
+    match = match_expression(q)
+    qs = qs.filter(pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match]))
+
+    if ranked:
+        meta = qs.model._meta
+        pk_col = f'"{meta.db_table}"."{meta.pk.column}"'
+        qs = qs.annotate(
+            search_rank=RawSQL(
+                f"SELECT rank FROM {table} WHERE {table} MATCH %s AND rowid = {pk_col}",
+                [match],
+            )
+        ).order_by("search_rank", "-pk")
+
+    return qs
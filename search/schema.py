@@ -0,0 +1,230 @@
+# search/schema.py
+"""
+SQLite FTS5 shadow tables for the list-view searches.
+
+Each table is a trigram FTS5 index whose rowid is the id of the source row.
+Triggers on the source tables (and on the tables the searchable names come
+from, e.g. a customer's name for orders) keep them in sync, so bulk_create
+and queryset.update() are covered too, not just model.save().
+
+Only used on SQLite; other backends keep the plain ``icontains`` path.
+
+SQLite migrations that alter a column rebuild the table (copy into a new
+table, drop, rename), and a trigger that names the dropped table makes the
+rename fail. A migration touching a table listed in ``SOURCE_TABLES`` wraps
+its operations in ``suspend_triggers`` / ``restore_triggers``:
+
+    operations = [
+        migrations.RunPython(schema.suspend_triggers, schema.restore_triggers),
+        migrations.AddField(...),
+        migrations.RunPython(schema.restore_triggers, schema.suspend_triggers),
+    ]
+"""
+
+# name -> (columns, select that produces (rowid, *columns) for every source row)
+TABLES = {
+    "search_order_fts": (
+        ["order_no", "customer_name", "customer_phone"],
+        """
+        SELECT o.id, o.order_no, c.name, c.phone
+        FROM orders_order o LEFT JOIN customers_customer c ON c.id = o.customer_id
+        """,
+    ),
+    "search_customer_fts": (
+        ["name", "phone"],
+        "SELECT id, name, phone FROM customers_customer",
+    ),
+    "search_product_fts": (
+        ["name", "sku", "category_name"],
+        """
+        SELECT p.id, p.name, p.sku, c.name
+        FROM catalog_product p LEFT JOIN catalog_category c ON c.id = p.category_id
+        """,
+    ),
+    "search_staff_fts": (
+        ["name", "phone", "role_name"],
+        """
+        SELECT s.id, s.name, s.phone, r.name
+        FROM staff_staff s LEFT JOIN staff_staffrole r ON r.id = s.role_id
+        """,
+    ),
+}
+
+TRIGGERS = [
+    # ---------------- orders ----------------
+    """
+    CREATE TRIGGER search_order_ai AFTER INSERT ON orders_order BEGIN
+        INSERT INTO search_order_fts(rowid, order_no, customer_name, customer_phone)
+        VALUES (
+            NEW.id, NEW.order_no,
+            (SELECT name FROM customers_customer WHERE id = NEW.customer_id),
+            (SELECT phone FROM customers_customer WHERE id = NEW.customer_id)
+        );
+    END
+    """,
+    # totals updates rewrite every column; only re-index when the text changed
+    """
+    CREATE TRIGGER search_order_au AFTER UPDATE OF order_no, customer_id ON orders_order
+    WHEN OLD.order_no IS NOT NEW.order_no OR OLD.customer_id IS NOT NEW.customer_id BEGIN
+        DELETE FROM search_order_fts WHERE rowid = OLD.id;
+        INSERT INTO search_order_fts(rowid, order_no, customer_name, customer_phone)
+        VALUES (
+            NEW.id, NEW.order_no,
+            (SELECT name FROM customers_customer WHERE id = NEW.customer_id),
+            (SELECT phone FROM customers_customer WHERE id = NEW.customer_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER search_order_ad AFTER DELETE ON orders_order BEGIN
+        DELETE FROM search_order_fts WHERE rowid = OLD.id;
+    END
+    """,
+
+    # ---------------- customers ----------------
+    """
+    CREATE TRIGGER search_customer_ai AFTER INSERT ON customers_customer BEGIN
+        INSERT INTO search_customer_fts(rowid, name, phone) VALUES (NEW.id, NEW.name, NEW.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER search_customer_au AFTER UPDATE OF name, phone ON customers_customer
+    WHEN OLD.name IS NOT NEW.name OR OLD.phone IS NOT NEW.phone BEGIN
+        DELETE FROM search_customer_fts WHERE rowid = OLD.id;
+        INSERT INTO search_customer_fts(rowid, name, phone) VALUES (NEW.id, NEW.name, NEW.phone);
+        UPDATE search_order_fts SET customer_name = NEW.name, customer_phone = NEW.phone
+        WHERE rowid IN (SELECT id FROM orders_order WHERE customer_id = NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER search_customer_ad AFTER DELETE ON customers_customer BEGIN
+        DELETE FROM search_customer_fts WHERE rowid = OLD.id;
+    END
+    """,
+
+    # ---------------- products ----------------
+    """
+    CREATE TRIGGER search_product_ai AFTER INSERT ON catalog_product BEGIN
+        INSERT INTO search_product_fts(rowid, name, sku, category_name)
+        VALUES (NEW.id, NEW.name, NEW.sku, (SELECT name FROM catalog_category WHERE id = NEW.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER search_product_au AFTER UPDATE OF name, sku, category_id ON catalog_product
+    WHEN OLD.name IS NOT NEW.name OR OLD.sku IS NOT NEW.sku OR OLD.category_id IS NOT NEW.category_id BEGIN
+        DELETE FROM search_product_fts WHERE rowid = OLD.id;
+        INSERT INTO search_product_fts(rowid, name, sku, category_name)
+        VALUES (NEW.id, NEW.name, NEW.sku, (SELECT name FROM catalog_category WHERE id = NEW.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER search_product_ad AFTER DELETE ON catalog_product BEGIN
+        DELETE FROM search_product_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER search_category_au AFTER UPDATE OF name ON catalog_category
+    WHEN OLD.name IS NOT NEW.name BEGIN
+        UPDATE search_product_fts SET category_name = NEW.name
+        WHERE rowid IN (SELECT id FROM catalog_product WHERE category_id = NEW.id);
+    END
+    """,
+
+    # ---------------- staff ----------------
+    """
+    CREATE TRIGGER search_staff_ai AFTER INSERT ON staff_staff BEGIN
+        INSERT INTO search_staff_fts(rowid, name, phone, role_name)
+        VALUES (NEW.id, NEW.name, NEW.phone, (SELECT name FROM staff_staffrole WHERE id = NEW.role_id));
+    END
+    """,
+    """
+    CREATE TRIGGER search_staff_au AFTER UPDATE OF name, phone, role_id ON staff_staff
+    WHEN OLD.name IS NOT NEW.name OR OLD.phone IS NOT NEW.phone OR OLD.role_id IS NOT NEW.role_id BEGIN
+        DELETE FROM search_staff_fts WHERE rowid = OLD.id;
+        INSERT INTO search_staff_fts(rowid, name, phone, role_name)
+        VALUES (NEW.id, NEW.name, NEW.phone, (SELECT name FROM staff_staffrole WHERE id = NEW.role_id));
+    END
+    """,
+    """
+    CREATE TRIGGER search_staff_ad AFTER DELETE ON staff_staff BEGIN
+        DELETE FROM search_staff_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER search_staffrole_au AFTER UPDATE OF name ON staff_staffrole
+    WHEN OLD.name IS NOT NEW.name BEGIN
+        UPDATE search_staff_fts SET role_name = NEW.name
+        WHERE rowid IN (SELECT id FROM staff_staff WHERE role_id = NEW.id);
+    END
+    """,
+]
+
+
+# tables the triggers are on or read from
+SOURCE_TABLES = frozenset({
+    "orders_order", "customers_customer", "catalog_product", "catalog_category", "staff_staff", "staff_staffrole",
+})
+
+
+def _trigger_names():
+    return [sql.split()[2] for sql in TRIGGERS]
+
+
+def is_installed(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [next(iter(TABLES))])
+    return cursor.fetchone() is not None
+
+
+def create_triggers(cursor):
+    drop_triggers(cursor)
+    for sql in TRIGGERS:
+        cursor.execute(sql)
+
+
+def drop_triggers(cursor):
+    for name in _trigger_names():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def suspend_triggers(apps, schema_editor):
+    """``RunPython`` step before operations that rebuild a source table."""
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            drop_triggers(cursor)
+
+
+def restore_triggers(apps, schema_editor):
+    """``RunPython`` step after them; a no-op where the FTS tables don't exist."""
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            if is_installed(cursor):
+                create_triggers(cursor)
+
+
+def create_all(cursor):
+    for table, (columns, _) in TABLES.items():
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+            f"USING fts5({', '.join(columns)}, tokenize='trigram')"
+        )
+    create_triggers(cursor)
+    rebuild_all(cursor)
+
+
+def drop_all(cursor):
+    drop_triggers(cursor)
+    for table in TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def rebuild(cursor, table):
+    columns, select = TABLES[table]
+    cursor.execute(f"DELETE FROM {table}")
+    cursor.execute(f"INSERT INTO {table}(rowid, {', '.join(columns)}) {select}")
+
+
+def rebuild_all(cursor):
+    for table in TABLES:
+        rebuild(cursor, table)
@@ -0,0 +1,145 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, models
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from catalog.models import Category, Product
+from customers.models import Customer
+from orders.models import Order
+from staff.models import Staff, StaffRole
+
+from . import schema
+from .query import search_filter
+
+
+class FtsSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.karim = Customer.objects.create(name="Karim Uddin", phone="01711000111")
+        cls.rahim = Customer.objects.create(name="Rahim Mia", phone="01822000222")
+        cls.o1 = Order.objects.create(order_no="ORD-20261017-000001", customer=cls.karim)
+        cls.o2 = Order.objects.create(order_no="ORD-20261017-000002", customer=cls.rahim)
+        cls.o3 = Order.objects.create(order_no="ORD-20261018-000001")
+
+        cat = Category.objects.create(name="Biryani")
+        cls.p1 = Product.objects.create(category=cat, name="Kacchi", sku="KC-01", sale_price=Decimal("350"))
+
+        role = StaffRole.objects.create(name="Chef")
+        cls.s1 = Staff.objects.create(name="Jamal", phone="01900", role=role)
+
+    def ids(self, qs, index, q, **kwargs):
+        return set(search_filter(qs, index, q, **kwargs).values_list("id", flat=True))
+
+    def test_orders_by_number_name_and_phone(self):
+        orders = Order.objects.all()
+        self.assertEqual(self.ids(orders, "orders", "20261017"), {self.o1.id, self.o2.id})
+        self.assertEqual(self.ids(orders, "orders", "karim"), {self.o1.id})
+        self.assertEqual(self.ids(orders, "orders", "822000"), {self.o2.id})
+
+    def test_uses_fts_table(self):
+        sql = str(search_filter(Order.objects.all(), "orders", "karim").query)
+        self.assertIn("search_order_fts", sql)
+
+    def test_short_query_falls_back_to_icontains(self):
+        self.assertEqual(self.ids(Customer.objects.all(), "customers", "ra"), {self.rahim.id})
+
+    @override_settings(SEARCH_FTS_ENABLED=False)
+    def test_disabled_falls_back_to_icontains(self):
+        self.assertEqual(self.ids(Order.objects.all(), "orders", "karim"), {self.o1.id})
+
+    def test_triggers_follow_related_renames(self):
+        self.karim.name = "Abdul Karim"
+        self.karim.save()
+        self.assertEqual(self.ids(Order.objects.all(), "orders", "abdul"), {self.o1.id})
+
+        Category.objects.filter(pk=self.p1.category_id).update(name="Rice Dishes")
+        self.assertEqual(self.ids(Product.objects.all(), "products", "rice dish"), {self.p1.id})
+
+        StaffRole.objects.update(name="Head Cook")
+        self.assertEqual(self.ids(Staff.objects.all(), "staff", "cook"), {self.s1.id})
+
+    def test_delete_and_customer_removal(self):
+        self.o2.delete()
+        self.assertEqual(self.ids(Order.objects.all(), "orders", "rahim"), set())
+
+        self.karim.delete()
+        self.assertEqual(self.ids(Order.objects.all(), "orders", "karim"), set())
+        self.assertEqual(self.ids(Order.objects.all(), "orders", "000001"), {self.o1.id, self.o3.id})
+
+    def test_ranked(self):
+        qs = search_filter(Order.objects.all(), "orders", "20261017", ranked=True)
+        self.assertEqual(len(list(qs)), 2)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM search_customer_fts")
+        self.assertEqual(self.ids(Customer.objects.all(), "customers", "karim"), set())
+
+        call_command("rebuild_search_index", "search_customer_fts", stdout=StringIO())
+        self.assertEqual(self.ids(Customer.objects.all(), "customers", "karim"), {self.karim.id})
+
+    def test_list_view(self):
+        self.client.force_login(get_user_model().objects.create_user("admin", password="pw"))
+        res = self.client.get(reverse("orders:order_list"), {"q": "rahim"})
+        self.assertEqual([o.id for o in res.context["orders"]], [self.o2.id])
+
+
+class TableRebuildTests(TransactionTestCase):
+    def remake_customer_table(self):
+        # add + remove a NOT NULL column: two full table rebuilds on SQLite
+        field = models.IntegerField(default=0)
+        field.set_attributes_from_name("rebuild_probe")
+        with connection.schema_editor() as editor:
+            editor.add_field(Customer, field)
+            editor.remove_field(Customer, field)
+
+    def test_triggers_survive_a_rebuild_between_suspend_and_restore(self):
+        karim = Customer.objects.create(name="Karim Uddin", phone="01711000111")
+        order = Order.objects.create(order_no="ORD-20261017-000001", customer=karim)
+
+        with connection.schema_editor() as editor:
+            schema.suspend_triggers(None, editor)
+        self.remake_customer_table()
+        with connection.schema_editor() as editor:
+            schema.restore_triggers(None, editor)
+
+        Customer.objects.filter(pk=karim.pk).update(name="Abdul Karim")
+        rahim = Customer.objects.create(name="Rahim Mia", phone="01822000222")
+        self.assertEqual(set(search_filter(Order.objects.all(), "orders", "abdul").values_list("id", flat=True)), {order.id})
+        self.assertEqual(set(search_filter(Customer.objects.all(), "customers", "rahim").values_list("id", flat=True)), {rahim.id})
+
+
+class MigrateExistingDatabaseTests(TransactionTestCase):
+    """A database with the FTS tables from before the customer balance columns, migrated forward."""
+
+    before = [("customers", "0002_remove_customer_email_and_more"), ("search", "0001_fts5_tables")]
+
+    def migrate(self, targets=None):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets or executor.loader.graph.leaf_nodes())
+        return executor
+
+    def tearDown(self):
+        self.migrate()
+
+    def test_customer_balances_migration(self):
+        old = self.migrate(self.before).loader.project_state(self.before).apps
+        karim = old.get_model("customers", "Customer").objects.create(name="Karim Uddin", phone="01711000111")
+        order = old.get_model("orders", "Order").objects.create(
+            order_no="ORD-20261017-000001", customer_id=karim.pk,
+            grand_total=Decimal("100.00"), due_total=Decimal("40.00"),
+        )
+
+        self.migrate()
+
+        customer = Customer.objects.get(pk=karim.pk)
+        self.assertEqual((customer.outstanding_due, customer.order_count), (Decimal("40.00"), 1))
+        customer.name = "Abdul Karim"
+        customer.save()
+        self.assertEqual(set(search_filter(Order.objects.all(), "orders", "abdul").values_list("id", flat=True)), {order.id})
+        self.assertEqual(set(search_filter(Customer.objects.all(), "customers", "abdul").values_list("id", flat=True)), {karim.pk})
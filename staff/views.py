@@ -1,8 +1,13 @@
+from urllib.parse import urlencode
+
 from django.contrib import messages
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.db.models import Q, Sum
+from search.query import search_filter
+from vhojon import keyset
+
 from .models import Staff, StaffRole
 from .forms import StaffForm, StaffRoleForm
 
@@ -11,17 +16,13 @@ from .forms import StaffForm, StaffRoleForm
 # Staff CRUD (FBV)
 # -------------------------
 def staff_list(request):
-    qs = Staff.objects.select_related("role").order_by("-id")
+    qs = Staff.objects.select_related("role")
 
     q = request.GET.get("q", "").strip()
     active = request.GET.get("active", "").strip()  # "1" or "0"
 
     if q:
-        qs = qs.filter(
-            Q(name__icontains=q) |
-            Q(phone__icontains=q) |
-            Q(role__name__icontains=q)
-        )
+        qs = search_filter(qs, "staff", q)
 
     if active in ["1", "0"]:
         qs = qs.filter(is_active=(active == "1"))
@@ -35,17 +36,14 @@ def staff_list(request):
         total=Sum("monthly_salary")
     )["total"] or 0
 
-    paginator = Paginator(qs, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page = keyset.paginate(qs, "-id", after=request.GET.get("after"), before=request.GET.get("before"), size=10)
 
     context = {
-        "staff_list": page_obj.object_list,
-        "page_obj": page_obj,
-        "is_paginated": page_obj.has_other_pages(),
-        "paginator": paginator,
+        "staff_list": page.object_list,
+        "page": page,
         "q": q,
         "active": active,
+        "filter_query": urlencode({k: v for k, v in (("q", q), ("active", active)) if v}),
 
         # ✅ for cards
         "total_staff": total_staff,
@@ -3,6 +3,10 @@ ASGI config for vhojon project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Run the site under an ASGI server (e.g. ``uvicorn vhojon.asgi:application``)
+for the kitchen display stream (orders/kds/stream/): each open screen is then
+a coroutine instead of a blocked worker thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,70 @@
+# vhojon/dbrouter.py
+"""
+Primary / replica routing.
+
+Every write goes to ``default``. Reads go to the ``replica`` alias (when
+``DATABASES`` has one, see ``dbprofile.from_env``) only while a view wrapped
+in ``@replica_reads`` runs: the dashboards and reports, which can live with
+a replica a moment behind. Everything else, checkout included, keeps reading
+its own writes from the primary.
+
+    @login_required
+    @replica_reads
+    def home(request): ...
+
+Sessions and users always come from the primary: a session a lagging
+replica doesn't have yet would log the user out. Without a replica the
+router changes nothing.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = "replica"
+
+# read on every request by the session / auth machinery
+PRIMARY_ONLY_APPS = frozenset({"sessions", "auth", "contenttypes"})
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_configured():
+    return REPLICA in connections.settings
+
+
+@contextmanager
+def reading_from_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def replica_reads(view):
+    """Run ``view`` with its reads routed to the replica."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with reading_from_replica():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and model._meta.app_label not in PRIMARY_ONLY_APPS and replica_configured():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        # also for rows that were read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True   # same data on both
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets its schema from the primary
+        return False if db == REPLICA else None
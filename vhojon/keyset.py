@@ -0,0 +1,154 @@
+# vhojon/keyset.py
+"""
+Keyset (seek) pagination for the list views.
+
+    page = paginate(qs, "-created_at", after=request.GET.get("after"),
+                    before=request.GET.get("before"), size=25)
+
+Rows are ordered by one sort key with ``id`` as tie breaker (same
+direction), and a page is read as "the next ``size`` rows after the last
+one shown":
+
+    WHERE key < :last_key OR (key = :last_key AND id < :last_id)
+    ORDER BY key DESC, id DESC LIMIT size + 1
+
+instead of ``OFFSET``, so with an index on (key, id) page 10,000 costs what
+page 1 does. ``Page.next_cursor`` / ``prev_cursor`` are opaque url-safe
+tokens holding that (key, id) pair; pass them back as ``after`` / ``before``.
+A malformed or stale token just gives the first page.
+
+Paging needs no ``COUNT(*)``. For a "N orders" label, ``count_limit`` counts
+at most that many matching rows (``Page.count``, with ``count_capped`` when
+there are more), which stays cheap on large tables.
+
+The sort key must be a non-null field or annotation of the queryset.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 25
+COUNT_LIMIT = 1000
+
+
+class Page:
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None, count=None, count_capped=False):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.count = count
+        self.count_capped = count_capped
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def parse_ordering(ordering):
+    """"-field" -> ("field", descending)."""
+    return (ordering[1:], True) if ordering.startswith("-") else (ordering, False)
+
+
+def _key_field(qs, name):
+    annotation = qs.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field
+    return qs.model._meta.get_field(name)
+
+
+def encode_cursor(value, pk):
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    raw = json.dumps([str(value), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, field):
+    """(value, id) from a cursor token, or None if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        value, pk = json.loads(raw)
+        return field.to_python(value), int(pk)
+    except (ValueError, TypeError, ArithmeticError, ValidationError):
+        return None
+
+
+def seek(field, descending, value, pk):
+    """Q for the rows strictly after (value, pk) in the given direction."""
+    if field == "id":
+        return Q(id__lt=pk) if descending else Q(id__gt=pk)
+    if descending:
+        return Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": pk})
+    return Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk})
+
+
+def count_upto(qs, limit=COUNT_LIMIT):
+    """(count, capped): matching rows counted up to ``limit``."""
+    n = qs.order_by()[: limit + 1].count()
+    return min(n, limit), n > limit
+
+
+def paginate(qs, ordering="-id", after=None, before=None, size=PAGE_SIZE, count_limit=None):
+    """
+    One ``Page`` of ``qs`` ordered by ``ordering`` ("field" / "-field").
+
+    ``after`` / ``before`` are cursor tokens from a previous page; with
+    neither, the first page. ``count_limit`` adds ``Page.count`` (see
+    ``count_upto``).
+    """
+    field, descending = parse_ordering(ordering)
+    key_field = _key_field(qs, field)
+
+    after = decode_cursor(after, key_field) if after else None
+    before = decode_cursor(before, key_field) if before else None
+    backwards = before is not None and after is None
+
+    # walking back: flip the order, read the page, flip it again
+    desc = descending != backwards
+    if field == "id":
+        order = ["-id"] if desc else ["id"]
+    else:
+        order = [f"-{field}", "-id"] if desc else [field, "id"]
+
+    cursor = before if backwards else after
+    page_qs = qs if cursor is None else qs.filter(seek(field, desc, *cursor))
+
+    rows = list(page_qs.order_by(*order)[: size + 1])
+    more = len(rows) > size
+    rows = rows[:size]
+    if backwards:
+        rows.reverse()
+
+    count, capped = count_upto(qs, count_limit) if count_limit else (None, False)
+    if not rows:
+        return Page(rows, count=count, count_capped=capped)
+
+    def token(row):
+        return encode_cursor(getattr(row, field), row.pk)
+
+    has_next = more if not backwards else True
+    has_prev = (cursor is not None) if not backwards else more
+    return Page(
+        rows,
+        next_cursor=token(rows[-1]) if has_next else None,
+        prev_cursor=token(rows[0]) if has_prev else None,
+        count=count,
+        count_capped=capped,
+    )
@@ -0,0 +1,254 @@
+# vhojon/queryplan.py
+"""
+Query plan checks for the hot query shapes.
+
+Every ``@hot_query`` below builds (without running) the queryset one of the
+busy views or jobs runs, through the same helpers the view uses where there
+are any. ``check()`` asks the database for each one's plan
+(``QuerySet.explain()``, i.e. ``EXPLAIN QUERY PLAN`` on SQLite) and reports
+the tables it would read in full:
+
+    SCAN orders_order                     <- full table scan, flagged
+    SCAN orders_order USING INDEX x       <- walks an index (ORDER BY .. LIMIT)
+    SEARCH orders_order USING INDEX x     <- index lookup / range
+    USE TEMP B-TREE FOR ORDER BY          <- sorts the matches, noted
+
+``manage.py check_query_plans`` runs it and fails when a shape falls back to
+a full scan, so a dropped index or a rewritten filter that stops using one
+shows up in the test run instead of in production. Add a shape here when a
+new hot query lands; list tables that are fine to scan (a handful of rows)
+in ``allow_scan``.
+"""
+import re
+from datetime import date, timedelta
+
+from django.db import connections
+from django.utils import timezone
+
+HOT_QUERIES = {}
+
+# table name in a full-scan plan line: SQLite ("SCAN t", "SCAN TABLE t"
+# on < 3.36) and PostgreSQL ("Seq Scan on t")
+_SQLITE_SCAN_RE = re.compile(r"\bSCAN (?:TABLE )?(\w+)(.*)$")
+_PG_SCAN_RE = re.compile(r"\bSeq Scan on (\w+)")
+_SORT_RE = re.compile(r"TEMP B-TREE FOR (?:ORDER|GROUP) BY|\bSort\b")
+
+SAMPLE_DAY = date(2026, 1, 15)
+SAMPLE_ID = 1
+
+
+class HotQuery:
+    def __init__(self, name, build, allow_scan=()):
+        self.name = name
+        self.build = build
+        self.allow_scan = frozenset(allow_scan)
+
+
+def hot_query(name, allow_scan=()):
+    def register(build):
+        HOT_QUERIES[name] = HotQuery(name, build, allow_scan)
+        return build
+    return register
+
+
+class PlanReport:
+    def __init__(self, name, sql, plan, scans, sorts):
+        self.name = name
+        self.sql = sql
+        self.plan = plan
+        self.scans = scans      # tables read in full
+        self.sorts = sorts      # plan lines that sort the matches
+
+    @property
+    def ok(self):
+        return not self.scans
+
+
+def full_scans(plan, vendor="sqlite"):
+    """Tables a plan (``QuerySet.explain()`` text) reads in full."""
+    tables = []
+    for line in plan.splitlines():
+        if vendor == "postgresql":
+            m = _PG_SCAN_RE.search(line)
+            if m:
+                tables.append(m.group(1))
+            continue
+        m = _SQLITE_SCAN_RE.search(line)
+        if m and "USING" not in m.group(2):
+            tables.append(m.group(1))
+    return tables
+
+
+def explain(hot, using="default"):
+    qs = hot.build().using(using)
+    plan = qs.explain()
+    vendor = connections[using].vendor
+    scans = [t for t in full_scans(plan, vendor) if t not in hot.allow_scan]
+    sorts = [line.strip() for line in plan.splitlines() if _SORT_RE.search(line)]
+    return PlanReport(hot.name, str(qs.query), plan, scans, sorts)
+
+
+def check(names=None, using="default"):
+    """``PlanReport`` for every registered shape (or the ``names`` given)."""
+    names = names or sorted(HOT_QUERIES)
+    return [explain(HOT_QUERIES[name], using) for name in names]
+
+
+# =====================================================
+# ORDERS
+# =====================================================
+def _order_list(**filters):
+    from orders.filters import filter_orders
+    from orders.models import Order
+    from orders.views import ORDER_PAGE_SIZE
+
+    qs = filter_orders(Order.objects.select_related("customer"), **filters)
+    return qs.order_by("-id")[: ORDER_PAGE_SIZE + 1]
+
+
+# no filter: walks the rowid backwards and stops after one page
+@hot_query("orders.list", allow_scan=["orders_order"])
+def _():
+    return _order_list()
+
+
+@hot_query("orders.list_status")
+def _():
+    return _order_list(status="pending")
+
+
+@hot_query("orders.list_due")
+def _():
+    return _order_list(due="1")
+
+
+@hot_query("orders.list_dates")
+def _():
+    return _order_list(date_from=SAMPLE_DAY, date_to=SAMPLE_DAY + timedelta(days=6))
+
+
+@hot_query("orders.list_deep_page")
+def _():
+    from orders.filters import filter_orders
+    from orders.models import Order
+    from vhojon import keyset
+
+    qs = filter_orders(Order.objects.select_related("customer"), status="pending")
+    return qs.filter(keyset.seek("id", True, SAMPLE_ID, SAMPLE_ID)).order_by("-id")[:11]
+
+
+@hot_query("orders.kds_open")
+def _():
+    from orders import kds
+    return kds._open_orders()
+
+
+@hot_query("orders.items_of_order")
+def _():
+    from orders.models import OrderItem
+    return OrderItem.objects.filter(order_id=SAMPLE_ID).select_related("product")
+
+
+@hot_query("orders.payments_of_order")
+def _():
+    from orders.models import Payment
+    return Payment.objects.filter(order_id=SAMPLE_ID).select_related("payment_method")
+
+
+@hot_query("orders.print_queue")
+def _():
+    from orders.models import PrintJob
+    return (
+        PrintJob.objects
+        .filter(printer="default", status=PrintJob.Status.QUEUED, next_attempt_at__lte=timezone.now())
+        .order_by("id")
+        .values_list("id", flat=True)[:5]
+    )
+
+
+@hot_query("home.recent_orders")
+def _():
+    from orders.models import Order
+    return Order.objects.order_by("-created_at")[:5]
+
+
+# =====================================================
+# CUSTOMERS
+# =====================================================
+@hot_query("customers.by_phone")
+def _():
+    from customers.models import Customer
+    return Customer.objects.filter(phone="01700000000")
+
+
+@hot_query("customers.list_due_sort")
+def _():
+    from customers.models import Customer
+    return Customer.objects.filter(outstanding_due__gt=0).order_by("-outstanding_due", "-id")[:26]
+
+
+@hot_query("customers.recent_orders")
+def _():
+    from orders.models import Order
+    return Order.objects.filter(customer_id=SAMPLE_ID).order_by("-id")[:10]
+
+
+@hot_query("customers.due_orders")
+def _():
+    from orders.models import Order
+    return (
+        Order.objects
+        .filter(customer_id=SAMPLE_ID, due_total__gt=0)
+        .exclude(status=Order.Status.CANCELLED)
+        .order_by("-id")[:20]
+    )
+
+
+# =====================================================
+# REPORTS / EXPENSES
+# =====================================================
+def _register_rollup_shapes():
+    from reports.models import DailyFinanceSummary
+
+    # the rollup rebuild reads each source through rollup.source_rows
+    for category in DailyFinanceSummary.Category.values:
+        def rows(category=category):
+            from reports import rollup
+            src = next(s for s in rollup.SOURCES if s.category == category)
+            return rollup.source_rows(src, SAMPLE_DAY.replace(day=1), SAMPLE_DAY)
+
+        hot_query(f"reports.rebuild_{category}")(rows)
+
+
+@hot_query("reports.period_totals")
+def _():
+    from reports.models import DailyFinanceSummary
+    return DailyFinanceSummary.objects.filter(date__gte=SAMPLE_DAY.replace(day=1), date__lte=SAMPLE_DAY)
+
+
+@hot_query("expenses.ledger_page")
+def _():
+    from expenses import ledger
+    from expenses.models import ExpenseEntry
+
+    qs = ledger.filter_dates(ExpenseEntry.objects.all(), SAMPLE_DAY.replace(day=1), SAMPLE_DAY)
+    return qs.order_by("-date", "-id")[:26]
+
+
+def _register_expense_shapes():
+    for key, model_name, field in [
+        ("utility", "UtilityBill", "bill_date"),
+        ("raw", "RawMaterialPurchase", "purchase_date"),
+        ("salary", "StaffSalaryPayment", "pay_date"),
+        ("other", "OtherExpense", "expense_date"),
+    ]:
+        def recent(model_name=model_name, field=field):
+            from django.apps import apps
+            model = apps.get_model("expenses", model_name)
+            return model.objects.order_by(f"-{field}", "-id")[:5]
+
+        hot_query(f"home.recent_{key}")(recent)
+
+
+_register_rollup_shapes()
+_register_expense_shapes()
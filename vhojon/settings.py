@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from vhojon import dbprofile
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,8 +49,10 @@ INSTALLED_APPS = [
     'payments',        # payment methods & payments
     'expenses',        # expenses & expense categories
     'settings_app',    # system settings (restaurant, tax, receipt)
-    'reports',         # reports (queries/views only)
+    'reports',         # reports, daily finance rollup
     "staff",
+    'search',          # FTS5 shadow tables for list-view search
+    'bench',           # load data generator + hot path benchmarks
 ]
 
 
@@ -60,6 +64,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'vhojon.sqlprofile.SQLProfilerMiddleware',
+    'catalog.cache.CatalogCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'vhojon.urls'
@@ -87,12 +93,12 @@ WSGI_APPLICATION = 'vhojon.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# DATABASE_URL / DATABASE_REPLICA_URL, default the tuned SQLite profile on
+# db.sqlite3 (vhojon.dbprofile)
+DATABASES = dbprofile.from_env(BASE_DIR)
+
+# writes -> default; @replica_reads views read from "replica" if configured
+DATABASE_ROUTERS = ["vhojon.dbrouter.PrimaryReplicaRouter"]
 
 
 # Password validation
@@ -141,8 +147,26 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Business day boundary (local hour). 3 = the day runs 03:00..03:00, so
+# after-midnight sales count for the night before (vhojon.timewindow).
+BUSINESS_DAY_CUTOFF_HOUR = 0
+
 POS_PRINTER_ENABLED = True
 
+# Order numbers each worker process reserves at a time (orders.utils)
+ORDER_NO_BLOCK_SIZE = 10
+
+# Products / categories / payment methods are cached per process (catalog.cache)
+# and checked against the DB generation once per request; outside requests
+# (commands, shells) at most this often
+CATALOG_CACHE_CHECK_SECONDS = 5
+
+# Use the SQLite FTS5 tables (search app) for list-view search
+SEARCH_FTS_ENABLED = True
+
+# Max age (seconds) of the in-process customer phone index (customers.phone_index)
+CUSTOMER_PHONE_INDEX_TTL = 300
+
 
 
 # Must match exactly your Windows printer name
@@ -157,3 +181,31 @@ POS_PRINTER = {
     "USB_VENDOR_ID": 0x0000,
     "USB_PRODUCT_ID": 0x0000,
 }
+
+# Print spooler (orders.print_queue, run with `manage.py run_print_spooler`)
+POS_PRINT_TRANSPORT = "windows"   # "windows" (WINDOWS_POS_PRINTER_NAME) or "lan" (POS_PRINTER)
+POS_PRINT_MAX_ATTEMPTS = 5
+POS_PRINT_RETRY_BASE_SECONDS = 2
+POS_PRINT_RETRY_MAX_SECONDS = 60
+POS_PRINT_DEDUPE_SECONDS = 10
+POS_PRINT_IDLE_SECONDS = 30       # reconnect to a LAN printer idle longer than this
+
+# Receipt layout (orders.receipt)
+POS_PAPER_WIDTH_MM = 80           # 80 (48 columns) or 58 (32 columns)
+POS_PRINTER_CODEPAGE = "cp437"
+POS_RASTER_FONT = None            # path to a .ttf with Bangla glyphs; needs Pillow
+
+# Kitchen display stream (orders.kds); served by vhojon/asgi.py
+KDS_BROKER = "orders.kds.LocalBroker"   # in-process; one ASGI process
+KDS_HEARTBEAT_SECONDS = 15
+KDS_WINDOW_HOURS = 12                   # pending orders younger than this are shown
+
+# Per-request SQL profiler (vhojon.sqlprofile); `manage.py sql_profile_report`
+SQL_PROFILER_ENABLED = False
+SQL_PROFILER_SAMPLE_RATE = 1.0          # share of requests profiled, e.g. 0.01 in production
+SQL_PROFILER_REPEAT_THRESHOLD = 5       # same query shape this often = N+1 suspect
+SQL_PROFILER_LOG_QUERIES = 30           # also log requests with this many queries ...
+SQL_PROFILER_LOG_MS = 200               # ... or this much DB time
+SQL_PROFILER_LOG_FILE = BASE_DIR / "logs" / "sql_profile.jsonl"
+SQL_PROFILER_LOG_MAX_BYTES = 10 * 1024 * 1024
+SQL_PROFILER_LOG_BACKUPS = 5
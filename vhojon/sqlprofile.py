@@ -0,0 +1,218 @@
+# vhojon/sqlprofile.py
+"""
+Per-request SQL profiler.
+
+``SQLProfilerMiddleware`` wraps every DB connection with an execute wrapper
+(``connection.execute_wrapper``, so it works with DEBUG off) for a sampled
+share of requests and records:
+
+    queries, db_ms         count and total time of every query
+    duplicates             the exact same SQL + params run more than once
+    repeated               N+1 suspects: one SQL shape (fingerprint) run
+                           ``SQL_PROFILER_REPEAT_THRESHOLD``+ times with
+                           different params, with the app line that ran it
+
+Requests over ``SQL_PROFILER_LOG_QUERIES`` queries / ``SQL_PROFILER_LOG_MS``
+DB time, or with an N+1 suspect, are written as one JSON line to
+``SQL_PROFILER_LOG_FILE`` (rotated by size). ``manage.py sql_profile_report``
+ranks the views in that file. Profiled responses also carry a
+``Server-Timing: db;dur=..`` header, so the numbers show up in the browser's
+network panel without a debug toolbar.
+
+Off unless ``SQL_PROFILER_ENABLED``; ``SQL_PROFILER_SAMPLE_RATE`` (0..1)
+keeps the cost negligible in production. Queries run while a streaming
+response is being consumed are not counted.
+"""
+import json
+import logging
+import random
+import re
+import sys
+import time
+import traceback
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger("vhojon.sqlprofile")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def fingerprint(sql):
+    """
+    The shape of a statement: literals become ``?`` and ``IN (...)`` lists of
+    any length collapse, so the same query with other params matches.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def _app_frame():
+    """First stack frame in project code (not Django / site-packages)."""
+    base = str(settings.BASE_DIR)
+    here = __file__
+    for frame in reversed(traceback.extract_stack(sys._getframe(2), limit=60)):
+        path = frame.filename
+        if path.startswith(base) and path != here and "site-packages" not in path:
+            return f"{Path(path).relative_to(base)}:{frame.lineno} in {frame.name}"
+    return None
+
+
+class _Shape:
+    __slots__ = ("sql", "count", "ms", "params", "caller")
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.ms = 0.0
+        self.params = {}      # repr(params) -> times run
+        self.caller = None
+
+
+class QueryRecorder:
+    """``execute_wrapper`` callable that aggregates queries by fingerprint."""
+
+    def __init__(self, repeat_threshold):
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.ms = 0.0
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.ms += ms
+
+            key = fingerprint(sql)
+            shape = self.shapes.get(key)
+            if shape is None:
+                shape = self.shapes[key] = _Shape(key)
+            shape.count += 1
+            shape.ms += ms
+            p = repr(params)
+            shape.params[p] = shape.params.get(p, 0) + 1
+            if shape.count == self.repeat_threshold:
+                # only pay for a stack walk once a shape looks like N+1
+                shape.caller = _app_frame()
+
+    def duplicates(self):
+        """Identical statements (same params) run more than once."""
+        return [
+            {"sql": s.sql, "count": n}
+            for s in self.shapes.values()
+            for n in s.params.values()
+            if n > 1
+        ]
+
+    def repeated(self):
+        """Shapes run ``repeat_threshold``+ times with different params."""
+        found = [
+            {
+                "sql": s.sql,
+                "count": s.count,
+                "distinct_params": len(s.params),
+                "ms": round(s.ms, 2),
+                "caller": s.caller,
+            }
+            for s in self.shapes.values()
+            if s.count >= self.repeat_threshold and len(s.params) > 1
+        ]
+        return sorted(found, key=lambda r: -r["count"])
+
+
+_handler_ready = False
+
+
+def _ensure_handler():
+    """Attach the rotating JSONL file once (unless LOGGING already did)."""
+    global _handler_ready
+    if _handler_ready:
+        return
+    _handler_ready = True
+    if logger.handlers:
+        return
+    path = Path(_setting("SQL_PROFILER_LOG_FILE", settings.BASE_DIR / "logs" / "sql_profile.jsonl"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=_setting("SQL_PROFILER_LOG_MAX_BYTES", 10 * 1024 * 1024),
+        backupCount=_setting("SQL_PROFILER_LOG_BACKUPS", 5),
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class SQLProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _sampled(self):
+        if not _setting("SQL_PROFILER_ENABLED", False):
+            return False
+        rate = _setting("SQL_PROFILER_SAMPLE_RATE", 1.0)
+        return rate >= 1 or random.random() < rate
+
+    def __call__(self, request):
+        if not self._sampled():
+            return self.get_response(request)
+
+        recorder = QueryRecorder(_setting("SQL_PROFILER_REPEAT_THRESHOLD", 5))
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        request.sql_profile = recorder
+        response["Server-Timing"] = (
+            f'db;dur={recorder.ms:.1f};desc="{recorder.count} queries", app;dur={total_ms:.1f}'
+        )
+        self._log(request, response, recorder, total_ms)
+        return response
+
+    def _log(self, request, response, recorder, total_ms):
+        repeated = recorder.repeated()
+        if not (
+            repeated
+            or recorder.count >= _setting("SQL_PROFILER_LOG_QUERIES", 30)
+            or recorder.ms >= _setting("SQL_PROFILER_LOG_MS", 200)
+        ):
+            return
+
+        match = getattr(request, "resolver_match", None)
+        entry = {
+            "at": timezone.now().isoformat(timespec="seconds"),
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_ms": round(recorder.ms, 2),
+            "total_ms": round(total_ms, 2),
+            "repeated": repeated[:10],
+            "duplicates": sorted(recorder.duplicates(), key=lambda d: -d["count"])[:10],
+        }
+        _ensure_handler()
+        logger.info(json.dumps(entry, default=str))
@@ -0,0 +1,71 @@
+# vhojon/timewindow.py
+"""
+Business days as datetime ranges.
+
+A business day runs from ``BUSINESS_DAY_CUTOFF_HOUR`` (local time,
+``TIME_ZONE``) to the same hour the next day, so with a cutoff of 3 an order
+rung up at 01:30 on the 6th counts for the 5th, the night it belongs to.
+
+Filters on ``DateTimeField`` columns go through here as half-open ranges
+
+    created_at >= day_start(first) AND created_at < day_start(last + 1)
+
+instead of ``created_at__date=...``, which wraps the column in a date
+function (no index) and knows nothing about the cutoff. The bounds are UTC,
+the way the columns are stored. ``day_expr()`` is the matching SQL
+expression for grouping rows by business day.
+"""
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import DateTimeField, ExpressionWrapper, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def cutoff_hour():
+    return getattr(settings, "BUSINESS_DAY_CUTOFF_HOUR", 0)
+
+
+def business_day(value=None):
+    """The business day an aware datetime (default: now) falls on."""
+    local = timezone.localtime(value)
+    return (local - timedelta(hours=cutoff_hour())).date()
+
+
+def day_start(day):
+    """UTC datetime business ``day`` starts at."""
+    local = timezone.make_aware(datetime.combine(day, time(cutoff_hour())))
+    return local.astimezone(dt_timezone.utc)
+
+
+def day_range(first, last=None):
+    """(start, end) covering business days ``first``..``last`` (inclusive), end exclusive."""
+    return day_start(first), day_start((last or first) + timedelta(days=1))
+
+
+def range_q(field, first=None, last=None):
+    """Q for ``field`` within business days ``first``..``last``; either may be open."""
+    q = Q()
+    if first is not None:
+        q &= Q(**{f"{field}__gte": day_start(first)})
+    if last is not None:
+        q &= Q(**{f"{field}__lt": day_start(last + timedelta(days=1))})
+    return q
+
+
+def day_expr(field):
+    """The business day of ``field`` in SQL, for GROUP BY (never for filters)."""
+    hours = cutoff_hour()
+    if not hours:
+        return TruncDate(field)
+    shifted = ExpressionWrapper(F(field) - timedelta(hours=hours), output_field=DateTimeField())
+    return TruncDate(shifted)
+
+
+def parse_date(value):
+    """date from a ``YYYY-MM-DD`` query string value; None if blank or malformed."""
+    try:
+        return date.fromisoformat(value.strip()) if value else None
+    except ValueError:
+        return None